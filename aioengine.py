@@ -0,0 +1,237 @@
+"""Асинхронный режим: конкурентный опрос API для всех подписчиков."""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import exceptions
+import homework
+import metrics
+from api_client import PracticumClient
+from commands import start_commands
+from constants import ASYNC_TIMEOUT, TELEGRAM_TOKEN
+from engine import PollEngine
+from outbox import Outbox
+from profiling import PROFILER
+from state import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_blocking(func, *args):
+    """Выполняет блокирующий вызов в пуле потоков с ограничением времени."""
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(
+        loop.run_in_executor(None, func, *args), ASYNC_TIMEOUT
+    )
+
+
+class AsyncPollEngine(PollEngine):
+    """Опрашивает API для подписчиков конкурентно.
+
+    Блокирующие вызовы API и Telegram выполняются в пуле потоков, число
+    одновременных вызовов ограничено семафором, а ожидание квоты запросов
+    не блокирует цикл событий.
+    """
+
+    def __init__(self, client, bot, store, concurrency, outbox=None,
+                 breaker=None, quota=None):
+        super().__init__(client, bot, store, outbox, breaker, quota)
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._stopping = None
+
+    def stop_event(self):
+        """Возвращает событие, устанавливаемое при запросе остановки."""
+        loop = asyncio.get_running_loop()
+        if self._stopping is None or self._stopping[0] is not loop:
+            event = asyncio.Event()
+            self.shutdown.add_callback(
+                lambda: loop.is_closed()
+                or loop.call_soon_threadsafe(event.set)
+            )
+            self._stopping = (loop, event)
+        return self._stopping[1]
+
+    async def wait_quota(self, delay):
+        """Ожидает токена квоты delay секунд.
+
+        Ожидание прерывается запросом остановки: иначе подписчики большого
+        цикла задержали бы остановку на время, нужное квоте для их опроса.
+        """
+        try:
+            await asyncio.wait_for(self.stop_event().wait(), delay)
+        except asyncio.TimeoutError:
+            return
+        raise exceptions.ShutdownRequested()
+
+    async def poll_tenant(self, tenant, now):
+        """Запрашивает API для подписчика, не блокируя цикл событий.
+
+        Подписчики цикла ожидают квоты и семафора одновременно, поэтому
+        квота и выключатель проверяются непосредственно перед запросом:
+        после ответа 429 или размыкания выключателя ожидающие подписчики не
+        обращаются к API, а их опрос откладывается.
+        """
+        if self.shutdown.requested:
+            raise exceptions.ShutdownRequested()
+        if self.breaker.retry_after():
+            self.breaker.check()
+        delay = self.quota.reserve()
+        if delay:
+            await self.wait_quota(delay)
+        async with self.semaphore:
+            if self.shutdown.requested:
+                raise exceptions.ShutdownRequested()
+            self.quota.check()
+            self.breaker.check()
+            try:
+                response, entry = await _run_blocking(
+                    self.client.revalidate_answer, tenant.timestamp,
+                    tenant.practicum_token, tenant.validators, tenant.digest
+                )
+            except asyncio.TimeoutError:
+                error = exceptions.RequestAPIYandexPracticumTimeout(
+                    f"Запрос к API не выполнен за {ASYNC_TIMEOUT} с."
+                )
+                self.breaker.record_failure(error)
+                raise error
+            except exceptions.TooManyRequestsException as error:
+                self.quota.throttle(error.retry_after)
+                self.breaker.record_success()
+                raise
+            except Exception as error:
+                self.breaker.record_failure(error)
+                raise
+        self.breaker.record_success()
+        return (*self.parse_answer(tenant, response, now), entry)
+
+    async def send(self, tenant, message, on_delivered=None):
+        """Отправляет сообщение в чат подписчика, не блокируя цикл событий."""
+        if self.outbox is not None:
+            return super().send(tenant, message, on_delivered)
+        async with self.semaphore:
+            try:
+                await _run_blocking(
+                    homework.send_chat_message, self.bot, tenant.chat_id,
+                    message
+                )
+            except asyncio.TimeoutError:
+                raise exceptions.BotSendMessageException(
+                    f"Сообщение {message} не отправлено за {ASYNC_TIMEOUT} с."
+                )
+        if on_delivered is not None:
+            on_delivered()
+        tenant.last_message = message
+
+    async def deliver_updates(self, tenant, records):
+        """Отправляет подписчику сообщения о смене статусов работ."""
+        for record in records:
+            if not self.is_transition(tenant, record):
+                logger.debug(
+                    f"{tenant}: статус работы \"{record.name}\" не "
+                    "изменился."
+                )
+                continue
+            logger.info(f"{tenant}: {record.message}")
+            self.record_transition(tenant, record)
+            await self.send(
+                tenant, record.message, self.remember_status(tenant, record)
+            )
+
+    async def notify_error(self, tenant, error):
+        """Журналирует ошибку и сообщает о ней подписчику."""
+        message = self.error_message(tenant, error)
+        if message:
+            try:
+                await self.send(tenant, message)
+                self.errors.add((tenant.key, message))
+            except exceptions.BotSendMessageException as send_error:
+                logger.error(send_error)
+
+    async def process_tenant(self, tenant):
+        """Опрашивает API для подписчика и доставляет ему сообщения."""
+        now = time.time()
+        retry_after = None
+        polled = False
+        from_date = tenant.timestamp
+        try:
+            records, current_date, entry = await self.poll_tenant(
+                tenant, now
+            )
+            await self.deliver_updates(tenant, records)
+            self.commit_answer(tenant, from_date, current_date, entry)
+            polled = True
+        except (
+            exceptions.CircuitOpenException,
+            exceptions.TooManyRequestsException,
+        ) as error:
+            retry_after = error.retry_after
+        except exceptions.ShutdownRequested:
+            retry_after = 0
+        except Exception as error:
+            await self.notify_error(tenant, error)
+        finally:
+            self.finish_tenant(tenant, now, retry_after, polled)
+
+    async def run_cycle(self, tenants):
+        """Выполняет опрос API для переданных подписчиков конкурентно."""
+        await asyncio.gather(
+            *(self.process_tenant(tenant) for tenant in tenants)
+        )
+
+    async def run(self, tenants):
+        """Опрашивает API для подписчиков, пока не запрошена остановка."""
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=self.concurrency)
+        )
+        stopping = self.stop_event()
+        self.queue.extend(tenants)
+        while not stopping.is_set():
+            started = time.monotonic()
+            due = self.queue.pop_due(time.time())
+            with PROFILER.cycle():
+                await self.run_cycle(due)
+            self.queue.extend(due)
+            self.report_outage()
+            self.store.maybe_flush()
+            elapsed = time.monotonic() - started
+            metrics.CYCLE_DURATION.observe(elapsed)
+            logger.debug(
+                f"Цикл опроса {len(due)} подписчиков занял {elapsed:.3f} с."
+            )
+            try:
+                await asyncio.wait_for(
+                    stopping.wait(),
+                    self.queue.seconds_until_next(time.time()),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+async def main(tenants, concurrency, commands=False):
+    """Запускает асинхронный опрос API для переданных подписчиков.
+
+    При commands бот также отвечает на команды /status и /history.
+    Возвращает True, если при остановке все сообщения доставлены.
+    """
+    logger.info(
+        f"Асинхронный режим: подписчиков {len(tenants)}, "
+        f"одновременных запросов не более {concurrency}."
+    )
+    store = StateStore()
+    bot = homework.LazyBot(TELEGRAM_TOKEN)
+    client = PracticumClient(pool_size=concurrency)
+    outbox = Outbox(bot).start()
+    poll_engine = AsyncPollEngine(client, bot, store, concurrency, outbox)
+    poll_engine.restore(tenants)
+    metrics.watch_engine(tenants, outbox)
+    updater = None
+    if commands:
+        updater = start_commands(poll_engine.cache, tenants)
+    try:
+        await poll_engine.run(tenants)
+    finally:
+        drained = poll_engine.stop(tenants, updater)
+    return drained
@@ -0,0 +1,325 @@
+"""Клиент API Yandex Practicum с пулом постоянных соединений."""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import exceptions
+import metrics
+from constants import (ENDPOINT, FAILURE_RETRY_PERIOD, HEADERS, POOL_SIZE,
+                       RESPONSE_CACHE_SIZE, STREAM_CHUNK_SIZE, TIMEOUT)
+from jsonstream import HomeworkStream
+from profiling import PROFILER
+
+NOT_MODIFIED = object()
+CURRENT_DATE_PATTERN = re.compile(rb'"current_date"\s*:\s*-?[0-9.eE+-]+')
+
+
+def parse_retry_after(value, default=FAILURE_RETRY_PERIOD, now=None):
+    """Возвращает число секунд из заголовка Retry-After.
+
+    Заголовок содержит либо число секунд, либо дату HTTP. Если он
+    отсутствует или некорректен, возвращает default.
+    """
+    if not value:
+        return default
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    now = time.time() if now is None else now
+    return max(date.timestamp() - now, 0)
+
+
+def check_status_code(response, endpoint=ENDPOINT):
+    """Проверяет статус-код ответа API Yandex Practicum."""
+    if response.status_code == HTTPStatus.NOT_FOUND:
+        raise exceptions.NotFoundEndpointException(
+            f"Эндпоинт {endpoint} не найден. "
+            f"URL: {response.url}\nЗаголовки: {response.headers}\n"
+            f"Текст ответа: {response.text}\n"
+            f"Код ответа: {response.status_code}", response.status_code
+        )
+    if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        headers = getattr(response, "headers", None) or {}
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        raise exceptions.TooManyRequestsException(
+            f"API {endpoint} ограничивает частоту запросов, повторная "
+            f"попытка через {retry_after:.0f} с.", retry_after
+        )
+    if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        raise exceptions.ServerErrorStatusCodeException(
+            f"Сервер {endpoint} вернул ошибку.\n"
+            f"URL: {response.url}\nЗаголовки: {response.headers}\n"
+            f"Текст ответа: {response.text}\n"
+            f"Код ответа: {response.status_code}", response.status_code
+        )
+    if response.status_code != HTTPStatus.OK:
+        raise exceptions.NotOkStatusCodeException(
+            f"Статус-код ответа от {endpoint} отличен от 200.\n"
+            f"URL: {response.url}\nЗаголовки: {response.headers}\n"
+            f"Текст ответа: {response.text}\n"
+            f"Код ответа: {response.status_code}", response.status_code
+        )
+
+
+def send_request(session, timestamp, headers=None, endpoint=ENDPOINT,
+                 timeout=TIMEOUT, *, conditional=False, **kwargs):
+    """Отправляет запрос к API Yandex Practicum и проверяет статус-код.
+
+    В качестве сессии подходит как requests.Session, так и сам модуль
+    requests. Дополнительные аргументы передаются в session.get. При
+    conditional ответ 304 Not Modified считается успешным.
+    """
+    try:
+        with metrics.API_LATENCY.time(), PROFILER.stage("http"):
+            response = session.get(
+                url=endpoint,
+                headers=headers,
+                params={"from_date": timestamp},
+                timeout=timeout,
+                **kwargs,
+            )
+    except requests.exceptions.Timeout as error:
+        raise exceptions.RequestAPIYandexPracticumTimeout(
+            f"Превышен лимит выполнения запроса: {error}"
+        )
+    except requests.exceptions.ConnectionError as error:
+        raise exceptions.RequestAPIYandexPracticumConnectionError(
+            f"Ошибка соединения с API: {error}"
+        )
+    except requests.RequestException as error:
+        raise exceptions.RequestAPIYandexPracticumException(
+            f"Непредвиденные ошибки в получении ответа: {error}"
+        )
+    if not (
+        conditional and response.status_code == HTTPStatus.NOT_MODIFIED
+    ):
+        check_status_code(response, endpoint)
+    return response
+
+
+def request_api(session, timestamp, headers=None, endpoint=ENDPOINT,
+                timeout=TIMEOUT):
+    """Запрашивает API Yandex Practicum и возвращает разобранный ответ."""
+    response = send_request(session, timestamp, headers, endpoint, timeout)
+    with PROFILER.stage("decode"):
+        return response.json()
+
+
+def stream_api(session, timestamp, headers=None, endpoint=ENDPOINT,
+               timeout=TIMEOUT, chunk_size=STREAM_CHUNK_SIZE):
+    """Запрашивает API Yandex Practicum и возвращает HomeworkStream.
+
+    Тело ответа читается частями по chunk_size байт по мере итерации, а
+    соединение освобождается при закрытии потока.
+    """
+    response = send_request(
+        session, timestamp, headers, endpoint, timeout, stream=True
+    )
+    return HomeworkStream(response.iter_content(chunk_size), response)
+
+
+def content_digest(response):
+    """Возвращает хеш тела ответа без поля current_date или None.
+
+    API возвращает в current_date время ответа, поэтому тела ответов
+    без изменений в работах различаются только этим полем. Хеш хранится
+    для каждого подписчика, поэтому он возвращается компактным целым
+    числом из восьми байт.
+    """
+    content = getattr(response, "content", None)
+    if not isinstance(content, bytes):
+        return None
+    return int.from_bytes(hashlib.blake2b(
+        CURRENT_DATE_PATTERN.sub(b"", content), digest_size=8
+    ).digest(), "big")
+
+
+class CacheEntry:
+    """Валидаторы последнего ответа API для условного запроса."""
+
+    __slots__ = ("etag", "last_modified", "digest")
+
+    def __init__(self, etag=None, last_modified=None, digest=None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+
+    def conditional_headers(self):
+        """Возвращает заголовки условного запроса."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Кеш LRU валидаторов ответов API по токену и from_date.
+
+    Хранит ETag, Last-Modified и хеш тела ответа, но не сам ответ: при
+    совпадении ответ не изменился, и разбирать его не нужно.
+    """
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self):
+        """Доля запросов, ответ на которые не изменился."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key):
+        """Возвращает запись кеша или None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        """Запоминает запись, вытесняя самую старую при переполнении."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def record(self, hit):
+        """Учитывает результат проверки кеша в счетчиках."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        metrics.API_CACHE.inc(result="hit" if hit else "miss")
+
+
+class PracticumClient:
+    """Клиент API Yandex Practicum, переиспользующий соединения.
+
+    Если сессия не передана, создается requests.Session с пулом из
+    pool_size соединений keep-alive и заголовками headers по умолчанию.
+    Переданная сессия используется как есть, что удобно в тестах. Кеш
+    cache используется методом poll_api_answer для условных запросов.
+    """
+
+    def __init__(self, session=None, pool_size=POOL_SIZE, endpoint=ENDPOINT,
+                 timeout=TIMEOUT, headers=HEADERS, cache=None):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(headers)
+        self.session = session
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.cache = ResponseCache() if cache is None else cache
+
+    @staticmethod
+    def token_headers(token):
+        """Возвращает заголовки авторизации для токена token или None."""
+        if token is None:
+            return None
+        return {"Authorization": f"OAuth {token}"}
+
+    def get_api_answer(self, timestamp, token=None):
+        """Запрашивает статусы домашних работ для токена token."""
+        return request_api(
+            self.session, timestamp, self.token_headers(token),
+            self.endpoint, self.timeout
+        )
+
+    def poll_api_answer(self, timestamp, token=None):
+        """Запрашивает статусы работ, если они изменились.
+
+        Отправляет условный запрос с ETag и Last-Modified предыдущего ответа
+        для того же токена и from_date. Если сервер ответил 304 или тело
+        ответа без current_date совпало с предыдущим, возвращает
+        NOT_MODIFIED, не разбирая ответ.
+        """
+        answer, entry = self.conditional_api_answer(timestamp, token)
+        self.remember_answer(timestamp, token, entry)
+        return answer
+
+    def conditional_api_answer(self, timestamp, token=None):
+        """Выполняет условный запрос статусов работ, не изменяя кеш.
+
+        Возвращает ответ или NOT_MODIFIED и запись кеша для нового ответа
+        либо None. Запись следует сохранить методом remember_answer только
+        после обработки ответа: иначе при сбое доставки сообщений следующий
+        запрос вернет NOT_MODIFIED, и изменения будут потеряны.
+        """
+        entry = self.cache.get((token, timestamp))
+        digest = None if entry is None else entry.digest
+        return self.revalidate_answer(timestamp, token, entry, digest)
+
+    def revalidate_answer(self, timestamp, token=None, entry=None,
+                          digest=None):
+        """Выполняет условный запрос с валидаторами entry и хешем digest.
+
+        Возвращает то же, что conditional_api_answer, но валидаторы и хеш
+        предыдущего ответа хранит вызывающий: движок опроса держит их в
+        подписчике, а не в кеше LRU.
+        """
+        headers = dict(self.token_headers(token) or {})
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+        response = send_request(
+            self.session, timestamp, headers or None, self.endpoint,
+            self.timeout, conditional=entry is not None
+        )
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            self.cache.record(True)
+            return NOT_MODIFIED, None
+        previous, digest = digest, content_digest(response)
+        if digest is not None and digest == previous:
+            self.cache.record(True)
+            return NOT_MODIFIED, None
+        self.cache.record(False)
+        response_headers = getattr(response, "headers", None) or {}
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        entry = None
+        if etag or last_modified or digest is not None:
+            entry = CacheEntry(etag, last_modified, digest)
+        with PROFILER.stage("decode"):
+            return response.json(), entry
+
+    def remember_answer(self, timestamp, token, entry):
+        """Сохраняет запись кеша для ответа на запрос с from_date timestamp."""
+        if entry is not None:
+            self.cache.put((token, timestamp), entry)
+
+    def stream_api_answer(self, timestamp, token=None):
+        """Запрашивает статусы домашних работ и возвращает HomeworkStream."""
+        return stream_api(
+            self.session, timestamp, self.token_headers(token),
+            self.endpoint, self.timeout
+        )
+
+    def close(self):
+        """Закрывает соединения сессии."""
+        close = getattr(self.session, "close", None)
+        if close is not None:
+            close()
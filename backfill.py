@@ -0,0 +1,225 @@
+"""Воспроизведение истории статусов домашних работ подписчиков."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import homework
+from api_client import PracticumClient
+from constants import (CATCH_UP_CONCURRENCY, CATCH_UP_MIN_GAP,
+                       HOMEWORK_VERDICTS, MAX_MESSAGE_LENGTH, TELEGRAM_TOKEN)
+from dedup import StatusTracker
+from outbox import coalesce
+from quota import QUOTA
+from records import parse_homework
+from shutdown import SHUTDOWN
+from state import StateStore
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_HEADER = "Пока бот не работал, изменились статусы работ"
+
+
+def backfill_tenant(client, bot, statuses, tenant, from_date=0):
+    """Воспроизводит историю работ подписчика начиная с from_date.
+
+    Ответ API разбирается потоково, поэтому расход памяти не зависит от
+    длины истории. Сообщения отправляются только о статусах, которые
+    подписчику еще не доставлялись. Возвращает число отправленных сообщений.
+    """
+    sent = 0
+    stream = QUOTA.call(
+        client.stream_api_answer, from_date, tenant.practicum_token
+    )
+    with stream:
+        for item in stream:
+            record = parse_homework(item)
+            if not statuses.is_transition(
+                tenant.key, record.name, record.status
+            ):
+                continue
+            homework.send_chat_message(bot, tenant.chat_id, record.message)
+            statuses.remember(tenant.key, record.name, record.status)
+            tenant.last_message = record.message
+            sent += 1
+    if stream.current_date is not None:
+        tenant.timestamp = stream.current_date
+    return sent
+
+
+def backfill(client, bot, store, tenants, from_date=0):
+    """Воспроизводит историю работ для всех подписчиков.
+
+    Ошибка одного подписчика журналируется и не прерывает обработку
+    остальных. Возвращает число подписчиков, для которых произошла ошибка.
+    """
+    statuses = StatusTracker(store)
+    failed = 0
+    for tenant in tenants:
+        if SHUTDOWN.requested:
+            break
+        store.restore(tenant)
+        try:
+            sent = backfill_tenant(client, bot, statuses, tenant, from_date)
+        except Exception as error:
+            failed += 1
+            homework.handle_error(error)
+            continue
+        finally:
+            store.save(tenant)
+            store.maybe_flush()
+        logger.info(f"{tenant}: отправлено сообщений истории: {sent}.")
+    store.flush()
+    return failed
+
+
+def main(tenants_path, from_date=0, shards=1, shard_id=0):
+    """Воспроизводит историю работ подписчиков и завершает работу."""
+    tenants = homework.get_tenants(tenants_path, shards, shard_id)
+    store = StateStore()
+    client = PracticumClient()
+    try:
+        failed = backfill(
+            client, homework.LazyBot(TELEGRAM_TOKEN), store, tenants,
+            from_date
+        )
+    finally:
+        client.close()
+        store.close()
+    logger.info(
+        f"История воспроизведена для {len(tenants) - failed} "
+        f"из {len(tenants)} подписчиков."
+    )
+
+
+def collapse(items):
+    """Сворачивает промежуточные состояния каждой работы в итоговое.
+
+    Для работы остается запись с наибольшим date_updated, а при равном
+    времени - последняя в ответе. Порядок работ сохраняется.
+    """
+    latest = {}
+    for item in items:
+        record = parse_homework(item)
+        updated = item.get("date_updated") or ""
+        previous = latest.get(record.name)
+        if previous is None or updated >= previous[0]:
+            latest[record.name] = (updated, record)
+    return [record for _, record in latest.values()]
+
+
+def format_summary(records, limit=MAX_MESSAGE_LENGTH):
+    """Возвращает сообщения со сводкой изменений статусов работ.
+
+    Одно изменение отправляется обычным сообщением, а сводка, не
+    помещающаяся в одно сообщение Telegram, делится на несколько.
+    """
+    if len(records) == 1:
+        return [records[0].message]
+    header = f"{SUMMARY_HEADER} ({len(records)}):"
+    lines = [
+        (f"\"{record.name}\": {HOMEWORK_VERDICTS[record.status]}",)
+        for record in records
+    ]
+    return [
+        "\n".join([header, *(line for line, in group)])
+        for group in coalesce(lines, limit - len(header) - 1)
+    ]
+
+
+def catch_up_tenant(client, bot, statuses, tenant, from_date):
+    """Догоняет изменения работ подписчика начиная с from_date.
+
+    Пропущенное получается одним запросом, промежуточные состояния работ
+    сворачиваются, а о новых статусах отправляется одна сводка в чат.
+    Возвращает число работ в сводке.
+    """
+    stream = QUOTA.call(
+        client.stream_api_answer, from_date, tenant.practicum_token
+    )
+    with stream:
+        records = [
+            record for record in collapse(stream)
+            if statuses.is_transition(tenant.key, record.name, record.status)
+        ]
+    if records:
+        for message in format_summary(records):
+            homework.send_chat_message(bot, tenant.chat_id, message)
+            tenant.last_message = message
+        for record in records:
+            statuses.remember(tenant.key, record.name, record.status)
+    if stream.current_date is not None:
+        tenant.timestamp = stream.current_date
+    return len(records)
+
+
+def catch_up(client, bot, store, tenants, from_date=None,
+             concurrency=CATCH_UP_CONCURRENCY, min_gap=CATCH_UP_MIN_GAP,
+             now=None):
+    """Догоняет изменения работ подписчиков после простоя бота.
+
+    При from_date=None изменения запрашиваются от сохраненного курсора
+    подписчика и только если последний успешный опрос был больше чем
+    min_gap секунд назад. Курсор простаивающего подписчика не сдвигается,
+    поэтому он сам по себе не говорит о пропущенных опросах; для курсоров,
+    сохраненных без времени опроса, используется курсор.
+    Одновременно обрабатывается не более concurrency подписчиков, а запросы
+    к API ограничены общей квотой, поэтому перезапуск всех процессов не
+    приводит к всплеску запросов. Возвращает число подписчиков, для которых
+    произошла ошибка.
+    """
+    statuses = StatusTracker(store)
+    now = time.time() if now is None else now
+
+    def process(tenant):
+        if SHUTDOWN.requested:
+            return
+        restored = store.restore(tenant)
+        start = from_date
+        if start is None:
+            if not restored:
+                return
+            polled_at = store.load_poll_time(tenant.key) or tenant.timestamp
+            if now - polled_at < min_gap:
+                return
+            start = tenant.timestamp
+        polled_at = 0
+        try:
+            sent = catch_up_tenant(client, bot, statuses, tenant, start)
+            polled_at = int(time.time())
+        finally:
+            store.save(tenant, polled_at)
+            store.maybe_flush()
+        if sent:
+            logger.info(f"{tenant}: изменений работ в сводке: {sent}.")
+
+    failed = 0
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="catch-up"
+    ) as executor:
+        futures = [executor.submit(process, tenant) for tenant in tenants]
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                failed += 1
+                homework.handle_error(error)
+    store.flush()
+    return failed
+
+
+def catch_up_main(tenants_path, from_date=None, shards=1, shard_id=0):
+    """Догоняет изменения работ подписчиков перед началом опроса."""
+    tenants = homework.get_tenants(tenants_path, shards, shard_id)
+    store = StateStore()
+    client = PracticumClient(pool_size=CATCH_UP_CONCURRENCY)
+    try:
+        failed = catch_up(
+            client, homework.LazyBot(TELEGRAM_TOKEN), store, tenants,
+            from_date
+        )
+    finally:
+        client.close()
+        store.close()
+    logger.info(
+        f"Пропущенные изменения проверены для {len(tenants) - failed} "
+        f"из {len(tenants)} подписчиков."
+    )
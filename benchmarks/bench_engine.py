@@ -0,0 +1,216 @@
+"""Нагрузочный тест многопользовательского режима бота.
+
+Запускает заменители API Yandex Practicum и Telegram Bot API в отдельном
+процессе и опрашивает через них заданное число подписчиков. Результаты
+выводятся в формате JSON, чтобы сравнивать их между коммитами:
+
+    python -m benchmarks.bench_engine --tenants 1 100 10000 --output out.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import requests
+import telegram
+from telegram.utils.request import Request
+
+from aioengine import AsyncPollEngine
+from api_client import PracticumClient
+from benchmarks.fakes import ENDPOINT_PATH, serve
+from engine import PollEngine
+from outbox import Outbox
+from quota import QuotaManager
+from state import StateStore
+from tenants import Tenant
+from threadengine import ThreadedPollEngine
+
+BOT_TOKEN = "1234:benchmark"
+
+
+def percentile(values, fraction):
+    """Возвращает перцентиль fraction отсортированного списка."""
+    if not values:
+        return None
+    index = min(int(len(values) * fraction), len(values) - 1)
+    return values[index]
+
+
+def usage():
+    """Возвращает пиковый RSS в КБ и процессорное время в секундах."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_maxrss, usage.ru_utime + usage.ru_stime
+
+
+def git_revision():
+    """Возвращает хеш текущего коммита или None."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_engine(args, practicum_url, telegram_url, outbox_bot):
+    """Создает движок опроса, направленный на заменители."""
+    client = PracticumClient(
+        pool_size=args.concurrency, endpoint=practicum_url + ENDPOINT_PATH
+    )
+    outbox = Outbox(
+        outbox_bot, workers=args.outbox_workers,
+        global_rate=args.send_rate, global_burst=args.send_rate,
+        chat_rate=args.send_rate, chat_burst=args.send_rate,
+        coalesce_window=args.coalesce_window,
+    ).start()
+    store = StateStore(":memory:", flush_interval=3600)
+    quota = QuotaManager(args.api_rate, args.api_rate)
+    if args.mode == "async":
+        return AsyncPollEngine(
+            client, outbox_bot, store, args.concurrency, outbox, quota=quota
+        )
+    if args.mode == "threads":
+        return ThreadedPollEngine(
+            client, outbox_bot, store, args.concurrency, outbox, quota=quota
+        )
+    return PollEngine(client, outbox_bot, store, outbox, quota=quota)
+
+
+def bench(args, tenants_count, practicum_url, telegram_url):
+    """Выполняет один прогон для tenants_count подписчиков."""
+    bot = telegram.Bot(
+        token=BOT_TOKEN, base_url=f"{telegram_url}/bot",
+        request=Request(con_pool_size=args.outbox_workers + 4),
+    )
+    tenants = [
+        Tenant(f"token{number}", number + 1, 0)
+        for number in range(tenants_count)
+    ]
+    latencies_before = len(
+        requests.get(f"{telegram_url}/stats").json()["latencies"]
+    )
+    _, cpu_before = usage()
+    started = time.perf_counter()
+    if args.mode == "async":
+        async def build_and_run():
+            poll_engine = make_engine(args, practicum_url, telegram_url, bot)
+            for _ in range(args.cycles):
+                await poll_engine.run_cycle(tenants)
+            return poll_engine
+        poll_engine = asyncio.run(build_and_run())
+    else:
+        poll_engine = make_engine(args, practicum_url, telegram_url, bot)
+        for _ in range(args.cycles):
+            poll_engine.run_cycle(tenants)
+    polled = time.perf_counter() - started
+    drained = poll_engine.outbox.close(timeout=args.drain_timeout)
+    total = time.perf_counter() - started
+    max_rss, cpu_after = usage()
+    if args.mode == "threads":
+        poll_engine.executor.shutdown()
+    cache = poll_engine.client.cache
+    poll_engine.client.close()
+    latencies = sorted(
+        requests.get(f"{telegram_url}/stats").json()["latencies"]
+        [latencies_before:]
+    )
+    polls = tenants_count * args.cycles
+    return {
+        "mode": args.mode,
+        "tenants": tenants_count,
+        "cycles": args.cycles,
+        "polls": polls,
+        "poll_seconds": round(polled, 4),
+        "polls_per_sec": round(polls / polled, 2),
+        "total_seconds": round(total, 4),
+        "notifications": len(latencies),
+        "notify_p50_ms": _ms(percentile(latencies, 0.5)),
+        "notify_p99_ms": _ms(percentile(latencies, 0.99)),
+        "drained": drained,
+        "max_rss_kb": max_rss,
+        "cpu_seconds": round(cpu_after - cpu_before, 4),
+        "cache_hit_ratio": round(cache.hit_ratio, 4),
+    }
+
+
+def _ms(seconds):
+    """Переводит секунды в миллисекунды."""
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, nargs="+",
+                        default=[1, 100, 10000])
+    parser.add_argument("--mode", choices=("sync", "async", "threads"),
+                        default="async")
+    parser.add_argument("--cycles", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--outbox-workers", type=int, default=8)
+    parser.add_argument("--send-rate", type=float, default=10000,
+                        help="Ограничение частоты отправки сообщений.")
+    parser.add_argument("--coalesce-window", type=float, default=0.0)
+    parser.add_argument("--api-rate", type=float, default=1000000,
+                        help="Ограничение частоты запросов к API.")
+    parser.add_argument("--drain-timeout", type=float, default=120)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Задержка ответа заменителя API, с.")
+    parser.add_argument("--telegram-latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--homeworks", type=int, default=1,
+                        help="Число работ в каждом ответе API.")
+    parser.add_argument("--payload-size", type=int, default=0,
+                        help="Размер комментария ревьюера в каждой работе.")
+    parser.add_argument("--idle-rate", type=float, default=0.0,
+                        help="Доля подписчиков без изменений в работах.")
+    parser.add_argument("--etags", action="store_true",
+                        help="Заменитель API поддерживает ETag и 304.")
+    parser.add_argument("--output", help="Файл для результатов JSON.")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Запускает заменители и выполняет прогоны."""
+    args = parse_args(argv)
+    logging.getLogger().setLevel(args.log_level)
+    parent, child = multiprocessing.Pipe()
+    fakes = multiprocessing.Process(target=serve, daemon=True, args=(
+        child,
+        {"latency": args.latency, "error_rate": args.error_rate,
+         "homeworks": args.homeworks, "payload_size": args.payload_size,
+         "idle_rate": args.idle_rate, "etags": args.etags},
+        {"latency": args.telegram_latency},
+    ))
+    fakes.start()
+    practicum_url, telegram_url = parent.recv()
+    try:
+        results = [
+            bench(args, count, practicum_url, telegram_url)
+            for count in args.tenants
+        ]
+    finally:
+        parent.send("stop")
+        fakes.join(5)
+    report = json.dumps({
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "options": vars(args),
+        "results": results,
+    }, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
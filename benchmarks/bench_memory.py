@@ -0,0 +1,165 @@
+"""Микротест памяти, занимаемой подписчиками в многопользовательском режиме.
+
+Загружает реестр из заданного числа подписчиков и измеряет tracemalloc
+память, которую занимают объекты Tenant, очередь опросов PollQueue,
+статусы StatusTracker и состояние после двух циклов опроса PollEngine
+простаивающих подписчиков (без изменений в работах): кеш статусов для
+команд, валидаторы ответов и буфер хранилища. С параметром --delivered у
+каждого подписчика есть доставленный статус одной работы, а с --etags
+API возвращает ETag:
+
+    python -m benchmarks.bench_memory --tenants 10000 100000 --output out.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from api_client import PracticumClient
+from benchmarks.bench_engine import git_revision
+from engine import PollEngine
+from quota import QuotaManager
+from scheduler import PollQueue, spread
+from state import StateStore
+from tenants import load_tenants
+
+TARGET_BYTES = 500
+IDLE_ANSWER = b'{"homeworks": [], "current_date": 1700000000}'
+
+
+class IdleResponse:
+    """Ответ API без изменений в работах."""
+
+    status_code = 200
+    content = IDLE_ANSWER
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def json(self):
+        """Разбирает тело ответа."""
+        return json.loads(self.content)
+
+
+class IdleSession:
+    """Сессия, на все запросы возвращающая ответ без изменений в работах."""
+
+    def __init__(self, etags):
+        self.response = IdleResponse({"ETag": 'W/"idle"'} if etags else {})
+
+    def get(self, **kwargs):
+        """Возвращает ответ без изменений в работах."""
+        return self.response
+
+
+def write_registry(path, count):
+    """Записывает реестр из count подписчиков в файл JSON."""
+    records = [
+        {
+            "practicum_token": f"y0_AgAAAAA{number:030d}",
+            "chat_id": 100000000 + number,
+        }
+        for number in range(count)
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(records, file)
+
+
+def measure(function):
+    """Возвращает результат функции и прирост занятой памяти в байтах."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def bench(args, count, directory):
+    """Выполняет один прогон для count подписчиков."""
+    path = os.path.join(directory, f"tenants-{count}.json")
+    write_registry(path, count)
+    store = StateStore(":memory:", flush_interval=3600)
+    tracemalloc.start()
+    tenants, tenants_bytes = measure(lambda: load_tenants(path))
+
+    def build_queue():
+        spread(tenants, time.time())
+        return PollQueue(tenants)
+    queue, queue_bytes = measure(build_queue)
+    poll_engine = PollEngine(
+        PracticumClient(session=IdleSession(args.etags)), None, store,
+        quota=QuotaManager(rate=count, burst=2 * count),
+    )
+
+    def load_statuses():
+        for tenant in tenants:
+            poll_engine.statuses.is_transition(
+                tenant.key, "homework.zip", "approved"
+            )
+            if args.delivered:
+                poll_engine.statuses.remember(
+                    tenant.key, "homework.zip", "approved"
+                )
+        store.flush()
+    _, statuses_bytes = measure(load_statuses)
+
+    def poll():
+        for _ in range(2):
+            for tenant in tenants:
+                tenant.next_poll = 0
+            poll_engine.run_cycle(tenants)
+        store.flush()
+    _, poll_bytes = measure(poll)
+    tracemalloc.stop()
+    store.close()
+    total = tenants_bytes + queue_bytes + statuses_bytes + poll_bytes
+    return {
+        "tenants": count,
+        "queued": len(queue),
+        "tenant_bytes": round(tenants_bytes / count, 1),
+        "queue_bytes": round(queue_bytes / count, 1),
+        "statuses_bytes": round(statuses_bytes / count, 1),
+        "poll_bytes": round(poll_bytes / count, 1),
+        "bytes_per_tenant": round(total / count, 1),
+        "target_met": total / count < TARGET_BYTES,
+    }
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, nargs="+",
+                        default=[10000, 100000])
+    parser.add_argument("--delivered", action="store_true",
+                        help="Подписчики с доставленным статусом работы.")
+    parser.add_argument("--etags", action="store_true",
+                        help="API возвращает ETag для условных запросов.")
+    parser.add_argument("--output", help="Файл для результатов JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Выполняет прогоны и выводит результаты."""
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        results = [bench(args, count, directory) for count in args.tenants]
+    report = json.dumps({
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "options": vars(args),
+        "target_bytes": TARGET_BYTES,
+        "results": results,
+    }, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Микротест проверки и разбора ответа API Yandex Practicum.
+
+Сравнивает прежний разбор (check_response и parse_status с повторными
+обращениями к словарю и форматированием f-строки) с однопроходным
+records.decode_response на ответах разного размера. Прежний разбор
+собирал сообщения всех работ, а decode_response не собирает их до
+обращения, поэтому отдельно измеряется худший случай, когда сменились
+статусы всех работ и нужны все сообщения. Время берется лучшим из repeat
+повторов, а разброс показывает, насколько медиана повторов хуже лучшего:
+
+    python -m benchmarks.bench_parse --homeworks 1 10 100 --output out.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+
+from benchmarks.bench_engine import git_revision
+from constants import HOMEWORK_VERDICTS
+from records import decode_response
+
+
+def legacy_check_response(response):
+    """Прежняя проверка ответа API."""
+    if not response:
+        raise TypeError("Нет ответа от API")
+    if not isinstance(response, dict):
+        raise TypeError(
+            "Информация в ответе предоставлена не в виде словаря"
+        )
+    if response.get("homeworks") is None:
+        raise KeyError(
+            "В ответе отсутствует информация о домашних работах."
+        )
+    if not isinstance(response.get("homeworks"), list):
+        raise TypeError(
+            "Информация о домашних работах в ответе предоставлена "
+            "не в виде списка."
+        )
+
+
+def legacy_parse_status(homework):
+    """Прежний разбор информации о домашней работе."""
+    if not homework.get("homework_name"):
+        raise KeyError("В информации о домашней работе отсутствует ее имя.")
+    homework_name = homework.get("homework_name")
+    if not homework.get("status"):
+        raise KeyError("В информации о домашней работе отсутствует статус")
+    if homework.get("status") not in HOMEWORK_VERDICTS.keys():
+        raise ValueError(
+            f"Статус проверки домашнего задяния: {homework.get('status')} "
+            "не соответствует ожидаемым."
+        )
+    verdict = HOMEWORK_VERDICTS.get(homework.get("status"))
+    return f"Изменился статус проверки работы \"{homework_name}\". {verdict}"
+
+
+def legacy_decode(response):
+    """Разбирает ответ API прежним способом, как это делал движок."""
+    legacy_check_response(response)
+    homeworks = response.get("homeworks")
+    updates = [(item, legacy_parse_status(item)) for item in homeworks]
+    return updates, response.get("current_date")
+
+
+def make_response(homeworks):
+    """Возвращает ответ API с заданным числом работ."""
+    statuses = list(HOMEWORK_VERDICTS)
+    return {
+        "homeworks": [
+            {
+                "id": index,
+                "homework_name": f"user__homework_{index}.zip",
+                "status": statuses[index % len(statuses)],
+                "reviewer_comment": "Комментарий ревьюера.",
+                "lesson_name": "Итоговый проект",
+            }
+            for index in range(homeworks)
+        ],
+        "current_date": 1700000000,
+    }
+
+
+def decode_messages(response):
+    """Разбирает ответ и собирает сообщения всех работ."""
+    records, current_date = decode_response(response)
+    return [record.message for record in records], current_date
+
+
+def bench(functions, response, repeat, number):
+    """Возвращает лучшее время одного вызова каждой функции и разброс.
+
+    Функции измеряются поочередно в каждом повторе, чтобы изменения
+    нагрузки машины сказывались на всех одинаково. Время возвращается в
+    микросекундах.
+    """
+    timers = [timeit.Timer(lambda f=f: f(response)) for f in functions]
+    times = [[] for _ in functions]
+    for _ in range(repeat):
+        for timer, measured in zip(timers, times):
+            measured.append(timer.timeit(number))
+    return [
+        (min(measured) / number * 1e6,
+         statistics.median(measured) / min(measured) - 1)
+        for measured in times
+    ]
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--homeworks", type=int, nargs="+",
+                        default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=25)
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--output", help="Файл для результатов JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Выполняет прогоны и выводит результаты."""
+    args = parse_args(argv)
+    results = []
+    for count in args.homeworks:
+        response = make_response(count)
+        (legacy, legacy_spread), (fast, fast_spread), (
+            messages, messages_spread
+        ) = bench(
+            (legacy_decode, decode_response, decode_messages), response,
+            args.repeat, args.number,
+        )
+        results.append({
+            "homeworks": count,
+            "legacy_us": round(legacy, 3),
+            "fast_us": round(fast, 3),
+            "messages_us": round(messages, 3),
+            "speedup": round(legacy / fast, 2),
+            "messages_speedup": round(legacy / messages, 2),
+            "spread": round(
+                max(legacy_spread, fast_spread, messages_spread), 3
+            ),
+        })
+    report = json.dumps({
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "options": vars(args),
+        "results": results,
+    }, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
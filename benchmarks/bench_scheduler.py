@@ -0,0 +1,130 @@
+"""Микротест очереди опросов подписчиков.
+
+Сравнивает прежний выбор подписчиков просмотром всего списка на каждом
+цикле (due_tenants и seconds_until_next) с очередью scheduler.PollQueue.
+Опросы подписчиков равномерно распределены по интервалу опроса, а время
+моделируется циклами с шагом --tick секунд:
+
+    python -m benchmarks.bench_scheduler --tenants 100000 --output out.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from benchmarks.bench_engine import git_revision
+from constants import RETRY_PERIOD
+from scheduler import PollQueue
+from tenants import Tenant
+
+
+def legacy_due_tenants(tenants, now):
+    """Прежний выбор подписчиков, время опроса которых наступило."""
+    return [tenant for tenant in tenants if tenant.next_poll <= now]
+
+
+def legacy_seconds_until_next(tenants, now):
+    """Прежний расчет времени до ближайшего опроса."""
+    if not tenants:
+        return RETRY_PERIOD
+    return max(min(tenant.next_poll for tenant in tenants) - now, 0)
+
+
+def make_tenants(count, seed):
+    """Возвращает подписчиков со случайным временем первого опроса."""
+    rng = random.Random(seed)
+    tenants = [Tenant(f"token{number}", number) for number in range(count)]
+    for tenant in tenants:
+        tenant.next_poll = rng.uniform(0, RETRY_PERIOD)
+    return tenants
+
+
+def reschedule(tenants, now):
+    """Назначает следующий опрос подписчиков через интервал опроса."""
+    for tenant in tenants:
+        tenant.next_poll = now + RETRY_PERIOD
+
+
+def run_legacy(tenants, ticks, tick):
+    """Моделирует циклы опроса с просмотром всех подписчиков."""
+    dispatched = 0
+    started = time.perf_counter_ns()
+    for number in range(ticks):
+        now = number * tick
+        due = legacy_due_tenants(tenants, now)
+        reschedule(due, now)
+        legacy_seconds_until_next(tenants, now)
+        dispatched += len(due)
+    return time.perf_counter_ns() - started, dispatched
+
+
+def run_queue(tenants, ticks, tick):
+    """Моделирует циклы опроса с очередью PollQueue."""
+    dispatched = 0
+    started = time.perf_counter_ns()
+    queue = PollQueue(tenants)
+    build = time.perf_counter_ns() - started
+    for number in range(ticks):
+        now = number * tick
+        due = queue.pop_due(now)
+        reschedule(due, now)
+        queue.extend(due)
+        queue.seconds_until_next(now)
+        dispatched += len(due)
+    return time.perf_counter_ns() - started, dispatched, build
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--ticks", type=int, default=1200,
+                        help="Число моделируемых циклов опроса.")
+    parser.add_argument("--tick", type=float, default=1.0,
+                        help="Шаг модельного времени между циклами, с.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Файл для результатов JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Выполняет прогоны и выводит результаты."""
+    args = parse_args(argv)
+    results = []
+    for count in args.tenants:
+        legacy_ns, legacy_dispatched = run_legacy(
+            make_tenants(count, args.seed), args.ticks, args.tick
+        )
+        queue_ns, queue_dispatched, build_ns = run_queue(
+            make_tenants(count, args.seed), args.ticks, args.tick
+        )
+        results.append({
+            "tenants": count,
+            "dispatches": queue_dispatched,
+            "legacy_tick_us": round(legacy_ns / args.ticks / 1e3, 3),
+            "queue_tick_us": round(queue_ns / args.ticks / 1e3, 3),
+            "legacy_dispatch_us": round(
+                legacy_ns / max(legacy_dispatched, 1) / 1e3, 3
+            ),
+            "queue_dispatch_us": round(
+                queue_ns / max(queue_dispatched, 1) / 1e3, 3
+            ),
+            "queue_build_ms": round(build_ns / 1e6, 3),
+        })
+    report = json.dumps({
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "options": vars(args),
+        "results": results,
+    }, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Нагрузочный тест отправки сообщений в Telegram.
+
+Запускает заменитель Telegram Bot API в отдельном процессе и отправляет
+через него сообщения из нескольких потоков, как очередь отправки outbox.
+Сравниваются бот python-telegram-bot по умолчанию (пул из одного
+соединения), боты общего пула botpool.BotPool и RawBot:
+
+    python -m benchmarks.bench_send --messages 5000 --threads 8
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import telegram
+
+from benchmarks.bench_engine import git_revision, percentile, usage
+from benchmarks.fakes import serve
+from botpool import BotPool
+
+BOT_TOKEN = "1234:benchmark"
+SENDERS = ("default", "library", "raw")
+
+
+def make_bot(sender, args, telegram_url):
+    """Возвращает бота и пул, который нужно закрыть после прогона."""
+    if sender == "default":
+        bot = telegram.Bot(token=BOT_TOKEN, base_url=f"{telegram_url}/bot")
+        return bot, None
+    pool = BotPool(
+        pool_size=args.pool_size, sender=sender, base_url=telegram_url
+    )
+    return pool.get(BOT_TOKEN), pool
+
+
+def bench(args, sender, telegram_url):
+    """Выполняет один прогон отправки сообщений."""
+    bot, pool = make_bot(sender, args, telegram_url)
+    bot.send_message(1, "warmup")
+
+    def send(number):
+        started = time.perf_counter()
+        bot.send_message(number % args.chats + 1, f"Сообщение {number}")
+        return time.perf_counter() - started
+
+    _, cpu_before = usage()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        latencies = sorted(executor.map(send, range(args.messages)))
+    elapsed = time.perf_counter() - started
+    _, cpu_after = usage()
+    if pool is not None:
+        pool.close()
+    cpu = cpu_after - cpu_before
+    return {
+        "sender": sender,
+        "messages": args.messages,
+        "threads": args.threads,
+        "seconds": round(elapsed, 4),
+        "msgs_per_sec": round(args.messages / elapsed, 2),
+        "send_p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "send_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "cpu_seconds": round(cpu, 4),
+        "cpu_us_per_msg": round(cpu / args.messages * 1e6, 1),
+    }
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--senders", nargs="+", choices=SENDERS,
+                        default=list(SENDERS))
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=8,
+                        help="Размер общего пула соединений.")
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--telegram-latency", type=float, default=0.0,
+                        help="Задержка ответа заменителя Bot API, с.")
+    parser.add_argument("--output", help="Файл для результатов JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Запускает заменитель и выполняет прогоны."""
+    args = parse_args(argv)
+    parent, child = multiprocessing.Pipe()
+    fakes = multiprocessing.Process(target=serve, daemon=True, args=(
+        child, {}, {"latency": args.telegram_latency},
+    ))
+    fakes.start()
+    _, telegram_url = parent.recv()
+    try:
+        results = [
+            bench(args, sender, telegram_url) for sender in args.senders
+        ]
+    finally:
+        parent.send("stop")
+        fakes.join(5)
+    report = json.dumps({
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "options": vars(args),
+        "results": results,
+    }, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
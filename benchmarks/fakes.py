@@ -0,0 +1,179 @@
+"""Локальные заменители API Yandex Practicum и Telegram Bot API."""
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ENDPOINT_PATH = "/api/user_api/homework_statuses/"
+STATUSES = ("reviewing", "approved", "rejected")
+SERVED_AT_PATTERN = re.compile(r"@(\d+)")
+
+
+class FakeServer(ThreadingHTTPServer):
+    """Многопоточный HTTP сервер с параметрами заменителя."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, handler, latency=0.0, error_rate=0.0, homeworks=1,
+                 payload_size=0, idle_rate=0.0, etags=False):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.homeworks = homeworks
+        self.payload_size = payload_size
+        self.idle_rate = idle_rate
+        self.etags = etags
+        self.counters = {}
+        self.latencies = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        """Адрес сервера."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов без журналирования каждого запроса."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        """Не журналирует каждый запрос."""
+
+    def send_json(self, data, status=HTTPStatus.OK, headers=None):
+        """Отправляет ответ в формате JSON."""
+        body = b"" if data is None else json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PracticumHandler(QuietHandler):
+    """Заменитель API Yandex Practicum.
+
+    На каждый запрос токена возвращает homeworks работ, статусы которых
+    меняются по кругу. В имя работы добавляется время ответа в
+    наносекундах, чтобы заменитель Telegram мог посчитать задержку
+    уведомления. Доля idle_rate токенов не имеет изменений: для них
+    возвращается пустой список работ, а при etags - и заголовок ETag с
+    ответом 304 на условный запрос.
+    """
+
+    def send_idle(self, token):
+        """Отвечает токену, работы которого не меняются."""
+        headers = {}
+        if self.server.etags:
+            headers["ETag"] = f'"{token}-idle"'
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                return self.send_json(None, HTTPStatus.NOT_MODIFIED, headers)
+        self.send_json(
+            {"homeworks": [], "current_date": int(time.time())},
+            headers=headers,
+        )
+
+    def do_GET(self):
+        """Отвечает на запрос статусов домашних работ."""
+        url = urlparse(self.path)
+        if url.path != ENDPOINT_PATH:
+            return self.send_json(
+                {"detail": "Not found"}, HTTPStatus.NOT_FOUND
+            )
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if random.random() < server.error_rate:
+            return self.send_json(
+                {"detail": "fake error"}, HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+        token = self.headers.get("Authorization", "").split()[-1]
+        if server.idle_rate and random.Random(token).random() < (
+            server.idle_rate
+        ):
+            return self.send_idle(token)
+        with server.lock:
+            number = server.counters.get(token, 0)
+            server.counters[token] = number + 1
+        served_at = time.time_ns()
+        comment = "x" * server.payload_size
+        self.send_json({
+            "homeworks": [
+                {
+                    "id": index,
+                    "homework_name": f"{token}-{index}@{served_at}",
+                    "status": STATUSES[(number + index) % len(STATUSES)],
+                    "reviewer_comment": comment,
+                    "lesson_name": "Benchmark",
+                    "date_updated": "2020-02-13T14:40:57Z",
+                }
+                for index in range(server.homeworks)
+            ],
+            "current_date": int(parse_qs(url.query)["from_date"][0]) + 1,
+        })
+
+
+class TelegramHandler(QuietHandler):
+    """Заменитель Telegram Bot API.
+
+    Принимает sendMessage и считает задержку от ответа заменителя API до
+    получения сообщения. GET /stats возвращает собранные задержки.
+    """
+
+    message_ids = itertools.count(1)
+
+    def do_GET(self):
+        """Отдает собранные задержки уведомлений."""
+        if self.path != "/stats":
+            return self.send_json({"ok": False}, HTTPStatus.NOT_FOUND)
+        with self.server.lock:
+            self.send_json({"latencies": list(self.server.latencies)})
+
+    def do_POST(self):
+        """Принимает вызов метода Bot API."""
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if not self.path.endswith("/sendMessage"):
+            return self.send_json({"ok": False}, HTTPStatus.NOT_FOUND)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if "json" in self.headers.get("Content-Type", ""):
+            data = json.loads(body)
+        else:
+            data = {
+                key: values[0]
+                for key, values in parse_qs(body.decode()).items()
+            }
+        received_at = time.time_ns()
+        latencies = [
+            (received_at - int(served_at)) / 1e9
+            for served_at in SERVED_AT_PATTERN.findall(data.get("text", ""))
+        ]
+        with self.server.lock:
+            self.server.latencies.extend(latencies)
+        self.send_json({"ok": True, "result": {
+            "message_id": next(self.message_ids),
+            "date": int(time.time()),
+            "chat": {"id": int(data.get("chat_id", 0)), "type": "private"},
+            "text": data.get("text", ""),
+        }})
+
+
+def serve(connection, practicum_options, telegram_options):
+    """Запускает оба заменителя и передает их адреса через connection."""
+    practicum = FakeServer(PracticumHandler, **practicum_options)
+    telegram = FakeServer(TelegramHandler, **telegram_options)
+    for server in (practicum, telegram):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection.send((practicum.url, telegram.url))
+    connection.recv()
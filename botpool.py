@@ -0,0 +1,181 @@
+"""Общий пул ботов Telegram и HTTP соединений для отправки сообщений."""
+import json
+import socket
+import threading
+
+from constants import (TELEGRAM_API_URL, TELEGRAM_CONNECT_TIMEOUT,
+                       TELEGRAM_POOL_SIZE, TELEGRAM_READ_TIMEOUT,
+                       TELEGRAM_SENDER)
+
+SENDERS = ("library", "raw")
+KEEPALIVE_OPTIONS = (
+    ("TCP_KEEPIDLE", 120), ("TCP_KEEPINTVL", 30), ("TCP_KEEPCNT", 8),
+)
+
+
+def keepalive_socket_options():
+    """Возвращает параметры сокета с проверкой соединения keep-alive."""
+    from urllib3.connection import HTTPConnection
+
+    options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    ]
+    for name, value in KEEPALIVE_OPTIONS:
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+def raise_telegram_error(status, data):
+    """Возбуждает исключение python-telegram-bot для ошибки Bot API.
+
+    Ошибки соответствуют тем, что возбуждает сама библиотека, поэтому
+    выключатель Telegram и очередь отправки обрабатывают их одинаково.
+    """
+    from telegram import error
+
+    description = data.get("description") or f"Ошибка Bot API ({status})"
+    retry_after = (data.get("parameters") or {}).get("retry_after")
+    if retry_after:
+        raise error.RetryAfter(retry_after)
+    if status in (401, 403):
+        raise error.Unauthorized(description)
+    if status == 400:
+        raise error.BadRequest(description)
+    if status == 404:
+        raise error.InvalidToken()
+    if status == 409:
+        raise error.Conflict(description)
+    raise error.NetworkError(f"{description} ({status})")
+
+
+class RawBot:
+    """Отправитель сообщений напрямую через пул соединений urllib3.
+
+    Поддерживает только send_message и не создает объектов
+    python-telegram-bot для запросов и ответов, поэтому обходится дешевле
+    библиотечного бота. Ошибки возбуждаются классами исключений библиотеки.
+    """
+
+    def __init__(self, token, connections, base_url=TELEGRAM_API_URL):
+        self.token = token
+        self.connections = connections
+        self.url = f"{base_url}/bot{token}/sendMessage"
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Отправляет сообщение и возвращает ответ Bot API."""
+        import urllib3
+
+        body = json.dumps(
+            {"chat_id": chat_id, "text": text, **kwargs}
+        ).encode()
+        try:
+            response = self.connections.request(
+                "POST", self.url, body=body,
+                headers={"Content-Type": "application/json"},
+            )
+        except urllib3.exceptions.HTTPError as http_error:
+            from telegram import error
+
+            if isinstance(http_error, urllib3.exceptions.TimeoutError):
+                raise error.TimedOut() from http_error
+            raise error.NetworkError(
+                f"Ошибка соединения с Bot API: {http_error}"
+            ) from http_error
+        try:
+            data = json.loads(response.data)
+        except ValueError:
+            data = {}
+        if not 200 <= response.status <= 299 or not data.get("ok"):
+            raise_telegram_error(response.status, data)
+        return data["result"]
+
+
+class BotPool:
+    """Боты Telegram, разделяющие один пул HTTP соединений.
+
+    По умолчанию каждый бот python-telegram-bot создает свой пул из одного
+    соединения, и потоки очереди отправки ожидают друг друга. Боты пула
+    используют общий пул из pool_size соединений keep-alive с заданными
+    таймаутами. При sender="raw" вместо библиотечных ботов создаются RawBot,
+    отправляющие запросы напрямую.
+    """
+
+    def __init__(self, pool_size=TELEGRAM_POOL_SIZE,
+                 connect_timeout=TELEGRAM_CONNECT_TIMEOUT,
+                 read_timeout=TELEGRAM_READ_TIMEOUT, sender=TELEGRAM_SENDER,
+                 base_url=TELEGRAM_API_URL):
+        if sender not in SENDERS:
+            raise ValueError(
+                f"Способ отправки {sender} должен быть одним из {SENDERS}."
+            )
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.sender = sender
+        self.base_url = base_url
+        self._bots = {}
+        self._request = None
+        self._connections = None
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        """Возвращает бота с токеном token, создавая его при первом вызове."""
+        with self._lock:
+            bot = self._bots.get(token)
+            if bot is None:
+                bot = self._bots[token] = self._make_bot(token)
+            return bot
+
+    def _make_bot(self, token):
+        """Создает бота, использующего общий пул соединений."""
+        if self.sender == "raw":
+            return RawBot(token, self._raw_connections(), self.base_url)
+        import telegram
+
+        return telegram.Bot(
+            token=token, base_url=f"{self.base_url}/bot",
+            request=self._library_request(),
+        )
+
+    def _library_request(self):
+        """Возвращает общий объект Request python-telegram-bot."""
+        if self._request is None:
+            from telegram.utils.request import Request
+
+            self._request = Request(
+                con_pool_size=self.pool_size,
+                connect_timeout=self.connect_timeout,
+                read_timeout=self.read_timeout,
+            )
+        return self._request
+
+    def _raw_connections(self):
+        """Возвращает общий пул соединений urllib3."""
+        if self._connections is None:
+            import urllib3
+
+            self._connections = urllib3.PoolManager(
+                maxsize=self.pool_size,
+                timeout=urllib3.Timeout(
+                    connect=self.connect_timeout, read=self.read_timeout
+                ),
+                retries=False,
+                headers={"Connection": "keep-alive"},
+                socket_options=keepalive_socket_options(),
+            )
+        return self._connections
+
+    def close(self):
+        """Закрывает соединения пула."""
+        with self._lock:
+            if self._request is not None:
+                self._request.stop()
+            if self._connections is not None:
+                self._connections.clear()
+            self._bots = {}
+            self._request = None
+            self._connections = None
+
+
+BOTS = BotPool()
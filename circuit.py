@@ -0,0 +1,172 @@
+"""Автоматические выключатели запросов к внешним сервисам."""
+import logging
+import threading
+import time
+
+import exceptions
+import metrics
+from constants import (CIRCUIT_FAILURE_THRESHOLD,
+                       CIRCUIT_MAX_RECOVERY_TIMEOUT, CIRCUIT_RECOVERY_TIMEOUT)
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Автоматический выключатель запросов к сервису name.
+
+    После failure_threshold ошибок подряд из числа errors выключатель
+    размыкается, и запросы к сервису отклоняются исключением
+    CircuitOpenException без обращения к сети. Через recovery_timeout секунд
+    выключатель пропускает один пробный запрос: при успехе он замыкается, а
+    при ошибке снова размыкается на вдвое больший срок, но не дольше
+    max_recovery_timeout. Ошибки из ignore, как и любые ответы сервиса,
+    считаются признаком его доступности. Вместо кортежей классов errors и
+    ignore можно передать функции, возвращающие их: так классы исключений
+    тяжелых библиотек импортируются только при первой ошибке.
+    """
+
+    def __init__(self, name, errors, ignore=(),
+                 failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 recovery_timeout=CIRCUIT_RECOVERY_TIMEOUT,
+                 max_recovery_timeout=CIRCUIT_MAX_RECOVERY_TIMEOUT,
+                 clock=time.monotonic):
+        self.name = name
+        self.errors = errors
+        self.ignore = ignore
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Замыкает выключатель и сбрасывает счетчики ошибок."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.openings = 0
+            self._retry_at = 0
+
+    def is_failure(self, error):
+        """Проверяет, говорит ли ошибка о недоступности сервиса.
+
+        Проверяется как само исключение, так и исключение, из которого оно
+        было возбуждено.
+        """
+        errors, ignore = self.errors, self.ignore
+        if callable(errors):
+            errors = self.errors = errors()
+        if callable(ignore):
+            ignore = self.ignore = ignore()
+        for candidate in (error, error.__cause__):
+            if isinstance(candidate, ignore):
+                return False
+            if isinstance(candidate, errors):
+                return True
+        return False
+
+    def retry_after(self):
+        """Возвращает число секунд до следующего пробного запроса."""
+        if self.state == CLOSED:
+            return 0
+        return max(self._retry_at - self.clock(), 0)
+
+    def check(self):
+        """Разрешает запрос к сервису или возбуждает CircuitOpenException."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = self.clock()
+            if now >= self._retry_at:
+                self.state = HALF_OPEN
+                self._retry_at = now + self._timeout()
+                logger.info(f"Пробный запрос к сервису {self.name}.")
+                return
+            retry_after = self._retry_at - now
+        metrics.CIRCUIT_REJECTED.inc(upstream=self.name)
+        raise exceptions.CircuitOpenException(
+            f"Сервис {self.name} недоступен, повторная попытка через "
+            f"{retry_after:.0f} с.", retry_after
+        )
+
+    def record_success(self):
+        """Учитывает ответ сервиса и замыкает выключатель."""
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Сервис {self.name} снова доступен.")
+            self.state = CLOSED
+            self.failures = 0
+            self.openings = 0
+
+    def record_failure(self, error):
+        """Учитывает ошибку запроса к сервису.
+
+        Возвращает True, если выключатель разомкнулся из-за этой ошибки.
+        """
+        if not self.is_failure(error):
+            self.record_success()
+            return False
+        with self._lock:
+            self.failures += 1
+            if self.state == CLOSED and (
+                self.failures < self.failure_threshold
+            ):
+                return False
+            opened = self.state == CLOSED
+            self.state = OPEN
+            self.openings += 1
+            self._retry_at = self.clock() + self._timeout()
+        if opened:
+            metrics.CIRCUIT_OPENED.inc(upstream=self.name)
+            logger.critical(
+                f"Сервис {self.name} недоступен после {self.failures} "
+                f"ошибок подряд, запросы приостановлены: {error}"
+            )
+        return opened
+
+    def call(self, function, *args, **kwargs):
+        """Вызывает функцию запроса к сервису через выключатель."""
+        self.check()
+        try:
+            result = function(*args, **kwargs)
+        except Exception as error:
+            self.record_failure(error)
+            raise
+        self.record_success()
+        return result
+
+    def _timeout(self):
+        """Возвращает срок, на который размыкается выключатель."""
+        return min(
+            self.recovery_timeout * 2 ** max(self.openings - 1, 0),
+            self.max_recovery_timeout,
+        )
+
+
+PRACTICUM = CircuitBreaker("API Yandex Practicum", (
+    exceptions.RequestAPIYandexPracticumTimeout,
+    exceptions.RequestAPIYandexPracticumConnectionError,
+    exceptions.ServerErrorStatusCodeException,
+))
+
+
+def _telegram_errors():
+    """Возвращает ошибки Telegram, говорящие о недоступности сервиса."""
+    from telegram.error import NetworkError
+    return (NetworkError,)
+
+
+def _telegram_ignored_errors():
+    """Возвращает ошибки Telegram, относящиеся к отдельному запросу."""
+    from telegram.error import BadRequest
+    return (BadRequest,)
+
+
+TELEGRAM = CircuitBreaker(
+    "Telegram", _telegram_errors, ignore=_telegram_ignored_errors,
+)
@@ -0,0 +1,165 @@
+"""Команды /status и /history, отвечающие из кеша без запросов к API."""
+import logging
+import threading
+import time
+from collections import deque
+
+from constants import (COMMAND_WORKERS, HISTORY_SIZE, HOMEWORK_VERDICTS,
+                       TELEGRAM_TOKEN)
+
+logger = logging.getLogger(__name__)
+
+NO_DATA_MESSAGE = "Информации о ваших работах пока нет."
+NOT_SUBSCRIBED_MESSAGE = "Этот чат не подписан на уведомления бота."
+
+
+def _format_time(timestamp):
+    """Форматирует время в виде ДД.ММ.ГГГГ ЧЧ:ММ."""
+    return time.strftime("%d.%m.%Y %H:%M", time.localtime(timestamp))
+
+
+class StatusCache:
+    """Последние известные статусы работ и история их смены.
+
+    Заполняется движком опроса по ответам API, поэтому команды
+    пользователей не приводят к дополнительным запросам к API. После
+    перезапуска статусы берутся из хранилища состояния.
+    """
+
+    def __init__(self, store=None, history_size=HISTORY_SIZE):
+        self.store = store
+        self.history_size = history_size
+        self._statuses = {}
+        self._checked = {}
+        self._history = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, records, now=None):
+        """Запоминает статусы работ из ответа API."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._checked[key] = now
+            if not records:
+                return
+            statuses = self._statuses.get(key)
+            if statuses is None:
+                statuses = self._statuses[key] = self._saved(key)
+            for record in records:
+                statuses[record.name] = record.status
+
+    def _saved(self, key):
+        """Возвращает сохраненные в хранилище статусы работ подписчика."""
+        if self.store is None:
+            return {}
+        return dict(self.store.load_verdicts(key))
+
+    def record_transition(self, key, homework_name, status, now=None):
+        """Добавляет смену статуса работы в историю подписчика."""
+        now = time.time() if now is None else now
+        with self._lock:
+            history = self._history.get(key)
+            if history is None:
+                history = self._history[key] = deque(
+                    maxlen=self.history_size
+                )
+            history.append((now, homework_name, status))
+
+    def statuses(self, key):
+        """Возвращает статусы работ и время последней проверки."""
+        with self._lock:
+            statuses = self._statuses.get(key)
+            checked = self._checked.get(key)
+            if statuses is not None:
+                return dict(statuses), checked
+        return self._saved(key), checked
+
+    def history(self, key):
+        """Возвращает историю смены статусов работ подписчика."""
+        with self._lock:
+            return list(self._history.get(key, ()))
+
+
+def format_status(statuses, checked):
+    """Формирует ответ на команду /status."""
+    if not statuses:
+        return NO_DATA_MESSAGE
+    lines = [
+        f"\"{name}\": {HOMEWORK_VERDICTS.get(status, status)}"
+        for name, status in sorted(statuses.items())
+    ]
+    if checked is not None:
+        lines.append(f"Последняя проверка: {_format_time(checked)}.")
+    return "\n".join(lines)
+
+
+def format_history(history):
+    """Формирует ответ на команду /history."""
+    if not history:
+        return NO_DATA_MESSAGE
+    return "\n".join(
+        f"{_format_time(when)} \"{name}\": "
+        f"{HOMEWORK_VERDICTS.get(status, status)}"
+        for when, name, status in history
+    )
+
+
+class CommandHandlers:
+    """Обработчики команд бота для подписчиков из реестра."""
+
+    def __init__(self, cache, tenants):
+        self.cache = cache
+        self.chats = {}
+        for tenant in tenants:
+            self.chats.setdefault(tenant.chat_id, []).append(tenant.key)
+
+    def status_text(self, chat_id):
+        """Возвращает ответ на /status для чата chat_id."""
+        keys = self.chats.get(str(chat_id))
+        if not keys:
+            return NOT_SUBSCRIBED_MESSAGE
+        return "\n\n".join(
+            format_status(*self.cache.statuses(key)) for key in keys
+        )
+
+    def history_text(self, chat_id):
+        """Возвращает ответ на /history для чата chat_id."""
+        keys = self.chats.get(str(chat_id))
+        if not keys:
+            return NOT_SUBSCRIBED_MESSAGE
+        return "\n\n".join(
+            format_history(self.cache.history(key)) for key in keys
+        )
+
+    def status(self, update, context):
+        """Отвечает на команду /status."""
+        update.effective_message.reply_text(
+            self.status_text(update.effective_chat.id)
+        )
+
+    def history(self, update, context):
+        """Отвечает на команду /history."""
+        update.effective_message.reply_text(
+            self.history_text(update.effective_chat.id)
+        )
+
+
+def start_commands(cache, tenants, workers=COMMAND_WORKERS):
+    """Запускает прием команд в отдельных потоках и возвращает Updater.
+
+    Команды обрабатываются пулом из workers потоков диспетчера, поэтому
+    не задерживают опрос API.
+    """
+    from telegram.ext import CommandHandler, Updater
+
+    handlers = CommandHandlers(cache, tenants)
+    updater = Updater(token=TELEGRAM_TOKEN, workers=workers)
+    dispatcher = updater.dispatcher
+    dispatcher.add_handler(
+        CommandHandler("status", handlers.status, run_async=True)
+    )
+    dispatcher.add_handler(
+        CommandHandler("history", handlers.history, run_async=True)
+    )
+    updater.start_polling(drop_pending_updates=True)
+    logger.info("Прием команд /status и /history запущен.")
+    return updater
@@ -1,25 +1,39 @@
+import atexit
+import json
+import logging
+import logging.config
+import logging.handlers
+import queue
+
+from constants import (LOG_BACKUP_COUNT, LOG_FILE, LOG_FORMAT, LOG_MAX_BYTES,
+                       LOG_QUEUE)
+
 LOGGING_CONFIG = {
     'version': 1,
-    'disable_existing_loggers': True,
+    'disable_existing_loggers': False,
     'formatters': {
         'standard': {
             'format': '%(asctime)s %(name)s [%(levelname)s]: %(message)s'
         },
+        'json': {
+            '()': 'conflogging.JsonFormatter',
+        },
     },
     'handlers': {
         'console': {
             'level': 'DEBUG',
-            'formatter': 'standard',
+            'formatter': LOG_FORMAT,
             'class': 'logging.StreamHandler',
             'stream': 'ext://sys.stdout',
         },
         'file': {
             'level': 'DEBUG',
-            'formatter': 'standard',
+            'formatter': LOG_FORMAT,
             'class': 'logging.handlers.RotatingFileHandler',
-            'filename': 'main.log',
-            'maxBytes': 1024,
-            'backupCount': 3,
+            'filename': LOG_FILE,
+            'maxBytes': LOG_MAX_BYTES,
+            'backupCount': LOG_BACKUP_COUNT,
+            'encoding': 'utf-8',
         },
     },
     'loggers': {
@@ -28,5 +42,85 @@ LOGGING_CONFIG = {
             'level': 'DEBUG',
             'propagate': False
         },
-    }
+        'telegram': {'level': 'WARNING'},
+        'urllib3': {'level': 'WARNING'},
+        'apscheduler': {'level': 'WARNING'},
+    },
+    'root': {
+        'handlers': ['console', 'file'],
+        'level': 'DEBUG',
+    },
 }
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись журнала в одну строку JSON."""
+
+    def format(self, record):
+        """Возвращает запись журнала в формате JSON."""
+        data = {
+            'time': self.formatTime(record),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Помещает запись в очередь, не форматируя ее.
+
+    Стандартный QueueHandler форматирует запись в потоке, который ее
+    создал. Здесь форматирование и запись выполняет поток QueueListener.
+    """
+
+    def prepare(self, record):
+        """Подставляет аргументы в сообщение, оставляя форматирование."""
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _stop_listener():
+    """Останавливает фоновый поток журнала, дописав очередь."""
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    _listener = None
+
+
+def setup_logging(config=LOGGING_CONFIG, use_queue=LOG_QUEUE):
+    """Настраивает журнал.
+
+    При use_queue обработчики корневого логгера и логгера __main__
+    переносятся в фоновый поток QueueListener, а логгеры получают
+    обработчик, который только помещает запись в очередь.
+    """
+    _stop_listener()
+    logging.config.dictConfig(config)
+    if not use_queue:
+        return None
+    loggers = [logging.getLogger(), logging.getLogger('__main__')]
+    handlers = []
+    for logger in loggers:
+        for handler in logger.handlers:
+            if handler not in handlers:
+                handlers.append(handler)
+    records = queue.SimpleQueue()
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(DeferredQueueHandler(records))
+    global _listener
+    _listener = logging.handlers.QueueListener(
+        records, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    return _listener
+
+
+atexit.register(_stop_listener)
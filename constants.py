@@ -1,16 +1,87 @@
 import os
 
-from dotenv import load_dotenv
 
-load_dotenv()
+def find_env_file():
+    """Ищет файл .env в каталоге модуля и его родительских каталогах."""
+    path = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(path, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+ENV_FILE = find_env_file()
+if ENV_FILE:
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_FILE)
 
 
 PRACTICUM_TOKEN = str(os.getenv("PRACTICUM_TOKEN"))
 TELEGRAM_TOKEN = str(os.getenv("TELEGRAM_TOKEN"))
 TELEGRAM_CHAT_ID = str(os.getenv("TELEGRAM_CHAT_ID"))
+OPERATOR_CHAT_ID = os.getenv("OPERATOR_CHAT_ID", os.getenv("TELEGRAM_CHAT_ID"))
+STATE_PATH = os.getenv("STATE_PATH", "state.db")
+STATE_FLUSH_INTERVAL = float(os.getenv("STATE_FLUSH_INTERVAL", 30))
+STATE_SYNCHRONOUS = os.getenv("STATE_SYNCHRONOUS", "NORMAL")
+STATE_BUSY_TIMEOUT = 30
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+LOG_FILE = os.getenv("LOG_FILE", "main.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+LOG_FORMAT = os.getenv("LOG_FORMAT", "standard")
+LOG_QUEUE = os.getenv("LOG_QUEUE", "1") not in ("0", "false", "False", "")
+PROFILE = os.getenv("PROFILE", "0") not in ("0", "false", "False", "")
+PROFILE_DUMP_INTERVAL = float(os.getenv("PROFILE_DUMP_INTERVAL", 0))
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", 0))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
 
 RETRY_PERIOD = 600
+REVIEWING_RETRY_PERIOD = 120
+FAILURE_RETRY_PERIOD = 60
+IDLE_RETRY_PERIOD = 1800
+IDLE_AFTER = 3 * 24 * 60 * 60
+MIN_RETRY_PERIOD = 30
+MAX_RETRY_PERIOD = 3600
+MAX_MESSAGE_LENGTH = 4096
+OUTBOX_WORKERS = 4
+OUTBOX_GLOBAL_RATE = 25
+OUTBOX_GLOBAL_BURST = 30
+OUTBOX_CHAT_RATE = 1
+OUTBOX_CHAT_BURST = 3
+OUTBOX_COALESCE_WINDOW = 1.0
+OUTBOX_MAX_RETRIES = 5
+OUTBOX_RETRY_DELAY = 2
+OUTBOX_DRAIN_TIMEOUT = 30
+COMMAND_WORKERS = 4
+HISTORY_SIZE = 20
+ERROR_CACHE_SIZE = 10000
+ERROR_CACHE_TTL = 6 * 60 * 60
 TIMEOUT = 15
+ASYNC_TIMEOUT = TIMEOUT * 2
+CONCURRENCY = 100
+SHARD_REPLICAS = 100
+SHARD_RESTART_DELAY = 5
+POOL_SIZE = 10
+STREAM_CHUNK_SIZE = 16 * 1024
+RESPONSE_CACHE_SIZE = 10000
+PROFILE_WINDOW = 1024
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", 60))
+CIRCUIT_MAX_RECOVERY_TIMEOUT = 30 * 60
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_SENDER = os.getenv("TELEGRAM_SENDER", "library")
+TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", 8))
+TELEGRAM_CONNECT_TIMEOUT = float(os.getenv("TELEGRAM_CONNECT_TIMEOUT", 5))
+TELEGRAM_READ_TIMEOUT = float(os.getenv("TELEGRAM_READ_TIMEOUT", 10))
+CATCH_UP_CONCURRENCY = int(os.getenv("CATCH_UP_CONCURRENCY", 10))
+CATCH_UP_MIN_GAP = int(os.getenv("CATCH_UP_MIN_GAP", 2 * RETRY_PERIOD))
+API_RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", 10))
+API_BURST = int(os.getenv("API_BURST", 20))
 ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
 HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
 
@@ -0,0 +1,85 @@
+"""Подавление повторных уведомлений о статусах и ошибках."""
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+from constants import ERROR_CACHE_SIZE, ERROR_CACHE_TTL
+from records import status_code
+
+NO_STATUSES = MappingProxyType({})
+
+
+class StatusTracker:
+    """Последние доставленные статусы работ по ключу (подписчик, работа).
+
+    Статусы подписчика загружаются из хранилища состояния при первом
+    обращении и сохраняются в него после доставки сообщения. В памяти
+    статусы хранятся номерами из records.STATUS_CODES, а подписчики без
+    доставленных статусов ссылаются на общий пустой словарь.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._statuses = {}
+
+    def _statuses_for(self, key):
+        """Возвращает словарь статусов работ подписчика."""
+        statuses = self._statuses.get(key)
+        if statuses is None:
+            statuses = {
+                name: status_code(status)
+                for name, status in self.store.load_verdicts(key).items()
+            } or NO_STATUSES
+            self._statuses[key] = statuses
+        return statuses
+
+    def is_transition(self, key, homework_name, status):
+        """Проверяет, отличается ли статус работы от доставленного ранее."""
+        return (
+            self._statuses_for(key).get(homework_name) != status_code(status)
+        )
+
+    def remember(self, key, homework_name, status):
+        """Запоминает доставленный подписчику статус работы."""
+        statuses = self._statuses_for(key)
+        if statuses is NO_STATUSES:
+            statuses = self._statuses[key] = {}
+        statuses[homework_name] = status_code(status)
+        self.store.save_verdict(key, homework_name, status)
+
+
+class TTLCache:
+    """Ограниченный по размеру кеш LRU, записи которого устаревают.
+
+    Используется для подавления повторов одинаковых сообщений об ошибках:
+    сообщение повторяется не чаще, чем раз в ttl секунд. Кеш можно
+    использовать из нескольких потоков.
+    """
+
+    def __init__(self, maxsize=ERROR_CACHE_SIZE, ttl=ERROR_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._expires[key]
+                return False
+            return True
+
+    def __len__(self):
+        return len(self._expires)
+
+    def add(self, key):
+        """Добавляет запись, вытесняя самую старую при переполнении."""
+        with self._lock:
+            self._expires[key] = time.monotonic() + self.ttl
+            self._expires.move_to_end(key)
+            while len(self._expires) > self.maxsize:
+                self._expires.popitem(last=False)
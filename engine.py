@@ -0,0 +1,374 @@
+"""Многопользовательский режим: все подписчики в одном процессе."""
+import functools
+import logging
+import threading
+import time
+
+import circuit
+import exceptions
+import homework
+import metrics
+import scheduler
+from api_client import NOT_MODIFIED, PracticumClient
+from commands import StatusCache, start_commands
+from constants import OPERATOR_CHAT_ID, OUTBOX_DRAIN_TIMEOUT, TELEGRAM_TOKEN
+from dedup import StatusTracker, TTLCache
+from outbox import Outbox
+from profiling import PROFILER
+from quota import QUOTA
+from records import decode_response
+from shutdown import SHUTDOWN
+from state import StateStore
+from tenants import load_tenants
+
+logger = logging.getLogger(__name__)
+
+OUTAGE_MESSAGE = (
+    "API Yandex Practicum недоступен, опрос подписчиков приостановлен до "
+    "восстановления сервиса."
+)
+
+
+class PollEngine:
+    """Опрашивает API для подписчиков и отправляет им сообщения.
+
+    Клиент API, бот и хранилище состояния передаются извне, поэтому их
+    можно подменить в тестах. Подписчику отправляются только сообщения о
+    смене статуса работы, а одинаковые сообщения об ошибках повторяются не
+    чаще, чем раз в ERROR_CACHE_TTL секунд. Если передана очередь outbox,
+    сообщения отправляются через нее, не задерживая опрос API.
+
+    Запросы к API проходят через выключатель breaker. Пока он разомкнут,
+    опрос всех подписчиков откладывается, а вместо сообщений об ошибках
+    каждому подписчику в чат OPERATOR_CHAT_ID отправляется одно сообщение
+    о недоступности API. Частота запросов всех подписчиков ограничена
+    общей квотой quota, а после ответа 429 опрос откладывается на срок из
+    заголовка Retry-After.
+
+    После запроса остановки shutdown новые опросы не назначаются. Для
+    сообщений, еще не доставленных через outbox, запоминается курсор
+    подписчика до опроса: при остановке он восстанавливается, и после
+    перезапуска эти сообщения будут отправлены снова.
+    """
+
+    def __init__(self, client, bot, store, outbox=None, breaker=None,
+                 quota=None):
+        self.client = client
+        self.bot = bot
+        self.store = store
+        self.outbox = outbox
+        self.breaker = circuit.PRACTICUM if breaker is None else breaker
+        self.quota = QUOTA if quota is None else quota
+        self.queue = scheduler.PollQueue()
+        self.outage_reported = False
+        self.shutdown = SHUTDOWN
+        self.undelivered = {}
+        self._undelivered_lock = threading.Lock()
+        self.statuses = StatusTracker(store)
+        self.cache = StatusCache(store)
+        self.errors = TTLCache()
+
+    def restore(self, tenants):
+        """Восстанавливает курсоры подписчиков из хранилища состояния.
+
+        Первые опросы подписчиков равномерно распределяются по интервалу
+        опроса, чтобы не отправлять все запросы к API одновременно.
+        """
+        scheduler.spread(tenants, time.time())
+        restored = 0
+        for tenant in tenants:
+            if self.store.restore(tenant):
+                restored += 1
+                self.errors.add((tenant.key, tenant.last_message))
+        logger.info(
+            f"Загружено подписчиков: {len(tenants)}, "
+            f"восстановлено курсоров: {restored}."
+        )
+
+    def parse_answer(self, tenant, response, now):
+        """Проверяет ответ API и возвращает записи о работах и курсор.
+
+        Неизменившийся ответ не разбирается. Курсор сдвигается, только если
+        в ответе есть работы: API возвращает лишь работы, изменившиеся после
+        from_date, а неизменный from_date позволяет следующему запросу
+        попасть в кеш клиента.
+        """
+        if response is NOT_MODIFIED:
+            scheduler.record_success(tenant, (), now)
+            return (), tenant.timestamp
+        with PROFILER.stage("parse"):
+            records, current_date = decode_response(response)
+        self.cache.update(tenant.key, records, now)
+        scheduler.record_success(tenant, records, now)
+        if current_date is None or not records:
+            current_date = tenant.timestamp
+        return records, current_date
+
+    def poll_tenant(self, tenant, now):
+        """Запрашивает API для подписчика.
+
+        Возвращает записи о работах, новое значение курсора и запись кеша
+        ответа, которые следует сохранить после доставки сообщений.
+        """
+        self.quota.check()
+        response, entry = self.breaker.call(
+            self.quota.call, self.client.revalidate_answer,
+            tenant.timestamp, tenant.practicum_token, tenant.validators,
+            tenant.digest
+        )
+        return (*self.parse_answer(tenant, response, now), entry)
+
+    def commit_answer(self, tenant, from_date, current_date, entry):
+        """Сдвигает курсор подписчика и запоминает обработанный ответ.
+
+        Валидаторы и хеш ответа подходят только для запроса с тем же
+        from_date, поэтому при сдвиге курсора они сбрасываются. Запись кеша
+        хранится в подписчике, только если в ответе были ETag или
+        Last-Modified, иначе хранится лишь хеш.
+        """
+        tenant.timestamp = current_date
+        if current_date != from_date:
+            tenant.validators = tenant.digest = None
+        elif entry is not None:
+            tenant.digest = entry.digest
+            tenant.validators = (
+                entry if entry.etag or entry.last_modified else None
+            )
+
+    def send(self, tenant, message, on_delivered=None):
+        """Отправляет сообщение в чат подписчика или ставит его в очередь.
+
+        Функция on_delivered вызывается после доставки сообщения.
+        """
+        if self.outbox is not None:
+            if on_delivered is not None:
+                on_delivered = self.track_delivery(tenant, on_delivered)
+            self.outbox.put(tenant.chat_id, message, on_delivered)
+        else:
+            homework.send_chat_message(self.bot, tenant.chat_id, message)
+            if on_delivered is not None:
+                on_delivered()
+        tenant.last_message = message
+
+    def track_delivery(self, tenant, on_delivered):
+        """Учитывает сообщение подписчика до его доставки через outbox.
+
+        Возвращает функцию, которую следует вызвать после доставки.
+        """
+        key = tenant.key
+        with self._undelivered_lock:
+            entry = self.undelivered.setdefault(key, [0, tenant.timestamp])
+            entry[0] += 1
+
+        def delivered():
+            on_delivered()
+            with self._undelivered_lock:
+                entry = self.undelivered[key]
+                entry[0] -= 1
+                if not entry[0]:
+                    del self.undelivered[key]
+        return delivered
+
+    def rollback_undelivered(self, tenants):
+        """Возвращает курсоры подписчиков с недоставленными сообщениями.
+
+        Возвращает число таких подписчиков.
+        """
+        with self._undelivered_lock:
+            undelivered = dict(self.undelivered)
+        rolled_back = 0
+        for tenant in tenants:
+            entry = undelivered.get(tenant.key)
+            if entry is None:
+                continue
+            tenant.timestamp = entry[1]
+            self.store.save(tenant)
+            rolled_back += 1
+        if rolled_back:
+            logger.warning(
+                f"Не доставлены сообщения {rolled_back} подписчиков, они "
+                "будут отправлены после перезапуска."
+            )
+        return rolled_back
+
+    def stop(self, tenants, updater=None, timeout=OUTBOX_DRAIN_TIMEOUT):
+        """Отправляет сообщения из очереди и сохраняет состояние.
+
+        Возвращает True, если все сообщения доставлены за timeout секунд.
+        """
+        if updater is not None:
+            updater.stop()
+        self.client.close()
+        drained = True
+        if self.outbox is not None:
+            drained = self.outbox.close(timeout)
+        drained = not self.rollback_undelivered(tenants) and drained
+        self.store.close()
+        logger.info(
+            "Бот остановлен, состояние сохранено"
+            + ("." if drained else ", очередь сообщений отправлена не вся.")
+        )
+        return drained
+
+    def record_transition(self, tenant, record):
+        """Добавляет смену статуса работы в историю подписчика."""
+        self.cache.record_transition(tenant.key, record.name, record.status)
+
+    def remember_status(self, tenant, record):
+        """Возвращает функцию, запоминающую доставленный статус работы."""
+        return functools.partial(
+            self.statuses.remember, tenant.key, record.name, record.status
+        )
+
+    def is_transition(self, tenant, record):
+        """Проверяет, изменился ли статус работы подписчика."""
+        return self.statuses.is_transition(
+            tenant.key, record.name, record.status
+        )
+
+    def deliver_updates(self, tenant, records):
+        """Отправляет подписчику сообщения о смене статусов работ."""
+        for record in records:
+            if not self.is_transition(tenant, record):
+                logger.debug(
+                    f"{tenant}: статус работы \"{record.name}\" не "
+                    "изменился."
+                )
+                continue
+            logger.info(f"{tenant}: {record.message}")
+            self.record_transition(tenant, record)
+            self.send(
+                tenant, record.message, self.remember_status(tenant, record)
+            )
+
+    def error_message(self, tenant, error):
+        """Возвращает сообщение об ошибке, если о ней еще не сообщалось.
+
+        О недоступности API подписчикам не сообщается: об этом один раз
+        сообщает report_outage.
+        """
+        scheduler.record_failure(tenant, error)
+        message = homework.handle_error(error)
+        if not message or (tenant.key, message) in self.errors:
+            return None
+        if self.breaker.is_failure(error):
+            return None
+        return message
+
+    def report_outage(self):
+        """Сообщает оператору о недоступности API один раз за сбой."""
+        outage = self.breaker.state != circuit.CLOSED
+        if outage == self.outage_reported:
+            return
+        self.outage_reported = outage
+        if not outage or not OPERATOR_CHAT_ID:
+            return
+        try:
+            if self.outbox is not None:
+                self.outbox.put(OPERATOR_CHAT_ID, OUTAGE_MESSAGE)
+            else:
+                homework.send_chat_message(
+                    self.bot, OPERATOR_CHAT_ID, OUTAGE_MESSAGE
+                )
+        except exceptions.BotSendMessageException as send_error:
+            logger.error(send_error)
+
+    def notify_error(self, tenant, error):
+        """Журналирует ошибку и сообщает о ней подписчику."""
+        message = self.error_message(tenant, error)
+        if message:
+            try:
+                self.send(tenant, message)
+                self.errors.add((tenant.key, message))
+            except exceptions.BotSendMessageException as send_error:
+                logger.error(send_error)
+
+    def finish_tenant(self, tenant, now, retry_after=None, polled=False):
+        """Сохраняет состояние подписчика и назначает следующий опрос.
+
+        Если опрос был отклонен выключателем, он откладывается на
+        retry_after секунд без изменения состояния подписчика. Время
+        успешного опроса polled сохраняется для режима --catch-up.
+        """
+        if retry_after is not None:
+            tenant.next_poll = now + retry_after
+            return
+        self.store.save(tenant, int(now) if polled else 0)
+        scheduler.schedule(tenant, now)
+
+    def process_tenant(self, tenant):
+        """Опрашивает API для подписчика и доставляет ему сообщения."""
+        now = time.time()
+        retry_after = None
+        polled = False
+        from_date = tenant.timestamp
+        try:
+            records, current_date, entry = self.poll_tenant(tenant, now)
+            self.deliver_updates(tenant, records)
+            self.commit_answer(tenant, from_date, current_date, entry)
+            polled = True
+        except (
+            exceptions.CircuitOpenException,
+            exceptions.TooManyRequestsException,
+        ) as error:
+            retry_after = error.retry_after
+        except Exception as error:
+            self.notify_error(tenant, error)
+        finally:
+            self.finish_tenant(tenant, now, retry_after, polled)
+
+    def run_cycle(self, tenants):
+        """Выполняет опрос API для переданных подписчиков."""
+        for tenant in tenants:
+            if self.shutdown.requested:
+                return
+            self.process_tenant(tenant)
+
+    def run(self, tenants):
+        """Опрашивает API для подписчиков, пока не запрошена остановка.
+
+        В каждом цикле из очереди queue извлекаются только подписчики, время
+        опроса которых наступило, и после опроса возвращаются в нее.
+        """
+        self.queue.extend(tenants)
+        while not self.shutdown.requested:
+            started = time.monotonic()
+            due = self.queue.pop_due(time.time())
+            with PROFILER.cycle():
+                self.run_cycle(due)
+            self.queue.extend(due)
+            self.report_outage()
+            self.store.maybe_flush()
+            elapsed = time.monotonic() - started
+            metrics.CYCLE_DURATION.observe(elapsed)
+            logger.debug(
+                f"Цикл опроса {len(due)} подписчиков занял {elapsed:.3f} с."
+            )
+            self.shutdown.wait(self.queue.seconds_until_next(time.time()))
+
+
+def main(tenants_path, commands=False, shards=1, shard_id=0):
+    """Запускает бота для всех подписчиков из реестра.
+
+    При commands бот также отвечает на команды /status и /history. При
+    shards > 1 обслуживаются только подписчики шарда shard_id. Возвращает
+    True, если при остановке все сообщения доставлены.
+    """
+    if not homework.check_tokens({"TELEGRAM_TOKEN": TELEGRAM_TOKEN}):
+        exit()
+    tenants = load_tenants(tenants_path, shards, shard_id)
+    store = StateStore()
+    bot = homework.LazyBot(TELEGRAM_TOKEN)
+    client = PracticumClient()
+    outbox = Outbox(bot).start()
+    poll_engine = PollEngine(client, bot, store, outbox)
+    poll_engine.restore(tenants)
+    metrics.watch_engine(tenants, outbox)
+    updater = None
+    if commands:
+        updater = start_commands(poll_engine.cache, tenants)
+    try:
+        poll_engine.run(tenants)
+    finally:
+        drained = poll_engine.stop(tenants, updater)
+    return drained
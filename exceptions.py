@@ -25,10 +25,42 @@ class RequestAPIYandexPracticumException(Exception):
 class NotFoundEndpointException(Exception):
     """Класс исключения недоступности Endpoint."""
 
-    pass
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class NotOkStatusCodeException(Exception):
     """Класс исключения статус кода отличного от 200."""
 
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ServerErrorStatusCodeException(NotOkStatusCodeException):
+    """Класс исключения статус кода 5xx от API Yandex Practicum."""
+
+    pass
+
+
+class TooManyRequestsException(NotOkStatusCodeException):
+    """Класс исключения статус кода 429 от API Yandex Practicum."""
+
+    def __init__(self, message, retry_after=0):
+        super().__init__(message, 429)
+        self.retry_after = retry_after
+
+
+class CircuitOpenException(Exception):
+    """Класс исключения отказа в запросе к недоступному сервису."""
+
+    def __init__(self, message, retry_after=0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ShutdownRequested(BaseException):
+    """Класс исключения, прерывающего ожидание при остановке бота."""
+
     pass
@@ -1,17 +1,25 @@
+import argparse
 import logging
-import logging.config
+import sys
 import time
-from http import HTTPStatus
-
-import requests
-import telegram
 
+import circuit
 import exceptions
-from conflogging import LOGGING_CONFIG
-from constants import (ENDPOINT, HEADERS, HOMEWORK_VERDICTS, PRACTICUM_TOKEN,
-                       RETRY_PERIOD, TELEGRAM_CHAT_ID, TELEGRAM_TOKEN, TIMEOUT)
+import metrics
+from conflogging import LOGGING_CONFIG, setup_logging
+from constants import (CONCURRENCY, ENDPOINT, HEADERS,  # noqa: F401
+                       HOMEWORK_VERDICTS, METRICS_PORT, PRACTICUM_TOKEN,
+                       RETRY_PERIOD, TELEGRAM_CHAT_ID, TELEGRAM_TOKEN,
+                       TIMEOUT)
+from dedup import StatusTracker
+from profiling import PROFILER
+from quota import QUOTA
+from records import parse_homework, validate_response
+from shutdown import EXIT_OK, EXIT_UNDELIVERED, SHUTDOWN
+from state import StateStore
+from tenants import Tenant
 
-logging.config.dictConfig(LOGGING_CONFIG)
+setup_logging(LOGGING_CONFIG)
 
 logger = logging.getLogger(__name__)
 logger.debug("Ведение журнала настроено.")
@@ -30,97 +38,185 @@ def check_tokens(tokens):
     return result
 
 
+def required_tokens(tenants_path=None):
+    """Возвращает токены, обязательные для выбранного режима работы."""
+    tokens = {"TELEGRAM_TOKEN": TELEGRAM_TOKEN}
+    if not tenants_path:
+        tokens["PRACTICUM_TOKEN"] = PRACTICUM_TOKEN
+        tokens["TELEGRAM_CHAT_ID"] = TELEGRAM_CHAT_ID
+    return tokens
+
+
+class LazyBot:
+    """Бот Telegram, создаваемый при первом обращении к нему.
+
+    Импорт python-telegram-bot занимает заметную часть времени запуска,
+    поэтому он откладывается до первой отправки сообщения. Бот берется из
+    общего пула botpool.BOTS, разделяющего соединения между отправками.
+    """
+
+    def __init__(self, token=TELEGRAM_TOKEN):
+        """Запоминает токен бота, не создавая его."""
+        self.token = token
+        self._bot = None
+
+    def __getattr__(self, name):
+        """Создает бота при первом обращении и возвращает его атрибут."""
+        if self._bot is None:
+            import botpool
+
+            self._bot = botpool.BOTS.get(self.token)
+        return getattr(self._bot, name)
+
+
 def send_message(bot, message):
     """Отправляет сообщение в чат пользователя Telegram."""
+    send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_chat_message(bot, chat_id, message):
+    """Отправляет сообщение в указанный чат Telegram."""
     try:
-        logger.debug(f"Бот отправляет сообщение: {message}")
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        logger.debug(f"Бот отправляет сообщение в чат {chat_id}: {message}")
+        with metrics.SEND_LATENCY.time(), PROFILER.stage("send_message"):
+            circuit.TELEGRAM.call(bot.send_message, chat_id, message)
     except Exception as error:
         logger.error(error)
         raise exceptions.BotSendMessageException(
             f"При попытке отправить телеграм ботом сообщения: {message}, "
             f"произошла ошибка {error}."
-        )
+        ) from error
+
+
+def get_headers(token):
+    """Формирует заголовки запроса к API Yandex Practicum для токена."""
+    return {"Authorization": f"OAuth {token}"}
 
 
 def get_api_answer(timestamp: int):
     """Отправляет запрос к API Yandex Practicum."""
-    try:
-        response = requests.get(
-            url=ENDPOINT,
-            headers=HEADERS,
-            params={"from_date": timestamp},
-            timeout=TIMEOUT,
-        )
-    except requests.exceptions.Timeout as error:
-        raise exceptions.RequestAPIYandexPracticumTimeout(
-            f"Превышен лимит выполнения запроса: {error}"
-        )
-    except requests.exceptions.ConnectionError as error:
-        raise exceptions.RequestAPIYandexPracticumConnectionError(
-            f"Ошибка соединения с API: {error}"
-        )
-    except requests.RequestException as error:
-        raise exceptions.RequestAPIYandexPracticumException(
-            f"Непредвиденные ошибки в получении ответа: {error}"
-        )
-    if response.status_code == HTTPStatus.NOT_FOUND:
-        raise exceptions.NotFoundEndpointException(
-            f"Эндпоинт {ENDPOINT} не найден. "
-            f"URL: {response.url}\nЗаголовки: {response.headers}\n"
-            f"Текст ответа: {response.text}\n"
-            f"Код ответа: {response.status_code}"
-        )
-    if response.status_code != HTTPStatus.OK:
-        raise exceptions.NotOkStatusCodeException(
-            f"Статус-код ответа от {ENDPOINT} отличен от 200.\n"
-            f"URL: {response.url}\nЗаголовки: {response.headers}\n"
-            f"Текст ответа: {response.text}\n"
-            f"Код ответа: {response.status_code}"
-        )
-    return response.json()
+    return fetch_api_answer(timestamp, HEADERS)
+
+
+def fetch_api_answer(timestamp: int, headers: dict):
+    """Отправляет запрос к API Yandex Practicum с заданными заголовками."""
+    import requests
+
+    import api_client
+
+    return QUOTA.call(
+        api_client.request_api, requests, timestamp, headers, ENDPOINT,
+        TIMEOUT
+    )
 
 
 def check_response(response):
     """Проверяет результат ответа на запрос к API Yandex Practicum."""
-    if not response:
-        raise TypeError("Нет ответа от API")
-    if not isinstance(response, dict):
-        raise TypeError(
-            "Информация в ответе предоставлена не в виде словаря"
-        )
-    if response.get("homeworks") is None:
-        raise KeyError(
-            "В ответе отсутствует информация о домашних работах."
-        )
-    if not isinstance(response.get("homeworks"), list):
-        raise TypeError(
-            "Информация о домашних работах в ответе предоставлена "
-            "не в виде списка."
-        )
+    return validate_response(response)
 
 
 def parse_status(homework):
     """Парсинг результата проверки домашнего задания."""
-    if not homework.get("homework_name"):
-        raise KeyError("В информации о домашней работе отсутствует ее имя.")
-    homework_name = homework.get("homework_name")
-    if not homework.get("status"):
-        raise KeyError("В информации о домашней работе отсутствует статус")
-    if homework.get("status") not in HOMEWORK_VERDICTS.keys():
-        raise ValueError(
-            f"Статус проверки домашнего задяния: {homework.get('status')} "
-            "не соответствует ожидаемым."
-        )
-    verdict = HOMEWORK_VERDICTS.get(homework.get("status"))
-    return f"Изменился статус проверки работы \"{homework_name}\". {verdict}"
+    return parse_homework(homework).message
 
 
 def warning_telegram(message, last_message, bot):
-    """Отправка сообщения в телеграм, отличного от предудущего."""
+    """Отправка сообщения в телеграм, отличного от предудущего.
+
+    Возвращает последнее отправленное сообщение.
+    """
     if message != last_message:
-        last_message = message
         send_message(bot, message)
+    return message
+
+
+def send_status_change(bot, statuses, key, homework):
+    """Отправка сообщения о статусе работы, только если он изменился."""
+    with PROFILER.stage("parse_status"):
+        message = parse_status(homework)
+    homework_name = homework.get("homework_name")
+    status = homework.get("status")
+    if not statuses.is_transition(key, homework_name, status):
+        logger.debug(f"Статус не изменился: {message}")
+        return
+    logger.info(message)
+    send_message(bot, message)
+    statuses.remember(key, homework_name, status)
+
+
+def handle_error(error):
+    """Журналирует ошибку и возвращает текст сообщения для пользователя.
+
+    Для ошибок отправки сообщений ботом возвращает None, так как сообщить о
+    них в Telegram невозможно. Для запросов, отклоненных выключателем,
+    также возвращает None: о недоступности сервиса уже сообщалось. Об
+    ограничении частоты запросов API пользователю не сообщается: опрос
+    просто откладывается.
+    """
+    metrics.ERRORS.inc(exception=type(error).__name__)
+    if isinstance(error, exceptions.BotSendMessageException):
+        logger.error(error)
+        return None
+    if isinstance(error, exceptions.CircuitOpenException):
+        logger.debug(error)
+        return None
+    if isinstance(error, exceptions.TooManyRequestsException):
+        logger.warning(error)
+        return None
+    if isinstance(error, exceptions.RequestAPIYandexPracticumTimeout):
+        logger.warning(error)
+        return str(error)
+    if isinstance(error, exceptions.RequestAPIYandexPracticumConnectionError):
+        logger.critical(error)
+        return str(error)
+    if isinstance(error, exceptions.RequestAPIYandexPracticumException):
+        logger.error(error)
+        return str(error)
+    if isinstance(error, (
+        exceptions.NotFoundEndpointException,
+        exceptions.NotOkStatusCodeException
+    )):
+        logger.error(f"Нежелательный статус ответа от API: {error}")
+        return status_error_message(error)
+    message = f"Сбой в работе программы: {error}"
+    logger.error(message)
+    return message
+
+
+def status_error_message(error):
+    """Возвращает сообщение пользователю о нежелательном статусе ответа.
+
+    Текст исключения содержит заголовки и тело ответа, которые меняются от
+    запроса к запросу (например, заголовок Date). Сообщение строится по
+    статус-коду, чтобы повторная ошибка распознавалась и не отправлялась
+    пользователю снова.
+    """
+    if error.status_code is None:
+        return f"Нежелательный статус ответа от API: {error}"
+    return f"Нежелательный статус ответа от API: код {error.status_code}."
+
+
+def poll_once(bot, statuses, tenant):
+    """Выполняет один цикл опроса API и отправки статусов.
+
+    Обновляет курсор и последнее сообщение об ошибке подписчика tenant.
+    Возвращает True, если опрос выполнен успешно.
+    """
+    try:
+        response = circuit.PRACTICUM.call(get_api_answer, tenant.timestamp)
+        with PROFILER.stage("check_response"):
+            check_response(response)
+        for homework in response.get("homeworks"):
+            send_status_change(bot, statuses, tenant.key, homework)
+        tenant.timestamp = response.get("current_date")
+    except Exception as error:
+        message = handle_error(error)
+        if message:
+            tenant.last_message = warning_telegram(
+                message, tenant.last_message, bot
+            )
+        return False
+    return True
 
 
 def main():
@@ -132,51 +228,218 @@ def main():
     }
     exit() if not check_tokens(tokens) else None
 
+    import telegram
+
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
+    store = StateStore()
+    statuses = StatusTracker(store)
+    tenant = Tenant(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, int(time.time()))
+    store.restore(tenant)
 
     logger.info("Бот готов к работе и запущен.")
     send_message(bot, "Начинаю работу.")
 
-    last_message = ""
-
-    while True:
+    while not SHUTDOWN.requested:
+        with PROFILER.cycle():
+            polled = poll_once(bot, statuses, tenant)
+        store.save(tenant, int(time.time()) if polled else 0)
+        store.maybe_flush()
         try:
-            response = get_api_answer(timestamp)
-            check_response(response)
-            timestamp = response.get("current_date")
-            for homework in response.get("homeworks"):
-                message = parse_status(homework)
-                logger.info(message)
-                warning_telegram(message, last_message, bot)
-        except exceptions.BotSendMessageException as error:
-            logger.error(error)
-        except exceptions.RequestAPIYandexPracticumTimeout as error:
-            logger.warning(error)
-            warning_telegram(error, last_message, bot)
-        except exceptions.RequestAPIYandexPracticumConnectionError as error:
-            logger.critical(error)
-            warning_telegram(error, last_message, bot)
-        except exceptions.RequestAPIYandexPracticumException as error:
-            logger.error(error)
-            warning_telegram(error, last_message, bot)
-        except (
-            exceptions.NotFoundEndpointException,
-            exceptions.NotOkStatusCodeException
-        ) as error:
-            message = f"Нежелательный статус ответа от API: {error}"
-            logger.error(message)
-            warning_telegram(message, last_message, bot)
-        except Exception as error:
-            message = f"Сбой в работе программы: {error}"
-            logger.error(message)
-            warning_telegram(message, last_message, bot)
-        time.sleep(RETRY_PERIOD)
+            with SHUTDOWN.interruptible():
+                time.sleep(RETRY_PERIOD)
+        except exceptions.ShutdownRequested:
+            break
+    store.close()
+    logger.info("Бот остановлен.")
+
+
+def get_tenants(tenants_path=None, shards=1, shard_id=0):
+    """Возвращает подписчиков из реестра или из переменных окружения."""
+    from tenants import load_tenants
+
+    exit() if not check_tokens(required_tokens(tenants_path)) else None
+
+    if tenants_path:
+        return load_tenants(tenants_path, shards, shard_id)
+    return [Tenant(PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, int(time.time()))]
+
+
+async def async_main(tenants_path=None, concurrency=CONCURRENCY,
+                     commands=False, shards=1, shard_id=0):
+    """Асинхронная логика работы бота с ограничением конкурентности."""
+    import aioengine
+
+    tenants = get_tenants(tenants_path, shards, shard_id)
+    return await aioengine.main(tenants, concurrency, commands)
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Telegram бот статусов проверки домашних работ."
+    )
+    parser.add_argument(
+        "--tenants",
+        metavar="PATH",
+        help="Файл реестра подписчиков (.json) или база SQLite (.db, "
+             ".sqlite, .sqlite3). Включает многопользовательский режим.",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Асинхронный режим с конкурентным опросом подписчиков.",
+    )
+    parser.add_argument(
+        "--threads",
+        dest="use_threads",
+        action="store_true",
+        help="Многопоточный режим: подписчики опрашиваются пулом потоков.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONCURRENCY,
+        help="Максимальное число одновременных запросов в асинхронном "
+             "режиме или число потоков опроса в многопоточном.",
+    )
+    parser.add_argument(
+        "--commands",
+        action="store_true",
+        help="Отвечать на команды /status и /history в многопользовательском "
+             "и асинхронном режимах.",
+    )
+    parser.add_argument(
+        "--backfill",
+        type=int,
+        metavar="FROM_DATE",
+        help="Воспроизвести историю статусов работ начиная с метки времени "
+             "FROM_DATE (0 - вся история) и завершить работу.",
+    )
+    parser.add_argument(
+        "--catch-up-from",
+        type=int,
+        metavar="TIMESTAMP",
+        help="Перед началом опроса отправить каждому подписчику сводку "
+             "изменений статусов работ начиная с метки времени TIMESTAMP.",
+    )
+    parser.add_argument(
+        "--catch-up",
+        action="store_true",
+        help="Перед началом опроса отправить сводку изменений подписчикам, "
+             "сохраненный курсор которых отстал после простоя бота.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        help="Порт HTTP сервера метрик в формате Prometheus. 0 - выключен.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Число процессов, между которыми распределяются подписчики. "
+             "Без --shard-id запускает процессы всех шардов.",
+    )
+    parser.add_argument(
+        "--shard-id",
+        type=int,
+        help="Номер шарда, подписчиков которого обслуживает процесс.",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Вывести время импорта модулей выбранного режима и завершить "
+             "работу.",
+    )
+    args = parser.parse_args(argv)
+    if args.use_threads and not args.tenants:
+        parser.error("--threads требует реестра подписчиков --tenants.")
+    if args.use_threads and args.use_async:
+        parser.error("--threads нельзя использовать вместе с --async.")
+    if args.shards > 1 and not args.tenants:
+        parser.error("--shards требует реестра подписчиков --tenants.")
+    if args.shards > 1 and args.commands:
+        parser.error("--commands не поддерживается вместе с --shards.")
+    if args.backfill is not None and args.shard_id is None and args.shards > 1:
+        parser.error("--backfill вместе с --shards требует --shard-id.")
+    catching_up = args.catch_up or args.catch_up_from is not None
+    if args.catch_up and args.catch_up_from is not None:
+        parser.error("--catch-up нельзя указывать вместе с --catch-up-from.")
+    if catching_up and args.backfill is not None:
+        parser.error("--backfill нельзя использовать вместе с --catch-up.")
+    if args.shard_id is not None and not 0 <= args.shard_id < args.shards:
+        parser.error(f"--shard-id должен быть от 0 до {args.shards - 1}.")
+    return args
+
+
+def startup_modules(args):
+    """Возвращает модули, импортируемые в выбранном режиме работы."""
+    if args.backfill is not None:
+        return ["homework", "backfill"]
+    if args.use_async:
+        return ["homework", "asyncio", "aioengine"]
+    if args.use_threads:
+        return ["homework", "threadengine"]
+    if args.tenants:
+        return ["homework", "engine"]
+    return ["homework", "requests", "telegram"]
+
+
+def run(args):
+    """Запускает бота в режиме, выбранном аргументами командной строки.
+
+    Возвращает код завершения: EXIT_UNDELIVERED, если при остановке не все
+    сообщения из очереди удалось отправить.
+    """
+    if args.shards > 1 and args.shard_id is None:
+        import sharding
+        return sharding.supervise(sys.argv[1:], args.shards)
+    SHUTDOWN.install()
+    PROFILER.install()
+    shard_id = args.shard_id or 0
+    if args.metrics_port:
+        metrics.start_http_server(args.metrics_port + shard_id)
+    drained = True
+    if args.catch_up or args.catch_up_from is not None:
+        import backfill
+        backfill.catch_up_main(
+            args.tenants, args.catch_up_from, args.shards, shard_id
+        )
+    if args.backfill is not None:
+        import backfill
+        backfill.main(args.tenants, args.backfill, args.shards, shard_id)
+    elif args.use_async:
+        import asyncio
+        drained = asyncio.run(async_main(
+            args.tenants, args.concurrency, args.commands, args.shards,
+            shard_id
+        ))
+    elif args.use_threads:
+        import threadengine
+        drained = threadengine.main(
+            args.tenants, args.concurrency, args.commands, args.shards,
+            shard_id
+        )
+    elif args.tenants:
+        import engine
+        drained = engine.main(
+            args.tenants, args.commands, args.shards, shard_id
+        )
+    else:
+        main()
+    return EXIT_OK if drained else EXIT_UNDELIVERED
 
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.profile_startup:
+        import startup
+        sys.exit(startup.main(startup_modules(args)))
+    exit() if not check_tokens(required_tokens(args.tenants)) else None
     try:
-        main()
+        sys.exit(run(args))
     except KeyboardInterrupt:
         logger.info("Работа ассистента останавливается...")
         exit()
@@ -0,0 +1,149 @@
+"""Потоковый разбор ответа API Yandex Practicum."""
+import codecs
+import json
+
+WHITESPACE = " \t\n\r"
+COMPACT_SIZE = 64 * 1024
+
+
+class HomeworkStream:
+    """Итератор работ из ответа API, читаемого по частям.
+
+    Работы из списка homeworks разбираются по одной, поэтому в памяти
+    хранится только текущая работа и непрочитанный остаток буфера. Остальные
+    поля ответа (например, current_date) доступны в fields после того, как
+    итерация завершена. Ошибки в ответе приводят к тем же исключениям, что и
+    records.validate_response, а некорректный JSON - к json.JSONDecodeError.
+    """
+
+    def __init__(self, chunks, response=None):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.response = response
+        self.fields = {}
+        self.finished = False
+
+    @property
+    def current_date(self):
+        """Возвращает current_date из ответа API или None."""
+        return self.fields.get("current_date")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Закрывает ответ API, если он был передан."""
+        if self.response is not None:
+            self.response.close()
+
+    def _read(self):
+        """Дочитывает следующую часть ответа в буфер."""
+        if self._eof:
+            return False
+        if self._pos >= COMPACT_SIZE:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return True
+
+    def _peek(self):
+        """Пропускает пробелы и возвращает следующий символ или ''."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._read():
+                return ""
+
+    def _expect(self, chars):
+        """Читает один из символов chars."""
+        char = self._peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(
+                f"Ожидался один из символов {chars!r}", self._buffer,
+                self._pos
+            )
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Разбирает следующее значение JSON целиком.
+
+        Значение принимается, только если за ним в буфере есть хотя бы один
+        символ или ответ прочитан до конца: иначе число на границе частей
+        было бы прочитано не полностью.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            self._read()
+
+    def _homeworks(self):
+        """Возвращает работы из списка homeworks по одной."""
+        if self._peek() != "[":
+            raise TypeError(
+                "Информация о домашних работах в ответе предоставлена "
+                "не в виде списка."
+            )
+        self._pos += 1
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def __iter__(self):
+        char = self._peek()
+        if not char:
+            raise TypeError("Нет ответа от API")
+        if char != "{":
+            raise TypeError(
+                "Информация в ответе предоставлена не в виде словаря"
+            )
+        self._pos += 1
+        seen = False
+        if self._peek() != "}":
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == "homeworks" and self._peek() != "n":
+                    seen = True
+                    yield from self._homeworks()
+                else:
+                    self.fields[key] = self._value()
+                if self._expect(",}") == "}":
+                    break
+        else:
+            raise TypeError("Нет ответа от API")
+        if not seen:
+            raise KeyError(
+                "В ответе отсутствует информация о домашних работах."
+            )
+        self.finished = True
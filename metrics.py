@@ -0,0 +1,241 @@
+"""Метрики работы бота в текстовом формате Prometheus."""
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+
+
+def _format_labels(labelnames, values, extra=""):
+    """Форматирует метки в виде {name="value",...}."""
+    pairs = [
+        f'{name}="{str(value)}"' for name, value in zip(labelnames, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Базовый класс метрики."""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        """Возвращает значения меток в порядке labelnames."""
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def samples(self):
+        """Возвращает строки значений метрики."""
+        raise NotImplementedError
+
+    def expose(self):
+        """Возвращает метрику в текстовом формате Prometheus."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        """Увеличивает счетчик."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Возвращает значение счетчика."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        """Возвращает строки значений метрики."""
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in values
+        ]
+
+
+class Gauge(Metric):
+    """Значение, которое может как расти, так и уменьшаться.
+
+    Значение задается методом set либо вычисляется функцией при каждом
+    чтении метрик.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, function=None):
+        super().__init__(name, documentation)
+        self._value = 0
+        self._function = function
+
+    def set(self, value):
+        """Устанавливает значение."""
+        self._value = value
+
+    def set_function(self, function):
+        """Задает функцию, вычисляющую значение при чтении метрик."""
+        self._function = function
+
+    def value(self):
+        """Возвращает текущее значение."""
+        if self._function is not None:
+            try:
+                return self._function()
+            except Exception as error:
+                logger.error(f"Ошибка вычисления метрики {self.name}: {error}")
+                return float("nan")
+        return self._value
+
+    def samples(self):
+        """Возвращает строки значений метрики."""
+        return [f"{self.name} {self.value()}"]
+
+
+class Histogram(Metric):
+    """Гистограмма распределения значений по корзинам."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value):
+        """Учитывает значение."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        """Учитывает время выполнения блока with."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    @property
+    def count(self):
+        """Число учтенных значений."""
+        return sum(self._counts)
+
+    def samples(self):
+        """Возвращает строки значений метрики."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class Registry:
+    """Набор метрик, отдаваемых по HTTP."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        """Добавляет метрику в набор и возвращает ее."""
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self):
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        return "\n".join(metric.expose() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+ERRORS = REGISTRY.register(Counter(
+    "homework_errors_total", "Число ошибок по классам исключений.",
+    ("exception",),
+))
+API_LATENCY = REGISTRY.register(Histogram(
+    "homework_api_request_seconds",
+    "Время запроса к API Yandex Practicum.",
+))
+API_CACHE = REGISTRY.register(Counter(
+    "homework_api_cache_total",
+    "Ответы API по результату проверки кеша: hit - ответ не изменился.",
+    ("result",),
+))
+CIRCUIT_OPENED = REGISTRY.register(Counter(
+    "homework_circuit_opened_total",
+    "Число размыканий выключателя запросов к сервису.", ("upstream",),
+))
+CIRCUIT_REJECTED = REGISTRY.register(Counter(
+    "homework_circuit_rejected_total",
+    "Число запросов, отклоненных разомкнутым выключателем.", ("upstream",),
+))
+SEND_LATENCY = REGISTRY.register(Histogram(
+    "homework_send_message_seconds", "Время отправки сообщения Telegram.",
+))
+CYCLE_DURATION = REGISTRY.register(Histogram(
+    "homework_poll_cycle_seconds", "Длительность цикла опроса подписчиков.",
+))
+OUTBOX_SIZE = REGISTRY.register(Gauge(
+    "homework_outbox_queue_size", "Число сообщений в очереди отправки.",
+))
+CURSOR_LAG = REGISTRY.register(Gauge(
+    "homework_cursor_lag_seconds",
+    "Наибольшее отставание курсора current_date от текущего времени.",
+))
+TENANTS = REGISTRY.register(Gauge(
+    "homework_tenants", "Число обслуживаемых подписчиков.",
+))
+
+
+def start_http_server(port, host="127.0.0.1"):
+    """Запускает HTTP сервер метрик в фоновом потоке.
+
+    Модуль http.server импортируется только при запуске сервера, чтобы не
+    замедлять запуск бота без метрик.
+    """
+    from metrics_http import serve
+
+    return serve(REGISTRY, port, host)
+
+
+def watch_engine(tenants, outbox=None):
+    """Подключает метрики очереди и отставания курсоров к подписчикам."""
+    TENANTS.set(len(tenants))
+    if outbox is not None:
+        OUTBOX_SIZE.set_function(outbox.qsize)
+    CURSOR_LAG.set_function(lambda: max(
+        (time.time() - tenant.timestamp for tenant in tenants), default=0
+    ))
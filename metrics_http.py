@@ -0,0 +1,46 @@
+"""HTTP сервер метрик в текстовом формате Prometheus."""
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдает метрики реестра registry по адресу /metrics."""
+
+    registry = None
+
+    def do_GET(self):
+        """Отвечает на запрос метрик."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.expose().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Не журналирует каждый запрос."""
+
+
+def serve(registry, port, host="127.0.0.1"):
+    """Запускает HTTP сервер метрик registry в фоновом потоке."""
+    handler = type("RegistryHandler", (MetricsHandler,), {
+        "registry": registry,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="metrics", daemon=True
+    ).start()
+    logger.info(
+        f"Метрики доступны по адресу http://{host}:"
+        f"{server.server_address[1]}/metrics"
+    )
+    return server
@@ -0,0 +1,223 @@
+"""Очередь исходящих сообщений Telegram с ограничением частоты отправки."""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+import exceptions
+import homework
+from constants import (MAX_MESSAGE_LENGTH, OUTBOX_CHAT_BURST,
+                       OUTBOX_CHAT_RATE, OUTBOX_COALESCE_WINDOW,
+                       OUTBOX_GLOBAL_BURST, OUTBOX_GLOBAL_RATE,
+                       OUTBOX_MAX_RETRIES, OUTBOX_RETRY_DELAY, OUTBOX_WORKERS)
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\n\n"
+
+
+def coalesce(items, limit=MAX_MESSAGE_LENGTH):
+    """Группирует сообщения так, чтобы текст группы не превышал limit."""
+    groups = []
+    length = 0
+    for item in items:
+        size = len(item[0])
+        if groups and length + len(SEPARATOR) + size <= limit:
+            groups[-1].append(item)
+            length += len(SEPARATOR) + size
+        else:
+            groups.append([item])
+            length = size
+    return groups
+
+
+class Outbox:
+    """Очередь исходящих сообщений с пулом потоков отправки.
+
+    Сообщения одного чата, поставленные в очередь в течение
+    coalesce_window секунд, объединяются в одно. Частота отправки
+    ограничена общей корзиной токенов и корзиной каждого чата. Сообщения
+    одного чата отправляются строго по очереди, а при ошибке отправки
+    повторяются с экспоненциальной задержкой не более max_retries раз.
+    """
+
+    def __init__(self, bot, workers=OUTBOX_WORKERS,
+                 global_rate=OUTBOX_GLOBAL_RATE,
+                 global_burst=OUTBOX_GLOBAL_BURST,
+                 chat_rate=OUTBOX_CHAT_RATE, chat_burst=OUTBOX_CHAT_BURST,
+                 coalesce_window=OUTBOX_COALESCE_WINDOW,
+                 max_retries=OUTBOX_MAX_RETRIES,
+                 retry_delay=OUTBOX_RETRY_DELAY):
+        self.bot = bot
+        self.workers = workers
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self._chat_buckets = {}
+        self._condition = threading.Condition()
+        self._heap = []
+        self._counter = itertools.count()
+        self._pending = {}
+        self._scheduled = set()
+        self._attempts = {}
+        self._threads = []
+        self._closed = False
+
+    def start(self):
+        """Запускает потоки отправки сообщений."""
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"outbox-{number}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def put(self, chat_id, message, on_delivered=None):
+        """Ставит сообщение в очередь отправки в чат chat_id.
+
+        Функция on_delivered вызывается после успешной отправки.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Очередь сообщений остановлена.")
+            self._pending.setdefault(chat_id, []).append(
+                (str(message), on_delivered)
+            )
+            if chat_id not in self._scheduled:
+                self._schedule(
+                    chat_id, time.monotonic() + self.coalesce_window
+                )
+
+    def qsize(self):
+        """Возвращает число сообщений, ожидающих отправки."""
+        with self._condition:
+            return sum(len(items) for items in self._pending.values())
+
+    def drain(self, timeout=None):
+        """Ожидает отправки всех сообщений. Возвращает True при успехе."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._scheduled:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """Отправляет оставшиеся сообщения и останавливает потоки.
+
+        Сообщения, не отправленные за timeout секунд, отбрасываются, а их
+        функции on_delivered не вызываются. Возвращает True, если все
+        сообщения отправлены.
+        """
+        drained = self.drain(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        return drained
+
+    def _schedule(self, chat_id, due):
+        """Назначает время отправки сообщений чата."""
+        heapq.heappush(self._heap, (due, next(self._counter), chat_id))
+        self._scheduled.add(chat_id)
+        self._condition.notify_all()
+
+    def _next_batch(self):
+        """Ожидает чат, сообщения которого пора отправить."""
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                if self._heap:
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        _, _, chat_id = heapq.heappop(self._heap)
+                        return chat_id, self._pending.pop(chat_id, [])
+                else:
+                    delay = None
+                self._condition.wait(delay)
+
+    def _work(self):
+        """Отправляет сообщения, пока очередь не остановлена."""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._deliver(*batch)
+
+    def _chat_bucket(self, chat_id):
+        """Возвращает корзину токенов чата."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets.setdefault(
+                chat_id, TokenBucket(self.chat_rate, self.chat_burst)
+            )
+        return bucket
+
+    def _deliver(self, chat_id, items):
+        """Отправляет сообщения чата, объединяя их в группы."""
+        groups = coalesce(items)
+        for number, group in enumerate(groups):
+            self._chat_bucket(chat_id).acquire()
+            self.global_bucket.acquire()
+            text = SEPARATOR.join(message for message, _ in group)
+            try:
+                homework.send_chat_message(self.bot, chat_id, text)
+            except exceptions.BotSendMessageException as error:
+                rest = [item for group in groups[number:] for item in group]
+                self._retry(chat_id, rest, error)
+                return
+            for _, on_delivered in group:
+                if on_delivered is not None:
+                    on_delivered()
+        with self._condition:
+            self._attempts.pop(chat_id, None)
+            self._finish(chat_id)
+
+    def _retry(self, chat_id, items, error):
+        """Возвращает неотправленные сообщения в очередь с задержкой."""
+        with self._condition:
+            attempts = self._attempts.get(chat_id, 0)
+            if not isinstance(
+                error.__cause__, exceptions.CircuitOpenException
+            ):
+                attempts += 1
+            if attempts > self.max_retries:
+                self._attempts.pop(chat_id, None)
+                logger.error(
+                    f"Сообщения в чат {chat_id} не отправлены после "
+                    f"{self.max_retries} попыток и удалены из очереди: "
+                    f"{error}"
+                )
+                self._finish(chat_id)
+                return
+            self._attempts[chat_id] = attempts
+            delay = getattr(error.__cause__, "retry_after", None)
+            if delay is None:
+                delay = self.retry_delay * 2 ** (attempts - 1)
+            logger.warning(
+                f"Повторная отправка в чат {chat_id} через {delay} с "
+                f"(попытка {attempts}): {error}"
+            )
+            self._pending[chat_id] = items + self._pending.get(chat_id, [])
+            self._schedule(chat_id, time.monotonic() + delay)
+
+    def _finish(self, chat_id):
+        """Завершает обработку чата или планирует новые сообщения."""
+        if self._pending.get(chat_id):
+            self._schedule(chat_id, time.monotonic() + self.coalesce_window)
+        else:
+            self._pending.pop(chat_id, None)
+            self._scheduled.discard(chat_id)
+            self._condition.notify_all()
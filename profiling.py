@@ -0,0 +1,221 @@
+"""Выборочное профилирование этапов цикла опроса API.
+
+Профилирование включается переменной окружения PROFILE. Выключенный
+профилировщик сводится к проверке одного флага: stage возвращает общий
+пустой контекстный менеджер, а время не измеряется.
+"""
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from constants import (PROFILE, PROFILE_DIR, PROFILE_DUMP_INTERVAL,
+                       PROFILE_SAMPLE_EVERY, PROFILE_WINDOW)
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+NOOP = nullcontext()
+
+
+class RingBuffer:
+    """Последние size значений длительности в наносекундах."""
+
+    __slots__ = ("values", "size", "count")
+
+    def __init__(self, size=PROFILE_WINDOW):
+        self.values = [0] * size
+        self.size = size
+        self.count = 0
+
+    def append(self, value):
+        """Добавляет значение, вытесняя самое старое."""
+        self.values[self.count % self.size] = value
+        self.count += 1
+
+    def snapshot(self):
+        """Возвращает сохраненные значения в порядке возрастания."""
+        return sorted(self.values[:min(self.count, self.size)])
+
+
+def percentile(values, percent):
+    """Возвращает перцентиль отсортированного списка значений."""
+    if not values:
+        return 0
+    index = min(len(values) - 1, len(values) * percent // 100)
+    return values[index]
+
+
+class Profiler:
+    """Профилировщик этапов цикла опроса.
+
+    Длительность каждого этапа хранится в кольцевом буфере из window
+    последних значений, по которому вычисляются перцентили. Сводка
+    записывается в журнал по сигналу SIGUSR1 и каждые dump_interval
+    секунд, а каждый sample_every-й цикл выполняется под cProfile с
+    сохранением статистики в каталог directory.
+    """
+
+    def __init__(self, enabled=PROFILE, window=PROFILE_WINDOW,
+                 dump_interval=PROFILE_DUMP_INTERVAL,
+                 sample_every=PROFILE_SAMPLE_EVERY, directory=PROFILE_DIR):
+        self.enabled = enabled
+        self.window = window
+        self.dump_interval = dump_interval
+        self.sample_every = sample_every
+        self.directory = directory
+        self.cycles = 0
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._last_dump = time.monotonic()
+        self._dump_requested = threading.Event()
+
+    def install(self):
+        """Устанавливает обработчик SIGUSR1, если профилирование включено.
+
+        Сводку по сигналу записывает отдельный поток profile-dump.
+        """
+        signum = getattr(signal, "SIGUSR1", None)
+        if self.enabled and signum is not None:
+            threading.Thread(
+                target=self._dump_on_request, name="profile-dump",
+                daemon=True,
+            ).start()
+            signal.signal(signum, self._handle)
+
+    def record(self, name, nanoseconds):
+        """Учитывает длительность этапа name."""
+        with self._lock:
+            buffer = self._stages.get(name)
+            if buffer is None:
+                buffer = self._stages[name] = RingBuffer(self.window)
+            buffer.append(nanoseconds)
+
+    def stage(self, name):
+        """Возвращает контекстный менеджер, измеряющий этап name."""
+        if not self.enabled:
+            return NOOP
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name):
+        """Измеряет время выполнения блока with."""
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - started)
+
+    def cycle(self):
+        """Возвращает контекстный менеджер, измеряющий цикл опроса.
+
+        После цикла при необходимости записывает сводку в журнал.
+        """
+        if not self.enabled:
+            return NOOP
+        return self._cycle()
+
+    @contextmanager
+    def _cycle(self):
+        """Измеряет цикл опроса и выборочно профилирует его cProfile.
+
+        cProfile учитывает только поток, вызвавший cycle, поэтому работа
+        потоков опроса и пула потоков асинхронного режима в профиль не
+        попадает.
+        """
+        self.cycles += 1
+        sampled = self.sample_every and self.cycles % self.sample_every == 0
+        profile = None
+        if sampled:
+            import cProfile
+
+            profile = cProfile.Profile()
+            profile.enable()
+        try:
+            with self._measure("cycle"):
+                yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self.save_profile(profile)
+            self.maybe_dump()
+
+    def save_profile(self, profile):
+        """Сохраняет статистику cProfile в файл .prof и возвращает путь."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(
+            self.directory, f"cycle-{os.getpid()}-{self.cycles}.prof"
+        )
+        profile.dump_stats(path)
+        logger.info(f"Профиль цикла опроса сохранен в {path}.")
+        return path
+
+    def summary(self):
+        """Возвращает перцентили длительности этапов в миллисекундах."""
+        with self._lock:
+            stages = {
+                name: (buffer.count, buffer.snapshot())
+                for name, buffer in self._stages.items()
+            }
+        result = {}
+        for name, (count, values) in stages.items():
+            result[name] = {"count": count}
+            for percent in PERCENTILES:
+                result[name][f"p{percent}"] = (
+                    percentile(values, percent) / 1e6
+                )
+            result[name]["max"] = (values[-1] if values else 0) / 1e6
+        return result
+
+    def format_summary(self):
+        """Возвращает сводку в виде таблицы."""
+        lines = [
+            f"{'этап':<16}{'число':>8}{'p50 мс':>10}{'p90 мс':>10}"
+            f"{'p99 мс':>10}{'max мс':>10}"
+        ]
+        for name, row in sorted(self.summary().items()):
+            lines.append(
+                f"{name:<16}{row['count']:>8}{row['p50']:>10.2f}"
+                f"{row['p90']:>10.2f}{row['p99']:>10.2f}{row['max']:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self):
+        """Записывает сводку в журнал."""
+        self._last_dump = time.monotonic()
+        logger.info(f"Профиль этапов опроса:\n{self.format_summary()}")
+
+    def maybe_dump(self):
+        """Записывает сводку, если с прошлой прошло dump_interval секунд."""
+        if (
+            self.dump_interval
+            and time.monotonic() - self._last_dump >= self.dump_interval
+        ):
+            self.dump()
+
+    def reset(self):
+        """Удаляет накопленные измерения."""
+        with self._lock:
+            self._stages = {}
+        self.cycles = 0
+
+    def _dump_on_request(self):
+        """Записывает сводку после каждого сигнала SIGUSR1."""
+        while True:
+            self._dump_requested.wait()
+            self._dump_requested.clear()
+            self.dump()
+
+    def _handle(self, signum, frame):
+        """Обрабатывает сигнал SIGUSR1.
+
+        Обработчик выполняется в главном потоке и может прервать его, пока
+        тот удерживает _lock, поэтому сводка здесь не записывается, а лишь
+        запрашивается у потока profile-dump.
+        """
+        self._dump_requested.set()
+
+
+PROFILER = Profiler()
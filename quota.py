@@ -0,0 +1,89 @@
+"""Общая квота запросов к API Yandex Practicum для всех подписчиков."""
+import logging
+import threading
+import time
+
+import exceptions
+from constants import API_BURST, API_RATE_LIMIT
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaManager:
+    """Ограничивает частоту запросов к API всех подписчиков вместе.
+
+    Каждый запрос забирает токен из общей корзины: не более rate запросов в
+    секунду со всплеском до burst. Если API ответил 429 Too Many Requests,
+    запросы приостанавливаются на срок из заголовка Retry-After, а проверка
+    check возбуждает TooManyRequestsException с оставшимся сроком, чтобы
+    опрос подписчиков был отложен без обращения к сети.
+    """
+
+    def __init__(self, rate=API_RATE_LIMIT, burst=API_BURST,
+                 clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Восстанавливает полную корзину и снимает приостановку."""
+        with self._lock:
+            self.bucket = TokenBucket(self.rate, self.burst)
+            self._throttled_until = 0
+
+    def retry_after(self):
+        """Возвращает число секунд до окончания приостановки запросов."""
+        return max(self._throttled_until - self.clock(), 0)
+
+    def throttle(self, retry_after):
+        """Приостанавливает запросы к API на retry_after секунд."""
+        with self._lock:
+            until = self.clock() + retry_after
+            if until <= self._throttled_until:
+                return
+            self._throttled_until = until
+        logger.warning(
+            f"API ограничивает частоту запросов, опрос приостановлен на "
+            f"{retry_after:.0f} с."
+        )
+
+    def check(self):
+        """Возбуждает TooManyRequestsException, если запросы приостановлены."""
+        retry_after = self.retry_after()
+        if retry_after:
+            raise exceptions.TooManyRequestsException(
+                f"Запросы к API приостановлены еще на {retry_after:.0f} с.",
+                retry_after,
+            )
+
+    def reserve(self):
+        """Резервирует запрос и возвращает число секунд до его отправки."""
+        self.check()
+        return self.bucket.reserve()
+
+    def acquire(self):
+        """Ожидает, пока квота позволит отправить запрос.
+
+        После ожидания приостановка проверяется снова: пока запрос ожидал
+        токена, API мог ответить 429 на запрос другого подписчика.
+        """
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+            self.check()
+        return delay
+
+    def call(self, function, *args, **kwargs):
+        """Вызывает функцию запроса к API в пределах квоты."""
+        self.acquire()
+        try:
+            return function(*args, **kwargs)
+        except exceptions.TooManyRequestsException as error:
+            self.throttle(error.retry_after)
+            raise
+
+
+QUOTA = QuotaManager()
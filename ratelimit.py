@@ -0,0 +1,43 @@
+"""Ограничение частоты запросов алгоритмом token bucket."""
+import threading
+import time
+
+
+class TokenBucket:
+    """Корзина токенов: не более rate операций в секунду и всплеск capacity.
+
+    Метод reserve резервирует токены заранее и возвращает время ожидания,
+    поэтому одновременные вызовы распределяются во времени равномерно.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError(f"Частота {rate} должна быть положительной.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Пополняет корзину токенами, накопленными к моменту now."""
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, tokens=1):
+        """Резервирует токены и возвращает число секунд до их появления."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Ожидает появления токенов и забирает их."""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,102 @@
+"""Быстрая проверка и разбор ответа API Yandex Practicum."""
+from constants import HOMEWORK_VERDICTS
+
+MESSAGE_PREFIX = "Изменился статус проверки работы \""
+VERDICTS = {
+    status: (status, f"\". {verdict}")
+    for status, verdict in HOMEWORK_VERDICTS.items()
+}
+STATUSES = tuple(HOMEWORK_VERDICTS)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def status_code(status):
+    """Возвращает номер статуса из HOMEWORK_VERDICTS.
+
+    Неизвестный статус возвращается как есть.
+    """
+    return STATUS_CODES.get(status, status)
+
+
+class HomeworkRecord:
+    """Разобранная информация о домашней работе из ответа API.
+
+    Статус хранится как ссылка на ключ HOMEWORK_VERDICTS, поэтому
+    одинаковые статусы разных работ не дублируются в памяти. Сообщение о
+    смене статуса собирается только при обращении к message: для работ,
+    статус которых не изменился, оно не нужно.
+    """
+
+    __slots__ = ("name", "status")
+
+    def __init__(self, name, status):
+        self.name = name
+        self.status = status
+
+    def __repr__(self):
+        return f"HomeworkRecord(name={self.name!r}, status={self.status!r})"
+
+    @property
+    def message(self):
+        """Сообщение о смене статуса работы."""
+        return MESSAGE_PREFIX + self.name + VERDICTS[self.status][1]
+
+
+def validate_response(response):
+    """Проверяет ответ API и возвращает список домашних работ."""
+    if not response:
+        raise TypeError("Нет ответа от API")
+    if not isinstance(response, dict):
+        raise TypeError(
+            "Информация в ответе предоставлена не в виде словаря"
+        )
+    homeworks = response.get("homeworks")
+    if homeworks is None:
+        raise KeyError(
+            "В ответе отсутствует информация о домашних работах."
+        )
+    if not isinstance(homeworks, list):
+        raise TypeError(
+            "Информация о домашних работах в ответе предоставлена "
+            "не в виде списка."
+        )
+    return homeworks
+
+
+def parse_homework(homework):
+    """Разбирает информацию о домашней работе за один проход."""
+    name = homework.get("homework_name")
+    if not name:
+        raise KeyError("В информации о домашней работе отсутствует ее имя.")
+    status = homework.get("status")
+    if not status:
+        raise KeyError("В информации о домашней работе отсутствует статус")
+    verdict = VERDICTS.get(status)
+    if verdict is None:
+        raise ValueError(
+            f"Статус проверки домашнего задяния: {status} "
+            "не соответствует ожидаемым."
+        )
+    if type(name) is not str:
+        name = str(name)
+    return HomeworkRecord(name, verdict[0])
+
+
+def decode_response(response):
+    """Проверяет ответ API и возвращает записи о работах и current_date.
+
+    Для корректных работ имя и статус читаются по одному разу, а сообщение
+    не собирается до обращения к нему; некорректная работа разбирается
+    через parse_homework ради прежних исключений.
+    """
+    records = []
+    append = records.append
+    verdicts = VERDICTS
+    for homework in validate_response(response):
+        name = homework.get("homework_name")
+        verdict = verdicts.get(homework.get("status")) if name else None
+        if verdict is None or type(name) is not str:
+            append(parse_homework(homework))
+            continue
+        append(HomeworkRecord(name, verdict[0]))
+    return records, response.get("current_date")
@@ -0,0 +1,191 @@
+"""Адаптивное расписание опроса API для подписчиков."""
+import heapq
+import random
+import time
+
+import exceptions
+from constants import (FAILURE_RETRY_PERIOD, IDLE_AFTER, IDLE_RETRY_PERIOD,
+                       MAX_RETRY_PERIOD, MIN_RETRY_PERIOD, RETRY_PERIOD,
+                       REVIEWING_RETRY_PERIOD)
+
+BACKOFF_ERRORS = (
+    exceptions.NotOkStatusCodeException,
+    exceptions.RequestAPIYandexPracticumTimeout,
+    exceptions.RequestAPIYandexPracticumConnectionError,
+)
+
+
+class PollPolicy:
+    """Правила выбора интервала до следующего опроса подписчика.
+
+    Пока работа на проверке, API опрашивается чаще. При ошибках API интервал
+    растет экспоненциально со случайным разбросом. Если статусы подписчика
+    не менялись дольше idle_after секунд, интервал увеличивается. Итоговый
+    интервал ограничен значениями min_interval и max_interval.
+    """
+
+    __slots__ = (
+        "interval", "reviewing_interval", "failure_interval", "idle_interval",
+        "idle_after", "min_interval", "max_interval", "backoff_factor",
+        "jitter",
+    )
+
+    def __init__(self, interval=RETRY_PERIOD,
+                 reviewing_interval=REVIEWING_RETRY_PERIOD,
+                 failure_interval=FAILURE_RETRY_PERIOD,
+                 idle_interval=IDLE_RETRY_PERIOD, idle_after=IDLE_AFTER,
+                 min_interval=MIN_RETRY_PERIOD, max_interval=MAX_RETRY_PERIOD,
+                 backoff_factor=2, jitter=0.1):
+        if min_interval > max_interval:
+            raise ValueError(
+                f"Минимальный интервал опроса {min_interval} больше "
+                f"максимального {max_interval}."
+            )
+        self.interval = interval
+        self.reviewing_interval = reviewing_interval
+        self.failure_interval = failure_interval
+        self.idle_interval = idle_interval
+        self.idle_after = idle_after
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+
+    def next_interval(self, tenant, now):
+        """Возвращает число секунд до следующего опроса подписчика."""
+        if tenant.failures:
+            interval = self.failure_interval * (
+                self.backoff_factor ** (tenant.failures - 1)
+            )
+            interval = min(interval, self.max_interval)
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        elif tenant.reviewing:
+            interval = self.reviewing_interval
+        elif now - tenant.last_change >= self.idle_after:
+            interval = self.idle_interval
+        else:
+            interval = self.interval
+        return min(max(interval, self.min_interval), self.max_interval)
+
+
+DEFAULT_POLICY = PollPolicy()
+
+
+def record_success(tenant, records, now):
+    """Учитывает успешный ответ API при выборе следующего интервала."""
+    tenant.failures = 0
+    if records:
+        tenant.last_change = now
+        tenant.reviewing = any(
+            record.status == "reviewing" for record in records
+        )
+
+
+def record_failure(tenant, error):
+    """Учитывает ошибку API при выборе следующего интервала."""
+    if isinstance(error, BACKOFF_ERRORS):
+        tenant.failures += 1
+
+
+def schedule(tenant, now=None):
+    """Назначает время следующего опроса подписчика."""
+    now = time.time() if now is None else now
+    policy = tenant.policy or DEFAULT_POLICY
+    tenant.next_poll = now + policy.next_interval(tenant, now)
+    return tenant.next_poll
+
+
+def spread(tenants, now, period=RETRY_PERIOD):
+    """Равномерно распределяет первые опросы подписчиков по period секунд.
+
+    Без этого все подписчики опрашивались бы одновременно при запуске и
+    затем на каждой границе интервала опроса.
+    """
+    count = len(tenants)
+    for number, tenant in enumerate(tenants):
+        tenant.next_poll = now + period * number / count
+
+
+class PollQueue:
+    """Очередь опросов подписчиков, упорядоченная по времени next_poll.
+
+    Очередь построена на двоичной куче, поэтому добавление и перенос
+    опроса подписчика выполняются за O(log n), а выбор подписчиков, время
+    опроса которых наступило, не требует просмотра всех подписчиков.
+    Записи кучи - пары (время, подписчик); запись действительна, пока на
+    нее ссылается poll_entry подписчика, поэтому подписчик может состоять
+    только в одной очереди. Устаревшие записи выбрасываются при
+    извлечении, а когда их становится больше живых, куча перестраивается.
+    """
+
+    COMPACT_MIN = 64
+
+    def __init__(self, tenants=()):
+        self._heap = []
+        self._size = 0
+        for tenant in tenants:
+            tenant.poll_entry = (tenant.next_poll, tenant)
+            self._heap.append(tenant.poll_entry)
+            self._size += 1
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, tenant):
+        return tenant.poll_entry is not None
+
+    def push(self, tenant):
+        """Добавляет опрос подписчика или переносит его на next_poll."""
+        if tenant.poll_entry is None:
+            self._size += 1
+        tenant.poll_entry = (tenant.next_poll, tenant)
+        heapq.heappush(self._heap, tenant.poll_entry)
+        self._maybe_compact()
+
+    def extend(self, tenants):
+        """Добавляет или переносит опросы нескольких подписчиков."""
+        for tenant in tenants:
+            self.push(tenant)
+
+    def cancel(self, tenant):
+        """Отменяет опрос подписчика, например после его отписки.
+
+        Возвращает True, если подписчик был в очереди.
+        """
+        if tenant.poll_entry is None:
+            return False
+        tenant.poll_entry = None
+        self._size -= 1
+        self._maybe_compact()
+        return True
+
+    def pop_due(self, now):
+        """Извлекает подписчиков, время опроса которых наступило."""
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            tenant = entry[1]
+            if tenant.poll_entry is entry:
+                tenant.poll_entry = None
+                due.append(tenant)
+        self._size -= len(due)
+        return due
+
+    def seconds_until_next(self, now):
+        """Возвращает число секунд до ближайшего опроса."""
+        heap = self._heap
+        while heap and heap[0][1].poll_entry is not heap[0]:
+            heapq.heappop(heap)
+        if not heap:
+            return RETRY_PERIOD
+        return max(heap[0][0] - now, 0)
+
+    def _maybe_compact(self):
+        """Перестраивает кучу, если устаревших записей больше живых."""
+        if len(self._heap) > max(2 * self._size, self.COMPACT_MIN):
+            self._heap = [
+                entry for entry in self._heap if entry[1].poll_entry is entry
+            ]
+            heapq.heapify(self._heap)
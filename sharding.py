@@ -0,0 +1,112 @@
+"""Распределение подписчиков между процессами согласованным хешированием."""
+import bisect
+import hashlib
+import logging
+import signal
+import subprocess
+import sys
+import time
+
+from constants import SHARD_REPLICAS, SHARD_RESTART_DELAY
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(value):
+    """Возвращает 64-битный хеш строки."""
+    return int.from_bytes(
+        hashlib.md5(str(value).encode()).digest()[:8], "big"
+    )
+
+
+class HashRing:
+    """Кольцо согласованного хеширования.
+
+    Каждый шард занимает replicas точек кольца, а ключ принадлежит шарду
+    ближайшей точки по часовой стрелке. При добавлении шарда к нему
+    переходит примерно 1/N ключей, остальные остаются на месте.
+    """
+
+    def __init__(self, shards, replicas=SHARD_REPLICAS):
+        points = sorted(
+            (_hash(f"{shard}-{replica}"), shard)
+            for shard in range(shards) for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key):
+        """Возвращает номер шарда для ключа."""
+        index = bisect.bisect(self._hashes, _hash(key))
+        return self._shards[index % len(self._shards)]
+
+
+def select_shard(tenants, shards, shard_id):
+    """Возвращает подписчиков, принадлежащих шарду shard_id."""
+    if shards <= 1:
+        return list(tenants)
+    ring = HashRing(shards)
+    return [
+        tenant for tenant in tenants
+        if ring.shard_for(tenant.practicum_token) == shard_id
+    ]
+
+
+def worker_command(argv, shard_id):
+    """Возвращает команду запуска процесса для шарда shard_id."""
+    return [sys.executable, sys.argv[0], *argv, "--shard-id", str(shard_id)]
+
+
+def start_worker(argv, shard_id):
+    """Запускает процесс шарда shard_id в отдельном сеансе.
+
+    Сигналы, отправленные группе процессов супервизора (Ctrl+C в
+    терминале, SIGTERM платформы), не доходят до процесса шарда напрямую:
+    их передает только супервизор. Иначе процесс получил бы сигнал дважды
+    и счел бы второй требованием немедленной остановки.
+    """
+    return subprocess.Popen(
+        worker_command(argv, shard_id), start_new_session=True
+    )
+
+
+def supervise(argv, shards, restart_delay=SHARD_RESTART_DELAY):
+    """Запускает по процессу на шард и перезапускает упавшие процессы.
+
+    Сигналы SIGINT и SIGTERM передаются процессам шардов. Возвращает
+    наибольший код завершения процессов.
+    """
+    workers = {
+        shard_id: start_worker(argv, shard_id) for shard_id in range(shards)
+    }
+    logger.info(f"Запущено процессов шардов: {shards}.")
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in workers.values():
+            if process.poll() is None:
+                process.send_signal(signum)
+
+    previous = {
+        signum: signal.signal(signum, stop)
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        while not stopping:
+            for shard_id, process in list(workers.items()):
+                code = process.poll()
+                if code is None or stopping:
+                    continue
+                logger.error(
+                    f"Процесс шарда {shard_id} завершился с кодом {code}, "
+                    f"перезапуск через {restart_delay} с."
+                )
+                time.sleep(restart_delay)
+                workers[shard_id] = start_worker(argv, shard_id)
+            time.sleep(1)
+        return max(process.wait() for process in workers.values())
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
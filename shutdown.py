@@ -0,0 +1,87 @@
+"""Корректное завершение работы бота по сигналам SIGINT и SIGTERM."""
+import logging
+import signal
+import threading
+from contextlib import contextmanager
+
+import exceptions
+
+logger = logging.getLogger(__name__)
+
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+EXIT_OK = 0
+EXIT_UNDELIVERED = 75
+
+
+class Shutdown:
+    """Запрос остановки бота.
+
+    Первый сигнал лишь запрашивает остановку: движки перестают назначать
+    новые опросы, отправляют сообщения из очереди и сохраняют состояние.
+    Ожидание внутри interruptible прерывается исключением ShutdownRequested.
+    Повторный сигнал останавливает бота немедленно.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.signum = None
+        self._callbacks = []
+        self._interruptible = False
+
+    @property
+    def requested(self):
+        """Проверяет, запрошена ли остановка."""
+        return self.event.is_set()
+
+    def install(self, signals=STOP_SIGNALS):
+        """Устанавливает обработчики сигналов остановки."""
+        for signum in signals:
+            signal.signal(signum, self._handle)
+
+    def add_callback(self, callback):
+        """Добавляет функцию, вызываемую при запросе остановки."""
+        self._callbacks.append(callback)
+        if self.requested:
+            callback()
+
+    def request(self, signum=None):
+        """Запрашивает остановку бота."""
+        self.signum = signum
+        self.event.set()
+        for callback in self._callbacks:
+            callback()
+
+    def wait(self, timeout=None):
+        """Ожидает запроса остановки не дольше timeout секунд."""
+        return self.event.wait(timeout)
+
+    @contextmanager
+    def interruptible(self):
+        """Разрешает прервать ожидание сигналом остановки."""
+        if self.requested:
+            raise exceptions.ShutdownRequested()
+        self._interruptible = True
+        try:
+            yield
+        finally:
+            self._interruptible = False
+
+    def reset(self):
+        """Сбрасывает запрос остановки."""
+        self.event.clear()
+        self.signum = None
+        self._callbacks = []
+
+    def _handle(self, signum, frame):
+        """Обрабатывает сигнал остановки."""
+        name = signal.Signals(signum).name
+        if self.requested:
+            logger.warning(f"Повторный сигнал {name}, немедленная остановка.")
+            raise KeyboardInterrupt
+        logger.info(f"Получен сигнал {name}, бот завершает работу...")
+        self.request(signum)
+        if self._interruptible:
+            raise exceptions.ShutdownRequested()
+
+
+SHUTDOWN = Shutdown()
@@ -0,0 +1,87 @@
+"""Профилирование времени запуска бота."""
+import os
+import subprocess
+import sys
+import time
+
+IMPORT_TIME_PREFIX = "import time:"
+
+
+def parse_import_times(lines):
+    """Разбирает вывод -X importtime.
+
+    Возвращает список (модуль, собственное и суммарное время в
+    микросекундах, глубина вложенности).
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        self_time, cumulative, name = line[len(IMPORT_TIME_PREFIX):].split(
+            "|"
+        )
+        if not self_time.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append(
+            (name.strip(), int(self_time), int(cumulative), depth)
+        )
+    return entries
+
+
+def import_times(modules):
+    """Импортирует модули в отдельном процессе с -X importtime.
+
+    Возвращает записи о модулях и время работы процесса в секундах.
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [
+            sys.executable, "-X", "importtime", "-c",
+            f"import {', '.join(modules)}",
+        ],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        raise RuntimeError(
+            f"Не удалось импортировать {', '.join(modules)}: "
+            f"{result.stderr.strip().splitlines()[-1]}"
+        )
+    return parse_import_times(result.stderr.splitlines()), elapsed
+
+
+def format_report(entries, elapsed, modules, top=20):
+    """Формирует отчет о самых долгих импортах модулей modules.
+
+    Модули, импортированные при запуске интерпретатора, не учитываются.
+    """
+    start = 0
+    for index, entry in enumerate(entries):
+        if entry[3] == 0:
+            if entry[0] in modules:
+                break
+            start = index + 1
+    entries = entries[start:]
+    roots = [entry for entry in entries if entry[3] <= 1]
+    roots.sort(key=lambda entry: entry[2], reverse=True)
+    total = sum(entry[2] for entry in entries if entry[3] == 0)
+    lines = [
+        f"Импорт {', '.join(modules)}: {total / 1000:.1f} мс, "
+        f"запуск процесса: {elapsed * 1000:.1f} мс.",
+        f"{'суммарно, мс':>14} {'собственно, мс':>15}  модуль",
+    ]
+    for name, self_time, cumulative, depth in roots[:top]:
+        lines.append(
+            f"{cumulative / 1000:>14.1f} {self_time / 1000:>15.1f}  "
+            f"{'  ' * depth}{name}"
+        )
+    return "\n".join(lines)
+
+
+def main(modules, top=20):
+    """Выводит отчет о времени импорта модулей."""
+    entries, elapsed = import_times(modules)
+    print(format_report(entries, elapsed, modules, top))
+    return 0
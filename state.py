@@ -0,0 +1,171 @@
+"""Хранилище состояния подписчиков между перезапусками бота."""
+import logging
+import sqlite3
+import threading
+import time
+
+from constants import (STATE_BUSY_TIMEOUT, STATE_FLUSH_INTERVAL, STATE_PATH,
+                       STATE_SYNCHRONOUS)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS cursors ("
+    "tenant TEXT PRIMARY KEY, timestamp INTEGER NOT NULL, "
+    "last_message TEXT NOT NULL DEFAULT '', "
+    "polled_at INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS verdicts ("
+    "tenant TEXT NOT NULL, homework TEXT NOT NULL, status TEXT NOT NULL, "
+    "PRIMARY KEY (tenant, homework))",
+)
+ADD_POLLED_AT = (
+    "ALTER TABLE cursors ADD COLUMN polled_at INTEGER NOT NULL DEFAULT 0"
+)
+UPSERT_CURSOR = (
+    "INSERT INTO cursors (tenant, timestamp, last_message, polled_at) "
+    "VALUES (?, ?, ?, ?) ON CONFLICT (tenant) DO UPDATE SET "
+    "timestamp = excluded.timestamp, last_message = excluded.last_message, "
+    "polled_at = MAX(polled_at, excluded.polled_at)"
+)
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+class StateStore:
+    """Хранилище курсоров current_date и доставленных вердиктов в SQLite.
+
+    Изменения накапливаются в памяти и записываются одной транзакцией не
+    чаще, чем раз в flush_interval секунд. Режим synchronous определяет,
+    как часто SQLite вызывает fsync: OFF, NORMAL, FULL или EXTRA.
+    """
+
+    def __init__(self, path=STATE_PATH, flush_interval=STATE_FLUSH_INTERVAL,
+                 synchronous=STATE_SYNCHRONOUS):
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(
+                f"Режим synchronous {synchronous} не поддерживается. "
+                f"Допустимые значения: {', '.join(SYNCHRONOUS_MODES)}."
+            )
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._verdicts = {}
+        self._last_flush = time.monotonic()
+        self._connection = sqlite3.connect(
+            path, timeout=STATE_BUSY_TIMEOUT, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(f"PRAGMA synchronous={synchronous}")
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+            columns = {
+                row[1] for row in
+                self._connection.execute("PRAGMA table_info(cursors)")
+            }
+            if "polled_at" not in columns:
+                self._connection.execute(ADD_POLLED_AT)
+
+    def load_cursor(self, key):
+        """Возвращает сохраненные (timestamp, last_message) или None."""
+        with self._lock:
+            if key in self._cursors:
+                return self._cursors[key][:2]
+            return self._connection.execute(
+                "SELECT timestamp, last_message FROM cursors WHERE tenant = ?",
+                (key,),
+            ).fetchone()
+
+    def save_cursor(self, key, timestamp, last_message="", polled_at=0):
+        """Запоминает курсор подписчика до следующей записи на диск.
+
+        Время последнего успешного опроса polled_at не уменьшается: при
+        polled_at=0 сохраняется прежнее значение.
+        """
+        with self._lock:
+            pending = self._cursors.get(key)
+            if pending is not None:
+                polled_at = max(polled_at, pending[2])
+            self._cursors[key] = (
+                int(timestamp), str(last_message), int(polled_at)
+            )
+
+    def load_poll_time(self, key):
+        """Возвращает время последнего успешного опроса подписчика или 0."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT polled_at FROM cursors WHERE tenant = ?", (key,)
+            ).fetchone()
+            polled_at = row[0] if row else 0
+            pending = self._cursors.get(key)
+        if pending is not None:
+            polled_at = max(polled_at, pending[2])
+        return polled_at
+
+    def load_verdicts(self, key):
+        """Возвращает последние доставленные статусы работ подписчика."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT homework, status FROM verdicts WHERE tenant = ?",
+                (key,),
+            ).fetchall()
+            verdicts = dict(rows)
+            for (tenant, name), status in self._verdicts.items():
+                if tenant == key:
+                    verdicts[name] = status
+        return verdicts
+
+    def save_verdict(self, key, homework_name, status):
+        """Запоминает доставленный статус работы подписчика."""
+        with self._lock:
+            self._verdicts[(key, homework_name)] = status
+
+    def restore(self, tenant):
+        """Восстанавливает курсор и последнее сообщение подписчика."""
+        saved = self.load_cursor(tenant.key)
+        if saved is None:
+            return False
+        tenant.timestamp, tenant.last_message = saved
+        return True
+
+    def save(self, tenant, polled_at=0):
+        """Запоминает курсор и последнее сообщение подписчика.
+
+        После успешного опроса API передается его время polled_at.
+        """
+        self.save_cursor(
+            tenant.key, tenant.timestamp, tenant.last_message, polled_at
+        )
+
+    def flush(self):
+        """Записывает накопленные изменения на диск одной транзакцией."""
+        with self._lock:
+            cursors, self._cursors = self._cursors, {}
+            verdicts, self._verdicts = self._verdicts, {}
+            self._last_flush = time.monotonic()
+            if not cursors and not verdicts:
+                return 0
+            with self._connection:
+                self._connection.executemany(
+                    UPSERT_CURSOR,
+                    [(key, *value) for key, value in cursors.items()],
+                )
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?)",
+                    [(*key, status) for key, status in verdicts.items()],
+                )
+        written = len(cursors) + len(verdicts)
+        logger.debug(f"Состояние сохранено, записей: {written}.")
+        return written
+
+    def maybe_flush(self):
+        """Записывает изменения, если истек интервал flush_interval."""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            return self.flush()
+        return 0
+
+    def close(self):
+        """Записывает накопленные изменения и закрывает базу."""
+        self.flush()
+        self._connection.close()
@@ -0,0 +1,130 @@
+"""Реестр подписчиков бота для многопользовательского режима."""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from scheduler import PollPolicy
+from sharding import select_shard
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+POLICY_FIELDS = ("min_interval", "max_interval")
+
+
+def make_tenant_key(practicum_token, chat_id):
+    """Возвращает ключ подписчика, не раскрывающий его токен."""
+    digest = hashlib.sha256(str(practicum_token).encode()).hexdigest()
+    return f"{digest[:16]}:{chat_id}"
+
+
+class Tenant:
+    """Подписчик бота: токен API Yandex Practicum и его чат в Telegram.
+
+    Помимо токена и чата хранит состояние опроса: курсор timestamp,
+    последнее сообщение, время следующего опроса, число ошибок подряд,
+    валидаторы и хеш последнего ответа API для условного запроса.
+    Подписчиков может быть очень много, поэтому атрибуты объявлены в
+    __slots__, а одинаковые значения (политика опроса, время загрузки
+    реестра) разделяются между подписчиками.
+    """
+
+    __slots__ = (
+        "key", "practicum_token", "chat_id", "timestamp", "last_message",
+        "policy", "next_poll", "failures", "reviewing", "last_change",
+        "poll_entry", "validators", "digest",
+    )
+
+    def __init__(self, practicum_token, chat_id, timestamp=0, policy=None,
+                 now=None):
+        self.key = make_tenant_key(practicum_token, chat_id)
+        self.practicum_token = str(practicum_token)
+        self.chat_id = str(chat_id)
+        self.timestamp = int(timestamp)
+        self.last_message = ""
+        self.policy = policy
+        self.next_poll = 0
+        self.failures = 0
+        self.reviewing = False
+        self.last_change = time.time() if now is None else now
+        self.poll_entry = None
+        self.validators = None
+        self.digest = None
+
+    def __repr__(self):
+        return f"Tenant(chat_id={self.chat_id!r})"
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+def _make_tenant(record, source, now, policies):
+    """Создает подписчика из записи реестра.
+
+    Время загрузки now и одинаковые политики опроса из словаря policies
+    используются всеми подписчиками совместно.
+    """
+    token = record.get("practicum_token")
+    chat_id = record.get("chat_id")
+    if not token or not chat_id:
+        raise ValueError(
+            f"Запись реестра подписчиков {source} должна содержать "
+            "practicum_token и chat_id."
+        )
+    bounds = tuple(
+        (field, float(record[field]))
+        for field in POLICY_FIELDS if record.get(field) is not None
+    )
+    policy = None
+    if bounds:
+        policy = policies.get(bounds)
+        if policy is None:
+            policy = policies[bounds] = PollPolicy(**dict(bounds))
+    timestamp = record.get("timestamp") or now
+    return Tenant(token, chat_id, timestamp, policy, now)
+
+
+def _read_json(path):
+    """Читает записи подписчиков из файла JSON."""
+    with open(path, encoding="utf-8") as file:
+        records = json.load(file)
+    if not isinstance(records, list):
+        raise TypeError(
+            f"Реестр подписчиков {path} должен содержать список записей."
+        )
+    return records
+
+
+def _read_sqlite(path):
+    """Читает записи подписчиков из таблицы subscribers базы SQLite.
+
+    Помимо обязательных колонок practicum_token и chat_id таблица может
+    содержать колонки min_interval и max_interval.
+    """
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    try:
+        rows = connection.execute(
+            "SELECT * FROM subscribers"
+        ).fetchall()
+    finally:
+        connection.close()
+    return [dict(row) for row in rows]
+
+
+def load_tenants(path, shards=1, shard_id=0):
+    """Загружает подписчиков из файла JSON или базы SQLite.
+
+    При shards > 1 возвращает только подписчиков шарда shard_id.
+    """
+    if os.path.splitext(path)[1].lower() in SQLITE_SUFFIXES:
+        records = _read_sqlite(path)
+    else:
+        records = _read_json(path)
+    tenants = {}
+    now = int(time.time())
+    policies = {}
+    for record in records:
+        tenant = _make_tenant(record, path, now, policies)
+        tenants[(tenant.practicum_token, tenant.chat_id)] = tenant
+    return select_shard(tenants.values(), shards, shard_id)
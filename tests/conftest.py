@@ -1,6 +1,8 @@
 import sys
 import os
 
+import pytest
+
 
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(root_dir)
@@ -25,4 +27,18 @@ pytest_plugins = [
 os.environ['PRACTICUM_TOKEN'] = 'sometoken'
 os.environ['TELEGRAM_TOKEN'] = '1234:abcdefg'
 os.environ['TELEGRAM_CHAT_ID'] = '12345'
+os.environ['STATE_PATH'] = ':memory:'
+
+
 
+@pytest.fixture(autouse=True)
+def reset_global_state():
+    import botpool
+    import circuit
+    import quota
+    import shutdown
+    circuit.PRACTICUM.reset()
+    circuit.TELEGRAM.reset()
+    quota.QUOTA.reset()
+    shutdown.SHUTDOWN.reset()
+    botpool.BOTS.close()
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import utils
+from api_client import PracticumClient
+from state import StateStore
+from test_engine import FakeSession, RecordingBot
+
+
+def client_with_delays(delays):
+    def mocked_get(*args, headers=None, params=None, **kwargs):
+        time.sleep(delays[headers['Authorization'].split()[-1]])
+        response = utils.MockResponseGET(http_status=200)
+        response.json = lambda: {
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': 100,
+        }
+        return response
+    return PracticumClient(session=FakeSession(mocked_get))
+
+
+def run_timed_cycle(client, bot, tenants, concurrency):
+    import aioengine
+
+    async def timed():
+        started = time.monotonic()
+        poll_engine = aioengine.AsyncPollEngine(
+            client, bot, StateStore(':memory:'), concurrency
+        )
+        await poll_engine.run_cycle(tenants)
+        return time.monotonic() - started
+    return asyncio.run(timed())
+
+
+class TestAsyncEngine:
+    def test_cycle_takes_max_latency(self, homework_module):
+        import tenants
+        delays = {f'token{i}': 0.2 for i in range(10)}
+        client = client_with_delays(delays)
+        tenant_list = [tenants.Tenant(token, i) for i, token in enumerate(delays)]
+        bot = RecordingBot()
+        elapsed = run_timed_cycle(client, bot, tenant_list, concurrency=10)
+        assert elapsed < 1, (
+            'Опрос подписчиков должен выполняться конкурентно.'
+        )
+        assert len(bot.sent) == 10
+        assert all(tenant.timestamp == 100 for tenant in tenant_list)
+
+    def test_hung_endpoint_does_not_stall(self, monkeypatch, homework_module):
+        import aioengine
+        import tenants
+        monkeypatch.setattr(aioengine, 'ASYNC_TIMEOUT', 0.2)
+        client = client_with_delays({'fast': 0, 'hung': 0.8})
+        fast = tenants.Tenant('fast', '1')
+        hung = tenants.Tenant('hung', '2')
+        bot = RecordingBot()
+        elapsed = run_timed_cycle(client, bot, [hung, fast], concurrency=2)
+        assert elapsed < 0.6
+        assert fast.timestamp == 100 and hung.timestamp == 0
+        assert 'Ура' in dict(bot.sent)['1']
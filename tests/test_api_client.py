@@ -0,0 +1,200 @@
+import json
+from http import HTTPStatus
+
+import pytest
+import requests
+
+import exceptions
+import records
+import utils
+from api_client import NOT_MODIFIED, PracticumClient
+from test_engine import FakeSession
+
+
+def client_raising(error):
+    def mocked_get(*args, **kwargs):
+        raise error
+    return PracticumClient(session=FakeSession(mocked_get))
+
+
+def client_with_status(http_status):
+    def mocked_get(*args, **kwargs):
+        response = utils.MockResponseGET(http_status=http_status)
+        response.url = kwargs['url']
+        response.headers = {}
+        return response
+    return PracticumClient(session=FakeSession(mocked_get))
+
+
+class TestPracticumClient:
+    def test_own_session_is_pooled(self):
+        client = PracticumClient(pool_size=32)
+        adapter = client.session.get_adapter('https://practicum.yandex.ru')
+        assert adapter._pool_maxsize == 32, (
+            'Размер пула соединений должен задаваться параметром pool_size.'
+        )
+        assert client.session.headers['Authorization'].startswith('OAuth ')
+        client.close()
+
+    def test_token_overrides_authorization(self):
+        calls = []
+
+        def mocked_get(*args, **kwargs):
+            calls.append(kwargs)
+            return utils.MockResponseGET(random_timestamp=1)
+        client = PracticumClient(session=FakeSession(mocked_get))
+        assert client.get_api_answer(5, 'abc')['current_date'] == 1
+        assert calls[0]['headers'] == {'Authorization': 'OAuth abc'}
+        assert calls[0]['params'] == {'from_date': 5}
+
+    @pytest.mark.parametrize('error, expected', [
+        (requests.exceptions.Timeout(),
+         exceptions.RequestAPIYandexPracticumTimeout),
+        (requests.exceptions.ConnectionError(),
+         exceptions.RequestAPIYandexPracticumConnectionError),
+        (requests.RequestException(),
+         exceptions.RequestAPIYandexPracticumException),
+    ])
+    def test_request_errors_mapping(self, error, expected):
+        with pytest.raises(expected):
+            client_raising(error).get_api_answer(0)
+
+    @pytest.mark.parametrize('http_status, expected', [
+        (HTTPStatus.NOT_FOUND, exceptions.NotFoundEndpointException),
+        (HTTPStatus.INTERNAL_SERVER_ERROR,
+         exceptions.NotOkStatusCodeException),
+    ])
+    def test_status_code_mapping(self, http_status, expected):
+        with pytest.raises(expected):
+            client_with_status(http_status).get_api_answer(0)
+
+
+class CachedResponse:
+    def __init__(self, body, status_code=HTTPStatus.OK, headers=None):
+        self.content = json.dumps(body).encode()
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.url = ''
+        self.text = ''
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class TestResponseCache:
+    BODY = {'homeworks': [], 'current_date': 1}
+
+    def test_not_modified_by_etag(self):
+        calls = []
+
+        def mocked_get(*args, headers=None, **kwargs):
+            calls.append(headers)
+            if headers.get('If-None-Match') == '"v1"':
+                return CachedResponse({}, HTTPStatus.NOT_MODIFIED)
+            return CachedResponse(self.BODY, headers={'ETag': '"v1"'})
+
+        client = PracticumClient(session=FakeSession(mocked_get))
+        assert client.poll_api_answer(0, 'abc') == self.BODY
+        assert client.poll_api_answer(0, 'abc') is NOT_MODIFIED, (
+            'Ответ 304 должен возвращать `NOT_MODIFIED`.'
+        )
+        assert calls[1] == {
+            'Authorization': 'OAuth abc', 'If-None-Match': '"v1"'
+        }
+        assert client.cache.hit_ratio == 0.5
+
+    def test_not_modified_by_content_hash(self):
+        dates = iter(range(100))
+
+        def mocked_get(*args, **kwargs):
+            return CachedResponse(
+                {'homeworks': [], 'current_date': next(dates)}
+            )
+
+        client = PracticumClient(session=FakeSession(mocked_get))
+        client.poll_api_answer(0, 'abc')
+        assert client.poll_api_answer(0, 'abc') is NOT_MODIFIED, (
+            'Ответы, отличающиеся только `current_date`, должны считаться '
+            'неизменившимися.'
+        )
+        assert client.poll_api_answer(5, 'abc') is not NOT_MODIFIED, (
+            'Кеш должен учитывать `from_date`.'
+        )
+        assert client.poll_api_answer(0, 'other') is not NOT_MODIFIED, (
+            'Кеш должен учитывать токен.'
+        )
+
+    def test_changed_response_is_parsed(self):
+        bodies = iter([
+            self.BODY,
+            {'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+             'current_date': 2},
+        ])
+
+        def mocked_get(*args, **kwargs):
+            return CachedResponse(next(bodies))
+
+        client = PracticumClient(session=FakeSession(mocked_get))
+        client.poll_api_answer(0)
+        assert client.poll_api_answer(0)['current_date'] == 2
+        assert client.cache.hits == 0 and client.cache.misses == 2
+
+    def test_engine_skips_unchanged_answer(self, monkeypatch):
+        import tenants
+        from test_engine import RecordingBot, make_engine
+
+        def mocked_get(*args, **kwargs):
+            return CachedResponse({'homeworks': [], 'current_date': 100})
+
+        client = PracticumClient(session=FakeSession(mocked_get))
+        bot = RecordingBot()
+        poll_engine = make_engine(client, bot)
+        tenant = tenants.Tenant('token', '1', 10)
+        poll_engine.run_cycle([tenant])
+        assert tenant.timestamp == 10, (
+            'Курсор не должен сдвигаться, если в ответе нет работ.'
+        )
+        monkeypatch.setattr(records, 'validate_response', None)
+        tenant.next_poll = 0
+        poll_engine.run_cycle([tenant])
+        assert client.cache.hits == 1
+        assert bot.sent == [], (
+            'Неизменившийся ответ не должен разбираться.'
+        )
+        assert len(client.cache) == 0 and tenant.digest is not None, (
+            'Движок должен хранить хеш ответа в подписчике, а не в кеше.'
+        )
+
+    def test_failed_delivery_is_retried(self):
+        import tenants
+        from test_engine import RecordingBot, make_engine
+
+        class FlakyBot(RecordingBot):
+            failures = 1
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                if self.failures:
+                    self.failures -= 1
+                    raise RuntimeError('Telegram недоступен')
+                super().send_message(chat_id, text)
+
+        def mocked_get(*args, **kwargs):
+            return CachedResponse(
+                {'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                 'current_date': 100},
+                headers={'ETag': '"v1"'},
+            )
+
+        client = PracticumClient(session=FakeSession(mocked_get))
+        bot = FlakyBot()
+        poll_engine = make_engine(client, bot)
+        tenant = tenants.Tenant('token', '1', 10)
+        poll_engine.run_cycle([tenant])
+        assert tenant.timestamp == 10
+        tenant.next_poll = 0
+        poll_engine.run_cycle([tenant])
+        assert any('Ура' in text for _, text in bot.sent), (
+            'Ответ, изменения из которого не доставлены, не должен '
+            'сохраняться в кеше условных запросов.'
+        )
+        assert tenant.timestamp == 100
@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+
+import backfill
+import utils
+from api_client import PracticumClient
+from state import StateStore
+from tenants import Tenant
+from test_engine import FakeSession, RecordingBot
+
+
+def streaming_client(data, calls):
+    def mocked_get(*args, **kwargs):
+        calls.append(kwargs)
+        response = utils.MockResponseGET(http_status=200)
+        body = json.dumps(data).encode()
+        response.iter_content = lambda size: (
+            body[index:index + size] for index in range(0, len(body), size)
+        )
+        response.close = lambda: None
+        return response
+    return PracticumClient(session=FakeSession(mocked_get))
+
+
+class TestBackfill:
+    RESPONSE = {
+        'homeworks': [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'homework_name': 'hw2', 'status': 'reviewing'},
+        ],
+        'current_date': 500,
+    }
+
+    def test_replays_history_once(self):
+        calls = []
+        client = streaming_client(self.RESPONSE, calls)
+        bot = RecordingBot()
+        store = StateStore(':memory:')
+        tenant = Tenant('token', '1', timestamp=100)
+        assert backfill.backfill(client, bot, store, [tenant]) == 0
+        assert calls[0]['params'] == {'from_date': 0}
+        assert calls[0]['stream'] is True, (
+            'Ответ API при воспроизведении истории должен читаться потоково.'
+        )
+        assert [text for _, text in bot.sent] == [
+            'Изменился статус проверки работы "hw1". '
+            'Работа проверена: ревьюеру всё понравилось. Ура!',
+            'Изменился статус проверки работы "hw2". '
+            'Работа взята на проверку ревьюером.',
+        ]
+        assert store.load_cursor(tenant.key)[0] == 500
+        backfill.backfill(client, bot, store, [tenant])
+        assert len(bot.sent) == 2, (
+            'Повторное воспроизведение не должно дублировать сообщения.'
+        )
+
+    def test_error_does_not_stop_other_tenants(self):
+        client = streaming_client({'current_date': 1}, [])
+        bot = RecordingBot()
+        tenants = [Tenant('token1', '1'), Tenant('token2', '2')]
+        failed = backfill.backfill(
+            client, bot, StateStore(':memory:'), tenants
+        )
+        assert failed == 2
+
+
+class TestCatchUp:
+    RESPONSE = {
+        'homeworks': [
+            {'homework_name': 'hw1', 'status': 'reviewing',
+             'date_updated': '2024-01-01T10:00:00Z'},
+            {'homework_name': 'hw1', 'status': 'approved',
+             'date_updated': '2024-01-02T10:00:00Z'},
+            {'homework_name': 'hw2', 'status': 'rejected',
+             'date_updated': '2024-01-01T12:00:00Z'},
+        ],
+        'current_date': 900,
+    }
+
+    def test_collapse_keeps_final_state(self):
+        records = backfill.collapse(reversed(self.RESPONSE['homeworks']))
+        assert [(r.name, r.status) for r in records] == [
+            ('hw2', 'rejected'), ('hw1', 'approved'),
+        ], 'Для каждой работы должно остаться только последнее состояние.'
+
+    def test_summary_is_split_by_length(self):
+        records = backfill.collapse(
+            {'homework_name': f'hw{number}', 'status': 'approved'}
+            for number in range(100)
+        )
+        messages = backfill.format_summary(records, limit=500)
+        assert len(messages) > 1
+        assert all(len(message) <= 500 for message in messages)
+        assert all(
+            message.startswith(backfill.SUMMARY_HEADER)
+            for message in messages
+        )
+
+    def test_one_summary_per_chat(self):
+        calls = []
+        client = streaming_client(self.RESPONSE, calls)
+        bot = RecordingBot()
+        store = StateStore(':memory:')
+        tenant = Tenant('token', '1')
+        assert backfill.catch_up(client, bot, store, [tenant], 100) == 0
+        assert calls[0]['params'] == {'from_date': 100}
+        assert bot.sent == [('1', (
+            f'{backfill.SUMMARY_HEADER} (2):\n'
+            '"hw1": Работа проверена: ревьюеру всё понравилось. Ура!\n'
+            '"hw2": Работа проверена: у ревьюера есть замечания.'
+        ))], 'Изменения работ должны отправляться одной сводкой в чат.'
+        assert store.load_cursor(tenant.key)[0] == 900
+        backfill.catch_up(client, bot, store, [tenant], 100)
+        assert len(bot.sent) == 1, (
+            'Повторная проверка не должна дублировать сводку.'
+        )
+
+    def test_automatic_catch_up_uses_cursor(self):
+        calls = []
+        client = streaming_client(self.RESPONSE, calls)
+        bot = RecordingBot()
+        store = StateStore(':memory:')
+        behind, fresh, new = (
+            Tenant('token1', '1'), Tenant('token2', '2'),
+            Tenant('token3', '3'),
+        )
+        store.save_cursor(behind.key, 100)
+        store.save_cursor(fresh.key, 9900)
+        backfill.catch_up(
+            client, bot, store, [behind, fresh, new], min_gap=1000,
+            now=10000,
+        )
+        assert [call['params'] for call in calls] == [{'from_date': 100}], (
+            'Изменения должны запрашиваться только для подписчиков с '
+            'отставшим сохраненным курсором.'
+        )
+        assert [chat_id for chat_id, _ in bot.sent] == ['1']
+
+    def test_idle_tenant_is_not_behind(self, homework_module):
+        from test_engine import make_engine
+        calls = []
+        store = StateStore(':memory:')
+        tenant = Tenant('token', '1', 100)
+        idle_client = streaming_client({'homeworks': [], 'current_date': 1}, [])
+        make_engine(idle_client, RecordingBot(), store).run_cycle([tenant])
+        assert store.load_cursor(tenant.key)[0] == 100
+        backfill.catch_up(
+            streaming_client(self.RESPONSE, calls), RecordingBot(), store,
+            [Tenant('token', '1')], min_gap=1000,
+        )
+        assert calls == [], (
+            'Недавно опрошенный подписчик без новых работ не должен '
+            'считаться отставшим из-за старого курсора.'
+        )
+
+    def test_concurrency_is_bounded(self, monkeypatch):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_catch_up(client, bot, statuses, tenant, from_date):
+            with lock:
+                active.append(tenant)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(tenant)
+            return 0
+
+        monkeypatch.setattr(backfill, 'catch_up_tenant', slow_catch_up)
+        tenants = [Tenant(f'token{number}', number) for number in range(12)]
+        failed = backfill.catch_up(
+            None, RecordingBot(), StateStore(':memory:'), tenants, 0,
+            concurrency=3,
+        )
+        assert failed == 0
+        assert max(peak) <= 3, (
+            'Одновременно должно обрабатываться не более concurrency '
+            'подписчиков.'
+        )
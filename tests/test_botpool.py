@@ -0,0 +1,101 @@
+import json
+
+import pytest
+import telegram
+import urllib3
+from telegram import error
+
+from botpool import BotPool, RawBot
+
+
+class FakeResponse:
+    def __init__(self, status, data):
+        self.status = status
+        self.data = json.dumps(data).encode()
+
+
+class FakeConnections:
+    def __init__(self, status=200, data=None, raises=None):
+        self.status = status
+        self.data = data or {'ok': True, 'result': {'message_id': 1}}
+        self.raises = raises
+        self.requests = []
+
+    def request(self, method, url, body=None, headers=None):
+        self.requests.append((method, url, json.loads(body)))
+        if self.raises is not None:
+            raise self.raises
+        return FakeResponse(self.status, self.data)
+
+
+class TestRawBot:
+    def test_send_message(self):
+        connections = FakeConnections()
+        bot = RawBot('1234:token', connections, 'http://telegram')
+        assert bot.send_message(12345, 'text') == {'message_id': 1}
+        assert connections.requests == [(
+            'POST', 'http://telegram/bot1234:token/sendMessage',
+            {'chat_id': 12345, 'text': 'text'},
+        )], 'Сообщение должно отправляться запросом POST в формате JSON.'
+
+    @pytest.mark.parametrize('status, expected', [
+        (400, error.BadRequest),
+        (401, error.Unauthorized),
+        (404, error.InvalidToken),
+        (502, error.NetworkError),
+    ])
+    def test_status_mapping(self, status, expected):
+        connections = FakeConnections(
+            status, {'ok': False, 'description': 'Bad Request: error'}
+        )
+        with pytest.raises(expected):
+            RawBot('1234:token', connections).send_message(1, 'text')
+
+    def test_retry_after(self):
+        connections = FakeConnections(429, {
+            'ok': False, 'description': 'Too Many Requests',
+            'parameters': {'retry_after': 7},
+        })
+        with pytest.raises(error.RetryAfter) as raised:
+            RawBot('1234:token', connections).send_message(1, 'text')
+        assert raised.value.retry_after == 7, (
+            'Срок ожидания должен передаваться из ответа Bot API.'
+        )
+
+    @pytest.mark.parametrize('raises, expected', [
+        (urllib3.exceptions.ReadTimeoutError(None, None, ''), error.TimedOut),
+        (urllib3.exceptions.ProtocolError(), error.NetworkError),
+    ])
+    def test_connection_errors(self, raises, expected):
+        connections = FakeConnections(raises=raises)
+        with pytest.raises(expected):
+            RawBot('1234:token', connections).send_message(1, 'text')
+
+
+class TestBotPool:
+    def test_bots_share_connections(self):
+        pool = BotPool(pool_size=4, sender='library')
+        first = pool.get('1234:first')
+        assert pool.get('1234:first') is first, (
+            'Пул должен возвращать одного бота для токена.'
+        )
+        second = pool.get('1234:second')
+        assert isinstance(first, telegram.Bot)
+        assert first.request is second.request, (
+            'Боты пула должны разделять общий пул соединений.'
+        )
+        assert first.request.con_pool_size == 4
+        pool.close()
+
+    def test_raw_sender(self):
+        pool = BotPool(pool_size=4, sender='raw', base_url='http://telegram')
+        first = pool.get('1234:first')
+        second = pool.get('1234:second')
+        assert isinstance(first, RawBot)
+        assert first.connections is second.connections
+        assert first.url == 'http://telegram/bot1234:first/sendMessage'
+        pool.close()
+
+    def test_unknown_sender(self):
+        with pytest.raises(ValueError):
+            BotPool(sender='unknown')
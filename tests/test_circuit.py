@@ -0,0 +1,161 @@
+import pytest
+import requests
+import telegram
+
+import circuit
+import exceptions
+from test_engine import RecordingBot, client_by_token, make_engine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock):
+    return circuit.CircuitBreaker(
+        'test', (exceptions.RequestAPIYandexPracticumConnectionError,),
+        failure_threshold=2, recovery_timeout=10, max_recovery_timeout=25,
+        clock=clock,
+    )
+
+
+def fail(breaker):
+    error = exceptions.RequestAPIYandexPracticumConnectionError('down')
+    return breaker.record_failure(error)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = make_breaker(FakeClock())
+        assert not fail(breaker)
+        assert breaker.state == circuit.CLOSED
+        assert fail(breaker), (
+            'Выключатель должен размыкаться после `failure_threshold` ошибок.'
+        )
+        with pytest.raises(exceptions.CircuitOpenException) as error:
+            breaker.check()
+        assert error.value.retry_after == 10
+
+    def test_success_resets_failures(self):
+        breaker = make_breaker(FakeClock())
+        fail(breaker)
+        breaker.record_success()
+        fail(breaker)
+        assert breaker.state == circuit.CLOSED
+
+    def test_other_errors_do_not_count(self):
+        breaker = make_breaker(FakeClock())
+        for _ in range(3):
+            breaker.record_failure(ValueError('bad'))
+        assert breaker.state == circuit.CLOSED
+
+    def test_half_open_allows_single_trial(self):
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+        fail(breaker)
+        fail(breaker)
+        clock.now = 10
+        breaker.check()
+        assert breaker.state == circuit.HALF_OPEN
+        with pytest.raises(exceptions.CircuitOpenException):
+            breaker.check()
+        fail(breaker)
+        assert breaker.retry_after() == 20, (
+            'После неудачного пробного запроса срок должен удваиваться.'
+        )
+        clock.now = 30
+        breaker.check()
+        fail(breaker)
+        assert breaker.retry_after() == 25
+        clock.now = 55
+        breaker.check()
+        breaker.record_success()
+        assert breaker.state == circuit.CLOSED
+
+    def test_telegram_chat_errors_ignored(self):
+        breaker = circuit.TELEGRAM
+        for _ in range(10):
+            breaker.record_failure(telegram.error.BadRequest('Chat not found'))
+        assert breaker.state == circuit.CLOSED
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure(telegram.error.TimedOut())
+        assert breaker.state == circuit.OPEN
+
+
+class TestEngineCircuit:
+    def test_outage_skips_polls_and_reports_once(self, monkeypatch):
+        import engine
+        import tenants
+        calls = []
+        client = client_by_token({
+            f'token{number}': requests.exceptions.ConnectionError('down')
+            for number in range(10)
+        })
+        session_get = client.session.get
+
+        def counting_get(*args, **kwargs):
+            calls.append(kwargs)
+            return session_get(*args, **kwargs)
+
+        client.session.get = counting_get
+        monkeypatch.setattr(engine, 'OPERATOR_CHAT_ID', '42')
+        bot = RecordingBot()
+        poll_engine = make_engine(client, bot)
+        tenant_list = [
+            tenants.Tenant(f'token{number}', number) for number in range(10)
+        ]
+        poll_engine.run_cycle(tenant_list)
+        poll_engine.report_outage()
+        assert len(calls) == circuit.PRACTICUM.failure_threshold, (
+            'Пока выключатель разомкнут, API не должен опрашиваться.'
+        )
+        for tenant in tenant_list:
+            tenant.next_poll = 0
+        poll_engine.run_cycle(tenant_list)
+        poll_engine.report_outage()
+        assert len(calls) == circuit.PRACTICUM.failure_threshold
+        assert bot.sent == [('42', engine.OUTAGE_MESSAGE)], (
+            'О недоступности API должно отправляться одно сообщение.'
+        )
+        assert all(tenant.next_poll > 0 for tenant in tenant_list)
+
+    def test_async_outage_stops_queued_polls(self, homework_module):
+        import asyncio
+
+        import aioengine
+        import tenants
+        from quota import QuotaManager
+        from state import StateStore
+        calls = []
+        client = client_by_token({
+            f'token{number}': requests.exceptions.ConnectionError('down')
+            for number in range(50)
+        })
+        session_get = client.session.get
+
+        def counting_get(*args, **kwargs):
+            calls.append(kwargs)
+            return session_get(*args, **kwargs)
+
+        client.session.get = counting_get
+        tenant_list = [
+            tenants.Tenant(f'token{number}', number) for number in range(50)
+        ]
+
+        async def run_cycle():
+            poll_engine = aioengine.AsyncPollEngine(
+                client, RecordingBot(), StateStore(':memory:'), 5,
+                quota=QuotaManager(rate=1000, burst=1000),
+            )
+            await poll_engine.run_cycle(tenant_list)
+
+        asyncio.run(run_cycle())
+        assert circuit.PRACTICUM.state == circuit.OPEN
+        assert len(calls) < circuit.PRACTICUM.failure_threshold + 5, (
+            'После размыкания выключателя ожидающие семафора подписчики '
+            'не должны обращаться к API.'
+        )
@@ -0,0 +1,73 @@
+from commands import NOT_SUBSCRIBED_MESSAGE, CommandHandlers, StatusCache
+from records import HomeworkRecord
+from state import StateStore
+from test_engine import RecordingBot, client_by_token, make_engine
+
+
+class TestStatusCache:
+    def test_status_from_last_payload(self):
+        cache = StatusCache()
+        cache.update('key', [HomeworkRecord('hw1', 'reviewing')])
+        cache.update('key', [HomeworkRecord('hw2', 'approved')])
+        statuses, checked = cache.statuses('key')
+        assert statuses == {'hw1': 'reviewing', 'hw2': 'approved'}
+        assert checked is not None
+
+    def test_status_falls_back_to_store(self):
+        store = StateStore(':memory:')
+        store.save_verdict('key', 'hw', 'rejected')
+        assert StatusCache(store).statuses('key') == (
+            {'hw': 'rejected'}, None
+        )
+
+    def test_update_after_restart_keeps_saved_statuses(self):
+        store = StateStore(':memory:')
+        store.save_verdict('key', 'hw1', 'approved')
+        store.save_verdict('key', 'hw2', 'rejected')
+        cache = StatusCache(store)
+        cache.update('key', [HomeworkRecord('hw2', 'reviewing')])
+        statuses, _ = cache.statuses('key')
+        assert statuses == {'hw1': 'approved', 'hw2': 'reviewing'}
+
+    def test_idle_update_keeps_no_statuses(self):
+        cache = StatusCache()
+        cache.update('key', [])
+        assert cache._statuses == {}
+        assert cache.statuses('key')[1] is not None
+
+    def test_history_is_bounded(self):
+        cache = StatusCache(history_size=2)
+        for status in ('reviewing', 'rejected', 'approved'):
+            cache.record_transition('key', 'hw', status)
+        assert [status for _, _, status in cache.history('key')] == [
+            'rejected', 'approved'
+        ]
+
+
+class TestCommands:
+    def test_answers_from_cache_without_api_calls(self, homework_module):
+        import tenants
+        responses = {'token': {
+            'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+            'current_date': 100,
+        }}
+        calls = []
+        client = client_by_token(responses)
+        get = client.session.get
+
+        def counting_get(*args, **kwargs):
+            calls.append(1)
+            return get(*args, **kwargs)
+        client.session.get = counting_get
+        tenant = tenants.Tenant('token', '42')
+        poll_engine = make_engine(client, RecordingBot())
+        poll_engine.run_cycle([tenant])
+        handlers = CommandHandlers(poll_engine.cache, [tenant])
+        status = handlers.status_text(42)
+        history = handlers.history_text('42')
+        assert 'ревьюеру всё понравилось' in status
+        assert '"hw"' in history
+        assert len(calls) == 1, (
+            'Команды должны обслуживаться из кеша без запросов к API.'
+        )
+        assert handlers.status_text('1') == NOT_SUBSCRIBED_MESSAGE
@@ -0,0 +1,39 @@
+import copy
+import json
+import logging
+
+import conflogging
+
+
+class TestLogging:
+    def test_json_formatter(self):
+        record = logging.LogRecord(
+            'homework', logging.INFO, __file__, 1, 'Статус %s', ('ok',), None
+        )
+        data = json.loads(conflogging.JsonFormatter().format(record))
+        assert data['message'] == 'Статус ok'
+        assert data['level'] == 'INFO' and data['logger'] == 'homework'
+
+    def test_queue_mode_writes_in_background(self, tmp_path):
+        config = copy.deepcopy(conflogging.LOGGING_CONFIG)
+        log_file = tmp_path / 'bot.log'
+        config['handlers']['file']['filename'] = str(log_file)
+        config['handlers']['file']['formatter'] = 'json'
+        config['handlers']['console']['level'] = 'CRITICAL'
+        try:
+            listener = conflogging.setup_logging(config, use_queue=True)
+            root_handlers = logging.getLogger().handlers
+            assert all(
+                isinstance(handler, conflogging.DeferredQueueHandler)
+                for handler in root_handlers
+            ), (
+                'В режиме очереди логгеры должны только помещать записи '
+                'в очередь.'
+            )
+            assert listener._thread is not None
+            logging.getLogger('engine').info('Цикл %s', 1)
+            listener.stop()
+            lines = log_file.read_text(encoding='utf-8').splitlines()
+            assert json.loads(lines[-1])['message'] == 'Цикл 1'
+        finally:
+            conflogging.setup_logging()
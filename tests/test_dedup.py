@@ -0,0 +1,135 @@
+import time
+
+from dedup import NO_STATUSES, StatusTracker, TTLCache
+from records import STATUS_CODES
+from state import StateStore
+from test_engine import RecordingBot, client_by_token, make_engine
+
+
+class TestTTLCache:
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.add('a')
+        cache.add('b')
+        cache.add('a')
+        cache.add('c')
+        assert 'a' in cache and 'c' in cache
+        assert 'b' not in cache, (
+            'При переполнении кеша должна вытесняться самая старая запись.'
+        )
+        assert len(cache) == 2
+
+    def test_expiration(self, monkeypatch):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.add('a')
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now + 61)
+        assert 'a' not in cache
+        assert len(cache) == 0
+
+
+class TestStatusTracker:
+    def test_transitions_survive_restart(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        store = StateStore(path)
+        tracker = StatusTracker(store)
+        assert tracker.is_transition('tenant', 'hw', 'reviewing')
+        tracker.remember('tenant', 'hw', 'reviewing')
+        assert not tracker.is_transition('tenant', 'hw', 'reviewing')
+        assert tracker.is_transition('other', 'hw', 'reviewing')
+        store.close()
+
+        tracker = StatusTracker(StateStore(path))
+        assert not tracker.is_transition('tenant', 'hw', 'reviewing')
+        assert tracker.is_transition('tenant', 'hw', 'approved')
+
+    def test_statuses_interned(self):
+        tracker = StatusTracker(StateStore(':memory:'))
+        assert tracker.is_transition('idle', 'hw', 'approved')
+        assert tracker._statuses['idle'] is NO_STATUSES, (
+            'Подписчики без статусов должны ссылаться на общий словарь.'
+        )
+        tracker.remember('tenant', 'hw', ''.join(['appr', 'oved']))
+        assert tracker._statuses['tenant'] == {
+            'hw': STATUS_CODES['approved']
+        }, 'Статусы должны храниться номерами из HOMEWORK_VERDICTS.'
+        assert not tracker.is_transition('tenant', 'hw', 'approved')
+        assert NO_STATUSES == {}
+
+
+class TestEngineDedup:
+    def test_only_transitions_are_sent(self, homework_module):
+        import tenants
+        responses = {'token': {
+            'homeworks': [{'homework_name': 'hw', 'status': 'reviewing'}],
+            'current_date': 100,
+        }}
+        bot = RecordingBot()
+        poll_engine = make_engine(client_by_token(responses), bot)
+        tenant = tenants.Tenant('token', '1')
+        poll_engine.run_cycle([tenant])
+        poll_engine.run_cycle([tenant])
+        assert len(bot.sent) == 1, (
+            'Сообщение о статусе работы должно отправляться только при '
+            'его изменении.'
+        )
+        responses['token']['homeworks'][0]['status'] = 'approved'
+        poll_engine.run_cycle([tenant])
+        assert len(bot.sent) == 2
+
+    def test_repeated_errors_suppressed_after_restore(self, homework_module):
+        import requests
+        import tenants
+        client = client_by_token({
+            'token': requests.RequestException('bad request'),
+        })
+        poll_engine = make_engine(client, RecordingBot())
+        tenant = tenants.Tenant('token', '1')
+        poll_engine.run_cycle([tenant])
+        poll_engine.store.save(tenant)
+
+        bot = RecordingBot()
+        restarted = make_engine(client, bot, poll_engine.store)
+        restarted.restore([tenant])
+        restarted.run_cycle([tenant])
+        assert bot.sent == []
+
+    def test_status_error_with_changing_headers_sent_once(
+            self, homework_module):
+        import itertools
+
+        import tenants
+        import utils
+        from api_client import PracticumClient
+        from test_engine import FakeSession
+        seconds = itertools.count()
+
+        def unauthorized(*args, **kwargs):
+            response = utils.MockResponseGET(http_status=401)
+            response.url = kwargs['url']
+            response.headers = {
+                'Date': f'Mon, 01 Jan 2024 10:00:{next(seconds):02d} GMT'
+            }
+            return response
+
+        client = PracticumClient(session=FakeSession(unauthorized))
+        bot = RecordingBot()
+        poll_engine = make_engine(client, bot)
+        tenant = tenants.Tenant('token', '1')
+        for _ in range(4):
+            tenant.next_poll = 0
+            poll_engine.run_cycle([tenant])
+        assert bot.sent == [
+            ('1', 'Нежелательный статус ответа от API: код 401.')
+        ], 'Повторная ошибка статус-кода не должна отправляться снова.'
+
+
+class TestWarningTelegram:
+    def test_last_message_is_returned(self, homework_module):
+        bot = RecordingBot()
+        last_message = ''
+        for _ in range(3):
+            last_message = homework_module.warning_telegram(
+                'Сбой', last_message, bot
+            )
+        assert len(bot.sent) == 1
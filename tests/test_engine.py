@@ -0,0 +1,153 @@
+import json
+import sqlite3
+
+import requests
+
+import utils
+from api_client import PracticumClient
+from state import StateStore
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class FakeSession:
+    def __init__(self, get):
+        self.get = get
+
+
+def client_by_token(responses):
+    def mocked_get(*args, headers=None, params=None, **kwargs):
+        token = headers['Authorization'].split()[-1]
+        data = responses[token]
+        if isinstance(data, Exception):
+            raise data
+        response = utils.MockResponseGET(http_status=200)
+        response.json = lambda: data
+        return response
+    return PracticumClient(session=FakeSession(mocked_get))
+
+
+class TestTenants:
+    RECORDS = [
+        {'practicum_token': 'token1', 'chat_id': '1'},
+        {'practicum_token': 'token2', 'chat_id': 2},
+        {'practicum_token': 'token1', 'chat_id': '1'},
+    ]
+
+    def test_load_json(self, tmp_path):
+        import tenants
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps(self.RECORDS))
+        loaded = tenants.load_tenants(str(path))
+        assert [t.chat_id for t in loaded] == ['1', '2'], (
+            'Реестр должен загружать подписчиков без дубликатов.'
+        )
+
+    def test_load_sqlite(self, tmp_path):
+        import tenants
+        path = tmp_path / 'tenants.db'
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE subscribers (practicum_token TEXT, chat_id TEXT)'
+        )
+        connection.executemany(
+            'INSERT INTO subscribers VALUES (:practicum_token, :chat_id)',
+            self.RECORDS
+        )
+        connection.commit()
+        connection.close()
+        loaded = tenants.load_tenants(str(path))
+        assert len(loaded) == 2
+
+    def test_tenant_has_no_dict(self):
+        import tenants
+        assert not hasattr(tenants.Tenant('token', '1'), '__dict__')
+
+    def test_loaded_tenants_share_values(self, tmp_path):
+        import tenants
+        path = tmp_path / 'tenants.json'
+        records = [
+            {'practicum_token': f'token{i}', 'chat_id': i,
+             'min_interval': 60, 'max_interval': 600}
+            for i in range(1, 4)
+        ]
+        path.write_text(json.dumps(records))
+        first, *others = tenants.load_tenants(str(path))
+        for tenant in others:
+            assert tenant.policy is first.policy, (
+                'Одинаковые политики опроса должны разделяться подписчиками.'
+            )
+            assert tenant.timestamp is first.timestamp
+            assert tenant.last_change is first.last_change
+
+
+def make_engine(client, bot, store=None):
+    import engine
+    return engine.PollEngine(client, bot, store or StateStore(':memory:'))
+
+
+class TestEngine:
+    def test_cycle_isolates_tenants(self, homework_module):
+        import tenants
+        client = client_by_token({
+            'good': {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 100,
+            },
+            'bad': requests.RequestException('bad request'),
+        })
+        good = tenants.Tenant('good', '1', 10)
+        bad = tenants.Tenant('bad', '2', 20)
+        bot = RecordingBot()
+        make_engine(client, bot).run_cycle([bad, good])
+        assert good.timestamp == 100 and bad.timestamp == 20, (
+            'Курсор каждого подписчика должен обновляться независимо.'
+        )
+        chats = [chat_id for chat_id, _ in bot.sent]
+        assert sorted(chats) == ['1', '2']
+        assert 'Ура' in dict(bot.sent)['1']
+
+    def test_repeated_message_not_sent(self, homework_module):
+        import tenants
+        client = client_by_token({
+            'bad': requests.RequestException('bad request'),
+        })
+        tenant = tenants.Tenant('bad', '2')
+        bot = RecordingBot()
+        poll_engine = make_engine(client, bot)
+        poll_engine.run_cycle([tenant])
+        poll_engine.run_cycle([tenant])
+        assert len(bot.sent) == 1
+
+    def test_cursor_kept_until_delivered(self, homework_module):
+        import tenants
+        client = client_by_token({
+            'token': {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 100,
+            },
+        })
+
+        class FailingBot:
+            def send_message(self, *args, **kwargs):
+                raise RuntimeError('telegram is down')
+
+        tenant = tenants.Tenant('token', '1', 10)
+        poll_engine = make_engine(client, FailingBot())
+        poll_engine.run_cycle([tenant])
+        assert tenant.timestamp == 10, (
+            'Курсор не должен сдвигаться, пока сообщения не доставлены.'
+        )
+        poll_engine.bot = RecordingBot()
+        tenant.next_poll = 0
+        poll_engine.run_cycle([tenant])
+        assert tenant.timestamp == 100
+        assert poll_engine.store.load_verdicts(tenant.key) == {
+            'hw': 'approved'
+        }
@@ -0,0 +1,69 @@
+import json
+import tracemalloc
+
+import pytest
+
+from jsonstream import HomeworkStream
+
+RESPONSE = {
+    'current_date': 1700000000,
+    'homeworks': [
+        {'homework_name': 'hw1', 'status': 'approved', 'comment': 'Отлично'},
+        {'homework_name': 'hw2', 'status': 'rejected', 'score': 1.5e3},
+    ],
+    'extra': [None, True, False],
+}
+
+
+def chunked(data, size):
+    return (data[index:index + size] for index in range(0, len(data), size))
+
+
+class TestHomeworkStream:
+    @pytest.mark.parametrize('size', [1, 2, 3, 7, 4096])
+    def test_matches_json_loads(self, size):
+        data = json.dumps(RESPONSE, ensure_ascii=False, indent=1).encode()
+        stream = HomeworkStream(chunked(data, size))
+        assert list(stream) == RESPONSE['homeworks'], (
+            'Потоковый разбор должен возвращать те же работы, что и '
+            '`json.loads`, при любом размере частей.'
+        )
+        assert stream.current_date == RESPONSE['current_date']
+        assert stream.fields['extra'] == RESPONSE['extra']
+        assert stream.finished
+
+    @pytest.mark.parametrize('data, error', [
+        (b'', TypeError),
+        (b'{}', TypeError),
+        (b'[]', TypeError),
+        (b'{"current_date": 1}', KeyError),
+        (b'{"homeworks": null}', KeyError),
+        (b'{"homeworks": {}}', TypeError),
+        (b'{"homeworks": [{"a": 1}', json.JSONDecodeError),
+    ])
+    def test_invalid_response(self, data, error):
+        with pytest.raises(error):
+            list(HomeworkStream(chunked(data, 3)))
+
+    def test_memory_is_flat(self):
+        item = json.dumps(
+            {'homework_name': 'hw', 'status': 'approved', 'text': 'x' * 200}
+        ).encode()
+
+        def chunks(count):
+            yield b'{"homeworks": ['
+            for index in range(count):
+                yield (b',' if index else b'') + item
+            yield b'], "current_date": 1}'
+
+        tracemalloc.start()
+        try:
+            stream = HomeworkStream(chunks(20000))
+            count = sum(1 for _ in stream)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert count == 20000
+        assert peak < len(item) * 20000 / 10, (
+            'Потоковый разбор не должен держать в памяти весь ответ.'
+        )
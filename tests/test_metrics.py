@@ -0,0 +1,54 @@
+import requests
+
+import exceptions
+import metrics
+
+
+class TestMetrics:
+    def test_counter_exposition(self):
+        counter = metrics.Counter('test_total', 'Test.', ('exception',))
+        counter.inc(exception='KeyError')
+        counter.inc(2, exception='KeyError')
+        assert counter.value(exception='KeyError') == 3
+        assert 'test_total{exception="KeyError"} 3' in counter.expose()
+        assert '# TYPE test_total counter' in counter.expose()
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('test_seconds', 'Test.', (0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+        lines = histogram.expose().splitlines()
+        assert 'test_seconds_bucket{le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{le="1"} 2' in lines
+        assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+        assert 'test_seconds_count 3' in lines
+
+    def test_gauge_function(self):
+        gauge = metrics.Gauge('test_gauge', 'Test.', lambda: 7)
+        assert gauge.samples() == ['test_gauge 7']
+
+    def test_errors_counted_by_class(self, homework_module):
+        before = metrics.ERRORS.value(
+            exception='RequestAPIYandexPracticumTimeout'
+        )
+        homework_module.handle_error(
+            exceptions.RequestAPIYandexPracticumTimeout('timeout')
+        )
+        assert metrics.ERRORS.value(
+            exception='RequestAPIYandexPracticumTimeout'
+        ) == before + 1, (
+            'Ошибки должны учитываться в счетчике по классу исключения.'
+        )
+
+    def test_http_endpoint(self):
+        server = metrics.start_http_server(0)
+        try:
+            port = server.server_address[1]
+            response = requests.get(f'http://127.0.0.1:{port}/metrics')
+            assert response.status_code == 200
+            assert 'homework_api_request_seconds_bucket' in response.text
+            missing = requests.get(f'http://127.0.0.1:{port}/other')
+            assert missing.status_code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from outbox import Outbox, coalesce
+from ratelimit import TokenBucket
+from test_engine import RecordingBot
+
+
+class FlakyBot(RecordingBot):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('Too Many Requests')
+        super().send_message(chat_id, text)
+
+
+def make_outbox(bot, **kwargs):
+    options = dict(
+        workers=2, global_rate=1000, global_burst=1000, chat_rate=1000,
+        chat_burst=1000, coalesce_window=0.05, max_retries=2,
+        retry_delay=0.01,
+    )
+    options.update(kwargs)
+    return Outbox(bot, **options).start()
+
+
+class TestTokenBucket:
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=100, capacity=2)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.01, abs=0.005), (
+            'После исчерпания всплеска токены должны выдаваться с '
+            'частотой rate.'
+        )
+        assert bucket.reserve() == pytest.approx(0.02, abs=0.005)
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestOutbox:
+    def test_messages_are_coalesced_per_chat(self):
+        bot = RecordingBot()
+        delivered = []
+        outbox = make_outbox(bot)
+        for number in range(3):
+            outbox.put('1', f'message {number}', lambda: delivered.append(1))
+        outbox.put('2', 'other chat')
+        assert outbox.close(timeout=2)
+        texts = dict(bot.sent)
+        assert len(bot.sent) == 2, (
+            'Сообщения одного чата должны объединяться в одно.'
+        )
+        assert texts['1'] == 'message 0\n\nmessage 1\n\nmessage 2'
+        assert len(delivered) == 3
+
+    def test_failed_send_is_retried(self):
+        bot = FlakyBot(failures=2)
+        outbox = make_outbox(bot)
+        outbox.put('1', 'verdict')
+        assert outbox.close(timeout=2)
+        assert bot.sent == [('1', 'verdict')]
+
+    def test_message_dropped_after_max_retries(self):
+        bot = FlakyBot(failures=10)
+        delivered = []
+        outbox = make_outbox(bot)
+        outbox.put('1', 'verdict', lambda: delivered.append(1))
+        assert outbox.close(timeout=2)
+        assert bot.sent == [] and delivered == []
+        assert outbox.qsize() == 0
+
+    def test_chat_rate_limit(self):
+        bot = RecordingBot()
+        outbox = make_outbox(
+            bot, chat_rate=20, chat_burst=1, coalesce_window=0
+        )
+        started = time.monotonic()
+        for number in range(5):
+            outbox.put('1', f'message {number}')
+            time.sleep(0.001)
+        assert outbox.close(timeout=5)
+        assert [text for _, text in bot.sent][-1].endswith('message 4')
+        assert time.monotonic() - started < 2
+
+    def test_coalesce_respects_length_limit(self):
+        items = [('a' * 6, None)] * 3
+        assert [len(group) for group in coalesce(items, limit=14)] == [2, 1]
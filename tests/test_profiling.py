@@ -0,0 +1,150 @@
+import os
+import subprocess
+import sys
+
+from profiling import NOOP, Profiler, RingBuffer, percentile
+
+
+class TestRingBuffer:
+    def test_keeps_last_values(self):
+        buffer = RingBuffer(3)
+        for value in range(5):
+            buffer.append(value)
+        assert buffer.count == 5
+        assert buffer.snapshot() == [2, 3, 4], (
+            'Кольцевой буфер должен хранить только последние значения.'
+        )
+
+    def test_percentile(self):
+        values = list(range(100))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) == 0
+
+
+class TestProfiler:
+    def test_disabled_is_noop(self):
+        profiler = Profiler(enabled=False)
+        assert profiler.stage('http') is NOOP
+        assert profiler.cycle() is NOOP
+        with profiler.stage('http'):
+            pass
+        assert profiler.summary() == {}, (
+            'Выключенный профилировщик не должен ничего измерять.'
+        )
+
+    def test_stages_summary(self):
+        profiler = Profiler(enabled=True, window=10)
+        for nanoseconds in (1_000_000, 2_000_000, 3_000_000):
+            profiler.record('http', nanoseconds)
+        with profiler.stage('decode'):
+            pass
+        summary = profiler.summary()
+        assert summary['http']['count'] == 3
+        assert summary['http']['p50'] == 2.0
+        assert summary['http']['max'] == 3.0
+        assert summary['decode']['count'] == 1
+        assert 'http' in profiler.format_summary()
+
+    def test_sampled_cycle_writes_profile(self, tmp_path):
+        profiler = Profiler(
+            enabled=True, sample_every=2, directory=str(tmp_path)
+        )
+        for _ in range(4):
+            with profiler.cycle():
+                sum(range(100))
+        files = sorted(os.listdir(tmp_path))
+        assert len(files) == 2 and files[0].endswith('.prof'), (
+            'Каждый sample_every-й цикл должен сохраняться в файл .prof.'
+        )
+        assert profiler.summary()['cycle']['count'] == 4
+
+    def test_dump_interval(self, caplog):
+        profiler = Profiler(enabled=True, dump_interval=0.001)
+        profiler._last_dump -= 1
+        with caplog.at_level('INFO', logger='profiling'):
+            with profiler.cycle():
+                pass
+        assert 'Профиль этапов опроса' in caplog.text
+
+    def test_signal_during_record_does_not_deadlock(self):
+        code = (
+            'import logging, os, signal, sys, time\n'
+            'from profiling import Profiler\n'
+            'logging.basicConfig(level="INFO", stream=sys.stdout)\n'
+            'profiler = Profiler(enabled=True)\n'
+            'profiler.record("http", 1000)\n'
+            'profiler.install()\n'
+            'with profiler._lock:\n'
+            '    os.kill(os.getpid(), signal.SIGUSR1)\n'
+            '    time.sleep(0.1)\n'
+            'time.sleep(0.5)\n'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            timeout=10,
+        )
+        assert 'Профиль этапов опроса' in result.stdout, (
+            'Сигнал SIGUSR1 не должен блокировать процесс, удерживающий '
+            'блокировку профилировщика.'
+        )
+
+
+class TestMainLoopStages:
+    def test_main_records_stages(self, homework_module, monkeypatch):
+        import utils
+
+        profiler = Profiler(enabled=True)
+        monkeypatch.setattr(homework_module, 'PROFILER', profiler)
+        monkeypatch.setattr(
+            homework_module, 'get_api_answer',
+            lambda timestamp: {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 1,
+            },
+        )
+        bot = utils.MockTelegramBot(token='1234:abcdefg')
+        monkeypatch.setattr(homework_module, 'send_message',
+                            lambda bot, message: None)
+        tracker = homework_module.StatusTracker(
+            homework_module.StateStore(':memory:')
+        )
+        tenant = homework_module.Tenant('token', '1', 0)
+        with profiler.cycle():
+            homework_module.poll_once(bot, tracker, tenant)
+        assert tenant.timestamp == 1
+        assert {'cycle', 'check_response', 'parse_status'} <= set(
+            profiler.summary()
+        ), 'Цикл опроса должен измерять время своих этапов.'
+
+
+class TestAsyncCycle:
+    def test_async_run_profiles_cycles(self, monkeypatch, tmp_path):
+        import asyncio
+
+        import aioengine
+        import tenants
+        from shutdown import SHUTDOWN
+        from state import StateStore
+        from test_engine import RecordingBot, client_by_token
+
+        profiler = Profiler(enabled=True, sample_every=1, directory=tmp_path)
+        monkeypatch.setattr(aioengine, 'PROFILER', profiler)
+        poll_engine = aioengine.AsyncPollEngine(
+            client_by_token({'token': {'homeworks': [], 'current_date': 1}}),
+            RecordingBot(), StateStore(':memory:'), 2,
+        )
+        run_cycle = poll_engine.run_cycle
+
+        async def run_once(due):
+            await run_cycle(due)
+            SHUTDOWN.request()
+        poll_engine.run_cycle = run_once
+        asyncio.run(poll_engine.run([tenants.Tenant('token', '1')]))
+        assert 'cycle' in profiler.summary(), (
+            'Асинхронный цикл опроса должен измеряться профилировщиком.'
+        )
+        assert list(tmp_path.glob('*.prof')), (
+            'Выборочный цикл асинхронного опроса должен сохранять профиль.'
+        )
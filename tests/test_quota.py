@@ -0,0 +1,137 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+import exceptions
+import scheduler
+from api_client import PracticumClient, parse_retry_after
+from quota import QuotaManager
+from test_circuit import FakeClock
+from test_engine import FakeSession, RecordingBot, make_engine
+
+
+class ThrottledResponse:
+    status_code = 429
+    url = 'https://practicum.test/'
+    text = ''
+
+    def __init__(self, retry_after):
+        self.headers = {'Retry-After': retry_after}
+
+
+class TestRetryAfter:
+    def test_seconds_and_date(self):
+        assert parse_retry_after('120') == 120
+        now = time.time()
+        date = formatdate(now + 30, usegmt=True)
+        assert 28 <= parse_retry_after(date, now=now) <= 31, (
+            'Заголовок Retry-After в виде даты должен переводиться в секунды.'
+        )
+
+    def test_missing_or_invalid_uses_default(self):
+        assert parse_retry_after(None, default=60) == 60
+        assert parse_retry_after('soon', default=60) == 60
+
+
+class TestQuotaManager:
+    def test_bucket_limits_rate(self):
+        quota = QuotaManager(rate=10, burst=2)
+        assert quota.reserve() == 0 and quota.reserve() == 0
+        assert quota.reserve() == pytest.approx(0.1, abs=0.02), (
+            'Запросы сверх всплеска должны ожидать токенов корзины.'
+        )
+
+    def test_throttle_rejects_until_deadline(self):
+        clock = FakeClock()
+        quota = QuotaManager(rate=10, burst=2, clock=clock)
+        quota.throttle(30)
+        with pytest.raises(exceptions.TooManyRequestsException) as error:
+            quota.check()
+        assert error.value.retry_after == 30
+        clock.now = 31
+        quota.check()
+
+    def test_call_throttles_on_429(self):
+        quota = QuotaManager(rate=100, burst=10)
+
+        def throttled():
+            raise exceptions.TooManyRequestsException('429', 45)
+
+        with pytest.raises(exceptions.TooManyRequestsException):
+            quota.call(throttled)
+        assert 44 < quota.retry_after() <= 45
+
+    def test_acquire_rechecks_after_wait(self, monkeypatch):
+        quota = QuotaManager(rate=1, burst=1)
+        quota.reserve()
+        monkeypatch.setattr(
+            time, 'sleep', lambda delay: quota.throttle(30)
+        )
+        with pytest.raises(exceptions.TooManyRequestsException):
+            quota.acquire()
+
+
+class TestEngineQuota:
+    def test_429_defers_tenant(self, homework_module):
+        import tenants
+        client = PracticumClient(
+            session=FakeSession(lambda *args, **kwargs: ThrottledResponse('90'))
+        )
+        bot = RecordingBot()
+        poll_engine = make_engine(client, bot)
+        poll_engine.quota = QuotaManager(rate=100, burst=10)
+        first = tenants.Tenant('token1', '1', 10)
+        second = tenants.Tenant('token2', '2', 10)
+        now = time.time()
+        poll_engine.run_cycle([first, second])
+        assert bot.sent == [], (
+            'Об ограничении частоты запросов подписчику не сообщается.'
+        )
+        for tenant in (first, second):
+            assert tenant.timestamp == 10 and tenant.failures == 0
+            assert 85 <= tenant.next_poll - now <= 91, (
+                'Опрос подписчика должен откладываться на срок Retry-After.'
+            )
+
+    def test_spread_first_polls(self):
+        import tenants
+        tenant_list = [tenants.Tenant(f'token{i}', i) for i in range(4)]
+        scheduler.spread(tenant_list, 1000, period=600)
+        assert [tenant.next_poll for tenant in tenant_list] == [
+            1000, 1150, 1300, 1450
+        ], 'Первые опросы должны равномерно распределяться по интервалу.'
+
+    def test_async_429_defers_queued_tenants(self, homework_module):
+        import asyncio
+
+        import aioengine
+        import tenants
+        from state import StateStore
+        calls = []
+
+        def throttled_get(*args, **kwargs):
+            calls.append(kwargs)
+            return ThrottledResponse('90')
+
+        client = PracticumClient(session=FakeSession(throttled_get))
+        tenant_list = [tenants.Tenant(f'token{i}', i, 10) for i in range(5)]
+        now = time.time()
+
+        async def run_cycle():
+            poll_engine = aioengine.AsyncPollEngine(
+                client, RecordingBot(), StateStore(':memory:'), 5,
+                quota=QuotaManager(rate=50, burst=1),
+            )
+            await poll_engine.run_cycle(tenant_list)
+
+        asyncio.run(run_cycle())
+        assert len(calls) == 1, (
+            'После ответа 429 подписчики, ожидавшие квоты, не должны '
+            'обращаться к API.'
+        )
+        for tenant in tenant_list:
+            assert tenant.timestamp == 10
+            assert 85 <= tenant.next_poll - now <= 91, (
+                'Опрос подписчика должен откладываться на срок Retry-After.'
+            )
@@ -0,0 +1,58 @@
+import pytest
+
+from constants import HOMEWORK_VERDICTS
+from records import decode_response, parse_homework, validate_response
+
+
+class TestRecords:
+    def test_decode_builds_messages(self):
+        response = {
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': status}
+                for status in HOMEWORK_VERDICTS
+            ],
+            'current_date': 42,
+        }
+        records, current_date = decode_response(response)
+        assert current_date == 42, (
+            'Проверьте, что `decode_response` возвращает `current_date`.'
+        )
+        for record, (status, verdict) in zip(
+            records, HOMEWORK_VERDICTS.items()
+        ):
+            assert record.status == status
+            assert record.message == (
+                f'Изменился статус проверки работы "hw1". {verdict}'
+            ), 'Проверьте формат сообщения о смене статуса.'
+
+    def test_status_is_interned(self):
+        status = ''.join(['appr', 'oved'])
+        record = parse_homework({'homework_name': 'hw', 'status': status})
+        assert record.status is next(
+            key for key in HOMEWORK_VERDICTS if key == 'approved'
+        ), 'Статус записи должен ссылаться на ключ `HOMEWORK_VERDICTS`.'
+
+    @pytest.mark.parametrize('homework, error', [
+        ({'status': 'approved'}, KeyError),
+        ({'homework_name': 'hw'}, KeyError),
+        ({'homework_name': 'hw', 'status': 'unknown'}, ValueError),
+    ])
+    def test_invalid_homework(self, homework, error):
+        with pytest.raises(error):
+            decode_response({'homeworks': [homework]})
+
+    @pytest.mark.parametrize('response, error', [
+        ({}, TypeError),
+        ([{'homeworks': []}], TypeError),
+        ({'current_date': 1}, KeyError),
+        ({'homeworks': {}}, TypeError),
+    ])
+    def test_invalid_response(self, response, error):
+        with pytest.raises(error):
+            validate_response(response)
+
+    def test_non_string_name(self):
+        records, _ = decode_response(
+            {'homeworks': [{'homework_name': 7, 'status': 'reviewing'}]}
+        )
+        assert records[0].name == '7'
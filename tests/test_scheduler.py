@@ -0,0 +1,123 @@
+import pytest
+
+import exceptions
+from records import HomeworkRecord
+from scheduler import (PollPolicy, PollQueue, record_failure, record_success,
+                       schedule)
+from tenants import Tenant
+
+
+class TestPollPolicy:
+    POLICY = PollPolicy(
+        interval=600, reviewing_interval=120, failure_interval=60,
+        idle_interval=1800, idle_after=1000, min_interval=30,
+        max_interval=3600, jitter=0,
+    )
+
+    def make_tenant(self, now=0):
+        tenant = Tenant('token', '1', policy=self.POLICY)
+        tenant.last_change = now
+        return tenant
+
+    def test_default_interval(self):
+        tenant = self.make_tenant()
+        assert schedule(tenant, 10) == 610
+
+    def test_reviewing_shortens_interval(self):
+        tenant = self.make_tenant()
+        record_success(tenant, [HomeworkRecord('hw', 'reviewing')], 10)
+        assert schedule(tenant, 10) == 130
+        record_success(tenant, [HomeworkRecord('hw', 'approved')], 20)
+        assert schedule(tenant, 20) == 620
+
+    def test_exponential_backoff(self):
+        tenant = self.make_tenant()
+        intervals = []
+        for _ in range(8):
+            record_failure(
+                tenant, exceptions.NotOkStatusCodeException('429')
+            )
+            intervals.append(schedule(tenant, 0))
+        assert intervals[:4] == [60, 120, 240, 480]
+        assert intervals[-1] == 3600, (
+            'Интервал при ошибках должен ограничиваться max_interval.'
+        )
+        record_success(tenant, [], 0)
+        assert schedule(tenant, 0) == 600
+
+    def test_other_errors_do_not_back_off(self):
+        tenant = self.make_tenant()
+        record_failure(tenant, KeyError('homeworks'))
+        assert tenant.failures == 0
+
+    def test_jitter_is_bounded(self):
+        policy = PollPolicy(failure_interval=100, jitter=0.1)
+        tenant = Tenant('token', '1', policy=policy)
+        tenant.failures = 1
+        values = {schedule(tenant, 0) for _ in range(50)}
+        assert len(values) > 1
+        assert all(90 <= value <= 110 for value in values)
+
+    def test_idle_tenant_stretches_interval(self):
+        tenant = self.make_tenant(now=0)
+        assert schedule(tenant, 999) == 999 + 600
+        assert schedule(tenant, 1000) == 1000 + 1800
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            PollPolicy(min_interval=100, max_interval=10)
+
+
+def make_tenants(*polls):
+    tenants = []
+    for number, next_poll in enumerate(polls):
+        tenant = Tenant(f'token{number}', number)
+        tenant.next_poll = next_poll
+        tenants.append(tenant)
+    return tenants
+
+
+class TestPollQueue:
+    def test_pop_due_in_order(self):
+        tenants = make_tenants(30, 10, 20, 40)
+        queue = PollQueue(tenants)
+        due = queue.pop_due(25)
+        assert [tenant.next_poll for tenant in due] == [10, 20], (
+            'Очередь должна возвращать только подписчиков, время опроса '
+            'которых наступило, в порядке этого времени.'
+        )
+        assert len(queue) == 2
+        assert queue.seconds_until_next(25) == 5
+
+    def test_reschedule(self):
+        tenants = make_tenants(10, 20)
+        queue = PollQueue(tenants)
+        tenants[0].next_poll = 50
+        queue.push(tenants[0])
+        assert len(queue) == 2
+        assert queue.pop_due(30) == [tenants[1]], (
+            'Перенесенный опрос не должен выполняться в прежнее время.'
+        )
+        assert queue.pop_due(50) == [tenants[0]]
+        assert queue.pop_due(1000) == []
+
+    def test_cancel(self):
+        tenants = make_tenants(10, 20)
+        queue = PollQueue(tenants)
+        assert queue.cancel(tenants[0])
+        assert not queue.cancel(tenants[0])
+        assert tenants[0] not in queue
+        assert queue.seconds_until_next(0) == 20
+        assert queue.pop_due(100) == [tenants[1]]
+
+    def test_compacts_stale_entries(self):
+        tenants = make_tenants(*range(10))
+        queue = PollQueue(tenants)
+        for step in range(1000):
+            tenant = tenants[step % 10]
+            tenant.next_poll += 1
+            queue.push(tenant)
+        assert len(queue._heap) <= max(20, PollQueue.COMPACT_MIN), (
+            'Устаревшие записи не должны накапливаться в куче.'
+        )
+        assert len(queue.pop_due(10 ** 6)) == 10
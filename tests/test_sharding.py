@@ -0,0 +1,97 @@
+import pytest
+
+from sharding import HashRing, select_shard
+from tenants import Tenant
+
+
+class TestSharding:
+    KEYS = [f'token{number}' for number in range(10000)]
+
+    def test_shards_are_balanced(self):
+        ring = HashRing(4)
+        counts = [0] * 4
+        for key in self.KEYS:
+            counts[ring.shard_for(key)] += 1
+        assert min(counts) > len(self.KEYS) / 4 * 0.7
+
+    def test_adding_shard_moves_few_keys(self):
+        before, after = HashRing(4), HashRing(5)
+        moved = sum(
+            before.shard_for(key) != after.shard_for(key) for key in self.KEYS
+        )
+        assert moved < len(self.KEYS) * 0.3, (
+            'При добавлении шарда должна переезжать примерно 1/N '
+            'подписчиков.'
+        )
+        assert all(
+            after.shard_for(key) == 4
+            for key in self.KEYS
+            if before.shard_for(key) != after.shard_for(key)
+        )
+
+    def test_select_shard_partitions_tenants(self):
+        tenants = [Tenant(key, number) for number, key in
+                   enumerate(self.KEYS[:500])]
+        shards = [select_shard(tenants, 3, shard_id) for shard_id in range(3)]
+        assert sum(len(shard) for shard in shards) == len(tenants)
+        assert {t.chat_id for shard in shards for t in shard} == {
+            t.chat_id for t in tenants
+        }
+
+    @pytest.mark.parametrize('argv', [
+        ['--shards', '2'],
+        ['--tenants', 't.json', '--shards', '2', '--shard-id', '2'],
+        ['--tenants', 't.json', '--shards', '2', '--commands'],
+    ])
+    def test_invalid_arguments(self, argv, homework_module):
+        with pytest.raises(SystemExit):
+            homework_module.parse_args(argv)
+
+
+WORKER = (
+    'import os, time\n'
+    'from shutdown import SHUTDOWN\n'
+    'SHUTDOWN.install()\n'
+    'os.write(1, b"ready\\n")\n'
+    'SHUTDOWN.wait(10)\n'
+    'time.sleep(1)\n'
+)
+# Супервизор передает сигнал с задержкой, иначе два одинаковых сигнала,
+# дошедших до процесса шарда почти одновременно, ядро объединяет в один.
+SUPERVISOR = (
+    'import subprocess, sys, time\n'
+    'import sharding\n'
+    'send_signal = subprocess.Popen.send_signal\n'
+    'subprocess.Popen.send_signal = lambda self, signum: '
+    '(time.sleep(0.3), send_signal(self, signum))\n'
+    'sharding.worker_command = lambda argv, shard_id: '
+    '[sys.executable, "-c", {worker!r}]\n'
+    'sys.exit(sharding.supervise([], 2))\n'
+)
+
+
+class TestSupervisor:
+    def test_group_signal_reaches_worker_once(self):
+        import os
+        import signal
+        import subprocess
+        import sys
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        supervisor = subprocess.Popen(
+            [sys.executable, '-c', SUPERVISOR.format(worker=WORKER)],
+            cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, start_new_session=True,
+        )
+        try:
+            for _ in range(2):
+                assert supervisor.stdout.readline().strip() == 'ready'
+            os.killpg(supervisor.pid, signal.SIGINT)
+            code = supervisor.wait(timeout=15)
+        finally:
+            if supervisor.poll() is None:
+                os.killpg(supervisor.pid, signal.SIGKILL)
+        stderr = supervisor.stderr.read()
+        assert code == 0 and 'немедленная остановка' not in stderr, (
+            'Сигнал группе процессов супервизора должен доходить до '
+            'процесса шарда один раз, через супервизор.'
+        )
@@ -0,0 +1,130 @@
+import signal
+
+import pytest
+
+import exceptions
+import utils
+from shutdown import SHUTDOWN, Shutdown
+from state import StateStore
+from test_engine import RecordingBot, client_by_token
+from test_outbox import make_outbox
+
+RESPONSES = {
+    'token': {
+        'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+        'current_date': 100,
+    },
+}
+
+
+def make_engine(bot, store, outbox):
+    import engine
+    return engine.PollEngine(client_by_token(RESPONSES), bot, store, outbox)
+
+
+class TestShutdown:
+    def test_signal_interrupts_wait(self):
+        shutdown = Shutdown()
+        with pytest.raises(exceptions.ShutdownRequested):
+            with shutdown.interruptible():
+                shutdown._handle(signal.SIGTERM, None)
+        assert shutdown.requested and shutdown.signum == signal.SIGTERM
+
+    def test_signal_outside_wait_only_requests(self):
+        shutdown = Shutdown()
+        calls = []
+        shutdown.add_callback(lambda: calls.append(True))
+        shutdown._handle(signal.SIGTERM, None)
+        assert shutdown.requested and calls == [True]
+        with pytest.raises(KeyboardInterrupt):
+            shutdown._handle(signal.SIGINT, None)
+
+    def test_main_stops_after_signal(self, homework_module, monkeypatch):
+        import telegram
+
+        def sleep(seconds):
+            SHUTDOWN._handle(signal.SIGTERM, None)
+
+        monkeypatch.setattr(telegram, 'Bot', utils.MockTelegramBot)
+        monkeypatch.setattr(homework_module.time, 'sleep', sleep)
+        monkeypatch.setattr(
+            homework_module, 'get_api_answer',
+            lambda timestamp: {'homeworks': [], 'current_date': 1},
+        )
+        homework_module.main()
+        assert SHUTDOWN.requested
+
+
+class TestEngineShutdown:
+    def test_run_stops_when_requested(self, homework_module):
+        import tenants
+        poll_engine = make_engine(
+            RecordingBot(), StateStore(':memory:'), None
+        )
+        SHUTDOWN.request()
+        poll_engine.run([tenants.Tenant('token', '1', 10)])
+
+    def test_undelivered_messages_resent_once(self, homework_module,
+                                              tmp_path):
+        import tenants
+        path = str(tmp_path / 'state.db')
+        bot = RecordingBot()
+        outbox = make_outbox(bot, coalesce_window=60)
+        poll_engine = make_engine(bot, StateStore(path), outbox)
+        tenant = tenants.Tenant('token', '1', 10)
+        poll_engine.run_cycle([tenant])
+        assert tenant.timestamp == 100
+        assert not poll_engine.stop([tenant], timeout=0.05), (
+            'Остановка с неотправленной очередью должна возвращать False.'
+        )
+        assert bot.sent == []
+
+        bot = RecordingBot()
+        store = StateStore(path)
+        restarted = make_engine(bot, store, make_outbox(bot))
+        tenant = tenants.Tenant('token', '1', 10)
+        restarted.restore([tenant])
+        assert tenant.timestamp == 10, (
+            'Курсор должен указывать на момент до недоставленных сообщений.'
+        )
+        restarted.run_cycle([tenant])
+        assert restarted.stop([tenant], timeout=5)
+        assert len(bot.sent) == 1
+
+        bot = RecordingBot()
+        again = make_engine(bot, StateStore(path), make_outbox(bot))
+        again.restore([tenant])
+        tenant.next_poll = 0
+        again.run_cycle([tenant])
+        assert again.stop([tenant], timeout=5)
+        assert bot.sent == [], (
+            'После перезапуска доставленные сообщения не должны повторяться.'
+        )
+
+    def test_async_stop_interrupts_quota_wait(self, homework_module):
+        import asyncio
+        import threading
+        import time
+
+        import aioengine
+        import tenants
+        from quota import QuotaManager
+        poll_engine = aioengine.AsyncPollEngine(
+            client_by_token({
+                f'token{number}': {'homeworks': [], 'current_date': 1}
+                for number in range(20)
+            }),
+            RecordingBot(), StateStore(':memory:'), 5,
+            quota=QuotaManager(rate=2, burst=1),
+        )
+        tenant_list = [
+            tenants.Tenant(f'token{number}', number) for number in range(20)
+        ]
+        timer = threading.Timer(0.5, SHUTDOWN.request)
+        timer.start()
+        started = time.monotonic()
+        asyncio.run(poll_engine.run(tenant_list))
+        timer.join()
+        assert time.monotonic() - started < 2, (
+            'Запрос остановки должен прерывать ожидание квоты запросов.'
+        )
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import startup
+
+IMPORT_TIME_OUTPUT = [
+    'import time: self [us] | cumulative | imported package',
+    'import time:        50 |         50 |   _io',
+    'import time:       100 |        150 | site',
+    'import time:       300 |        300 |     requests.compat',
+    'import time:       200 |        500 |   requests',
+    'import time:       100 |        600 | homework',
+]
+
+
+class TestStartup:
+    def test_heavy_modules_not_imported(self):
+        code = (
+            'import sys, homework, engine; '
+            'print("loaded:", [m for m in ("telegram", "asyncio") '
+            'if m in sys.modules])'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True,
+            cwd=startup.os.path.dirname(startup.__file__), check=True,
+        )
+        assert result.stdout.splitlines()[-1] == 'loaded: []', (
+            'Импорт бота не должен загружать python-telegram-bot и asyncio.'
+        )
+
+    def test_lazy_bot_created_on_first_use(self, homework_module,
+                                           monkeypatch):
+        import telegram
+        created = []
+
+        class FakeBot:
+            def __init__(self, token, **kwargs):
+                created.append(token)
+
+            def send_message(self, chat_id, text):
+                return text
+
+        monkeypatch.setattr(telegram, 'Bot', FakeBot)
+        bot = homework_module.LazyBot('1234:token')
+        assert created == []
+        assert bot.send_message(1, 'text') == 'text'
+        bot.send_message(1, 'text')
+        assert created == ['1234:token'], (
+            'Бот должен создаваться один раз при первой отправке.'
+        )
+
+    def test_report_skips_interpreter_startup(self):
+        entries = startup.parse_import_times(IMPORT_TIME_OUTPUT)
+        assert entries[3] == ('requests', 200, 500, 1)
+        report = startup.format_report(entries, 1, ['homework'])
+        assert report.startswith('Импорт homework: 0.6 мс'), report
+        assert 'site' not in report and 'requests' in report
@@ -0,0 +1,82 @@
+import pytest
+
+from state import StateStore
+from tenants import Tenant
+
+
+class TestStateStore:
+    def test_resume_after_restart(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        store = StateStore(path)
+        tenant = Tenant('token', '1', 100)
+        tenant.last_message = 'Сбой'
+        store.save(tenant)
+        store.save_verdict(tenant.key, 'hw', 'reviewing')
+        store.save_verdict(tenant.key, 'hw', 'approved')
+        store.close()
+
+        store = StateStore(path)
+        restored = Tenant('token', '1', 500)
+        assert store.restore(restored), (
+            'После перезапуска курсор подписчика должен восстанавливаться.'
+        )
+        assert restored.timestamp == 100
+        assert restored.last_message == 'Сбой'
+        assert store.load_verdicts(restored.key) == {'hw': 'approved'}
+        assert not store.restore(Tenant('other', '1'))
+        store.close()
+
+    def test_writes_are_batched(self, tmp_path):
+        store = StateStore(str(tmp_path / 'state.db'), flush_interval=3600)
+        for timestamp in range(100):
+            store.save_cursor('key', timestamp)
+        assert store.maybe_flush() == 0, (
+            'Изменения должны записываться пакетами, а не при каждом опросе.'
+        )
+        assert store.load_cursor('key') == (99, '')
+        assert store.flush() == 1
+        assert store.flush() == 0
+        store.close()
+
+    def test_poll_time_is_kept(self, tmp_path):
+        path = str(tmp_path / 'state.db')
+        store = StateStore(path)
+        store.save_cursor('key', 10, polled_at=500)
+        store.flush()
+        store.save_cursor('key', 20)
+        assert store.load_poll_time('key') == 500, (
+            'Сохранение курсора без опроса не должно сбрасывать время '
+            'последнего успешного опроса.'
+        )
+        store.close()
+        store = StateStore(path)
+        assert store.load_cursor('key') == (20, '')
+        assert store.load_poll_time('key') == 500
+        assert store.load_poll_time('other') == 0
+        store.close()
+
+    def test_old_database_is_migrated(self, tmp_path):
+        import sqlite3
+        path = str(tmp_path / 'state.db')
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "CREATE TABLE cursors (tenant TEXT PRIMARY KEY, "
+            "timestamp INTEGER NOT NULL, "
+            "last_message TEXT NOT NULL DEFAULT '')"
+        )
+        connection.execute("INSERT INTO cursors VALUES ('key', 7, '')")
+        connection.commit()
+        connection.close()
+        store = StateStore(path)
+        assert store.load_cursor('key') == (7, '')
+        assert store.load_poll_time('key') == 0
+        store.save_cursor('key', 8, polled_at=900)
+        store.close()
+        assert StateStore(path).load_poll_time('key') == 900
+
+    def test_invalid_synchronous_mode(self):
+        with pytest.raises(ValueError):
+            StateStore(':memory:', synchronous='sometimes')
+
+    def test_token_not_stored_in_key(self):
+        assert 'secret' not in Tenant('secret', '1').key
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from state import StateStore
+from test_aioengine import client_with_delays
+from test_engine import RecordingBot, client_by_token
+from test_outbox import make_outbox
+
+
+def make_threaded_engine(client, bot, workers, outbox=None):
+    import threadengine
+    return threadengine.ThreadedPollEngine(
+        client, bot, StateStore(':memory:'), workers, outbox
+    )
+
+
+class TestThreadedEngine:
+    def test_cycle_takes_max_latency(self, homework_module):
+        import tenants
+        delays = {f'token{i}': 0.2 for i in range(10)}
+        tenant_list = [
+            tenants.Tenant(token, i) for i, token in enumerate(delays)
+        ]
+        bot = RecordingBot()
+        poll_engine = make_threaded_engine(
+            client_with_delays(delays), bot, workers=10
+        )
+        started = time.monotonic()
+        poll_engine.run_cycle(tenant_list)
+        elapsed = time.monotonic() - started
+        poll_engine.stop(tenant_list)
+        assert elapsed < 1, (
+            'Подписчики должны опрашиваться пулом потоков одновременно.'
+        )
+        assert len(bot.sent) == 10
+        assert all(tenant.timestamp == 100 for tenant in tenant_list)
+
+    def test_tenant_messages_keep_order(self, homework_module):
+        import tenants
+        homeworks = [
+            {'homework_name': f'hw{i}', 'status': 'approved'}
+            for i in range(20)
+        ]
+        responses = {
+            f'token{i}': {'homeworks': homeworks, 'current_date': 100}
+            for i in range(5)
+        }
+        tenant_list = [
+            tenants.Tenant(token, str(i)) for i, token in enumerate(responses)
+        ]
+        bot = RecordingBot()
+        outbox = make_outbox(bot, coalesce_window=0)
+        poll_engine = make_threaded_engine(
+            client_by_token(responses), bot, workers=5, outbox=outbox
+        )
+        poll_engine.run_cycle(tenant_list)
+        assert poll_engine.stop(tenant_list, timeout=5)
+        for tenant in tenant_list:
+            text = '\n\n'.join(
+                message for chat_id, message in bot.sent
+                if chat_id == tenant.chat_id
+            )
+            positions = [text.index(f'"hw{i}"') for i in range(20)]
+            assert positions == sorted(positions), (
+                'Сообщения подписчика должны отправляться в порядке '
+                'получения.'
+            )
+
+    def test_stop_requested_skips_tenants(self, homework_module):
+        import tenants
+        from shutdown import SHUTDOWN
+        bot = RecordingBot()
+        poll_engine = make_threaded_engine(
+            client_with_delays({'token': 0}), bot, workers=2
+        )
+        tenant = tenants.Tenant('token', '1', 10)
+        SHUTDOWN.request()
+        poll_engine.run_cycle([tenant])
+        poll_engine.stop([tenant])
+        assert bot.sent == [] and tenant.timestamp == 10
+
+
+class TestThreadsArgs:
+    def test_requires_tenants(self, homework_module):
+        with pytest.raises(SystemExit):
+            homework_module.parse_args(['--threads'])
+        with pytest.raises(SystemExit):
+            homework_module.parse_args(
+                ['--threads', '--async', '--tenants', 'tenants.json']
+            )
+        args = homework_module.parse_args(
+            ['--threads', '--tenants', 'tenants.json', '--concurrency', '8']
+        )
+        assert args.use_threads and args.concurrency == 8
@@ -0,0 +1,89 @@
+"""Многопоточный режим: опрос API для подписчиков в пуле потоков."""
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import homework
+import metrics
+from api_client import PracticumClient
+from commands import start_commands
+from constants import CONCURRENCY, OUTBOX_DRAIN_TIMEOUT, TELEGRAM_TOKEN
+from engine import PollEngine
+from outbox import Outbox
+from state import StateStore
+from tenants import load_tenants
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadedPollEngine(PollEngine):
+    """Опрашивает API для подписчиков в пуле из workers потоков.
+
+    Библиотеки requests и python-telegram-bot блокирующие, поэтому
+    ожидание ответов сети перекрывается потоками без перехода на asyncio.
+    Результаты опросов обрабатываются по мере завершения, а сообщения
+    отправляются отдельным пулом потоков outbox. Подписчик в каждом цикле
+    опрашивается одним потоком, а outbox отправляет сообщения каждого чата
+    по очереди, поэтому порядок сообщений подписчика сохраняется.
+    """
+
+    def __init__(self, client, bot, store, workers=CONCURRENCY, outbox=None,
+                 breaker=None, quota=None):
+        super().__init__(client, bot, store, outbox, breaker, quota)
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="poll"
+        )
+
+    def process_tenant(self, tenant):
+        """Опрашивает API для подписчика, если остановка не запрошена."""
+        if not self.shutdown.requested:
+            super().process_tenant(tenant)
+
+    def run_cycle(self, tenants):
+        """Выполняет опрос API для переданных подписчиков в пуле потоков."""
+        futures = {
+            self.executor.submit(self.process_tenant, tenant): tenant
+            for tenant in tenants
+        }
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                logger.error(
+                    f"{futures[future]}: сбой при опросе подписчика: {error}"
+                )
+
+    def stop(self, tenants, updater=None, timeout=OUTBOX_DRAIN_TIMEOUT):
+        """Останавливает пул потоков опроса и сохраняет состояние."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        return super().stop(tenants, updater, timeout)
+
+
+def main(tenants_path, workers=CONCURRENCY, commands=False, shards=1,
+         shard_id=0):
+    """Запускает многопоточный опрос API для подписчиков из реестра.
+
+    При commands бот также отвечает на команды /status и /history.
+    Возвращает True, если при остановке все сообщения доставлены.
+    """
+    if not homework.check_tokens({"TELEGRAM_TOKEN": TELEGRAM_TOKEN}):
+        exit()
+    tenants = load_tenants(tenants_path, shards, shard_id)
+    logger.info(
+        f"Многопоточный режим: подписчиков {len(tenants)}, "
+        f"потоков опроса {workers}."
+    )
+    store = StateStore()
+    bot = homework.LazyBot(TELEGRAM_TOKEN)
+    client = PracticumClient(pool_size=workers)
+    outbox = Outbox(bot).start()
+    poll_engine = ThreadedPollEngine(client, bot, store, workers, outbox)
+    poll_engine.restore(tenants)
+    metrics.watch_engine(tenants, outbox)
+    updater = None
+    if commands:
+        updater = start_commands(poll_engine.cache, tenants)
+    try:
+        poll_engine.run(tenants)
+    finally:
+        drained = poll_engine.stop(tenants, updater)
+    return drained